@@ -12,8 +12,14 @@ logger.info('-------------------------------------------------')
 from .config import Config
 Config() # Inicializa o singleton e carrega as configurações antes dos outros módulos
 
+if Config().logging_mode == 'queue':
+    LoggerManager.start_queue('', Config().logging_queue_size) # Escreve os logs em uma thread própria
+
 from .database import Database
 Database().setup_database() # Carrega a database a partir do script SQL "app/database.sql"
 
+from .search import create_search_index
+create_search_index().setup(Config().search_enabled) # Cria, recria ou remove o índice de busca conforme a seção [search]
+
 from .reader import Reader
 reader = Reader() # Instância o Reader no escopo global do app
\ No newline at end of file
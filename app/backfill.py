@@ -0,0 +1,389 @@
+# ┓ ┏┓┏┓┳┓┏┓┳┓┳┓┏┓  ┏┓┳┳┓┏┓┳┓┏┓┓
+# ┃ ┣ ┃┃┃┃┣┫┣┫┃┃┃┃  ┣┫┃┃┃┣┫┣┫┣┫┃
+# ┗┛┗┛┗┛┛┗┛┗┛┗┻┛┗┛  ┛┗┛ ┗┛┗┛┗┛┗┗┛
+# Modified: 16/10/2026
+
+import os
+import re
+import json
+import zlib
+import time
+import logging
+import argparse
+from datetime import datetime
+from concurrent.futures import ProcessPoolExecutor, Future, FIRST_COMPLETED, wait
+from typing import NamedTuple, Optional
+from sqlalchemy import insert, select, func
+from sqlalchemy.orm import Session
+from .config import Config, DEFAULT_SERVER
+from .database import Database, Log, LogFile, BackfillCheckpoint
+from .patterns import PatternRegistry
+from .scanner import FILENAME_REGEX, log_label
+from .timestamps import TimestampDecoder, log_date_decoder, file_date_decoder
+from .storage import TypedStorage, insert_log_ids
+from .search import table_change_hook
+from .sessions import create_tracker
+from .rollups import create_rollups
+from .rawstore import line_dates, format_date
+from .sources import get_source_id, stored_keys, new_rows
+
+logger = logging.getLogger('app.backfill')
+config = Config()
+database = Database()
+
+_registry: Optional[PatternRegistry] = None
+_log_dates: Optional[TimestampDecoder] = None
+_typed = False
+_raw_store: Optional[tuple[int, int]] = None # (block_size, compression_level) com o raw_store ativo
+_date_regex: Optional[re.Pattern] = None # Pattern [default], para as datas das linhas dos blocos do raw_store
+
+class BackfillFile(NamedTuple):
+    log_date: datetime
+    log_type: str
+    file_path: str
+    file_size: int
+
+class Chunk(NamedTuple):
+    file: BackfillFile
+    start: int
+    end: int
+    chunk_size: int
+
+class RawBlockData(NamedTuple):
+    """Bloco de linhas originais comprimido por um processo de leitura, para a tabela raw_blocks."""
+    start: int
+    end: int
+    lines: int
+    first_date: Optional[str]
+    last_date: Optional[str]
+    data: bytes
+
+def _init_worker(patterns: dict, default_pattern: dict, typed: bool = False, raw_store: Optional[tuple[int, int]] = None) -> None:
+    global _registry, _log_dates, _typed, _raw_store, _date_regex
+    _registry = PatternRegistry(patterns, default_pattern)
+    _log_dates = log_date_decoder()
+    _typed = typed
+    _raw_store = raw_store
+    _date_regex = re.compile(default_pattern['default']) if default_pattern.get('default') else None
+
+def _parse_line(log_type: str, log_line: str, rows: list[tuple], byte_offset: int) -> None:
+    """Adiciona em `rows` as tuplas (pattern_name, log_date, json_data ou grupos, byte_offset) dos matches da linha."""
+    for pattern_name, match in _registry.match(log_type, log_line):
+        groups_dict = match.groupdict()
+        if _typed:
+            data = groups_dict
+        else:
+            try:
+                data = json.dumps(groups_dict)
+            except Exception:
+                data = '{}'
+        log_date = _log_dates.decode(groups_dict['datetime'])
+        rows.append((pattern_name, log_date.strftime('%Y-%m-%d %H:%M:%S.%f'), data, byte_offset))
+
+def _line_dates(data: bytes) -> list[str]:
+    """Datas da primeira e da última linha com data do trecho (pattern [default]), no formato gravado pelo SQLAlchemy."""
+    if _date_regex is None:
+        return []
+    return [format_date(moment) for moment in line_dates(data, _date_regex, _log_dates) if moment is not None]
+
+def _parse_chunk(file_path: str, log_type: str, start: int, end: int, encoding: str = 'utf-8') -> tuple[list[tuple], int, list[RawBlockData]]:
+    """Processa as linhas que começam dentro do trecho [start, end) do arquivo.
+
+    Retorna as tuplas (pattern_name, log_date, json_data, byte_offset), a quantidade de linhas lidas e, com o raw_store
+    ativo, as linhas originais já comprimidas em blocos. A data já vem formatada como o SQLAlchemy grava no
+    SQLite, para que o processo de gravação apenas insira as linhas. No modo storage=typed, o dicionário dos
+    grupos substitui o json_data.
+    """
+    rows = []
+    lines = 0
+    blocks: list[RawBlockData] = []
+    block_lines: list[bytes] = []
+    block_start = block_rows = 0
+
+    def close_block(position: int) -> None:
+        data = b''.join(block_lines)
+        dates = [row[1] for row in rows[block_rows:]] + _line_dates(data)
+        blocks.append(RawBlockData(block_start, position, len(block_lines), min(dates, default=None), max(dates, default=None), zlib.compress(data, _raw_store[1])))
+        block_lines.clear()
+
+    with open(file_path, 'rb') as f:
+        if start > 0:
+            f.seek(start - 1)
+            if f.read(1) != b'\n':
+                f.readline() # A linha começou no trecho anterior
+
+        position = block_start = f.tell()
+        block_size = 0
+        while position < end:
+            line_bytes = f.readline()
+            if not line_bytes:
+                break
+            lines += 1
+            _parse_line(log_type, line_bytes.decode(encoding=encoding, errors='ignore').strip(), rows, position)
+            position += len(line_bytes)
+
+            if _raw_store is not None:
+                block_lines.append(line_bytes)
+                block_size += len(line_bytes)
+                if block_size >= _raw_store[0]:
+                    close_block(position)
+                    block_start, block_rows, block_size = position, len(rows), 0
+
+        if block_lines:
+            close_block(position)
+
+    return rows, lines, blocks
+
+class Backfill:
+    """Importa arquivos de log antigos em paralelo, com um único processo gravando na database."""
+
+    def __init__(self, path: str, workers: int, chunk_size: int, recursive: bool = False, log_types: Optional[list[str]] = None, server: str = DEFAULT_SERVER) -> None:
+        self.path = path
+        self.server = server # Os logs importados pertencem ao servidor (seção [servers])
+        self.workers = workers
+        self.chunk_size = chunk_size
+        self.recursive = recursive
+        self.log_types = set(log_types) if log_types else None
+        self.storage = TypedStorage(config.pattern_types, table_change_hook()) if config.app_storage == 'typed' else None
+        self.rollups = create_rollups() if config.rollups_enabled else None
+        self.raw_store = (config.raw_store_block_size, config.raw_store_level) if config.raw_store_enabled else None
+
+    def collect_files(self) -> list[BackfillFile]:
+        files = []
+        file_dates = file_date_decoder()
+        for root, dirs, names in os.walk(self.path):
+            for name in names:
+                f_match = FILENAME_REGEX.match(name)
+                if not f_match:
+                    continue
+                try:
+                    log_date = file_dates.decode(f_match.group(1))
+                except ValueError:
+                    continue
+                log_type = f_match.group(2)
+                if self.log_types is None or log_type in self.log_types:
+                    file_path = os.path.join(root, name)
+                    files.append(BackfillFile(log_date, log_type, file_path, os.path.getsize(file_path)))
+            if not self.recursive:
+                break
+        files.sort()
+        return files
+
+    def prepare_logfiles(self, db: Session, files: list[BackfillFile]) -> tuple[list[BackfillFile], dict[str, int]]:
+        """Seleciona os arquivos que não serão lidos pelo Reader e retorna o id do LogFile de cada tipo do servidor.
+
+        Na pasta Logs configurada do servidor, os arquivos a partir do acompanhado pelo LogFile de cada tipo continuam
+        com o Reader. Tipos sem LogFile recebem um apontando para o arquivo mais recente, já marcado como lido.
+        """
+        logs_dir = config.servers.get(self.server)
+        logs_dir = os.path.normpath(logs_dir) if logs_dir is not None else None
+        logfiles = {db_logfile.log_type: db_logfile for db_logfile in db.query(LogFile).filter(LogFile.server == self.server).all()}
+        latest = {backfill_file.log_type: backfill_file for backfill_file in files}
+        created = set()
+
+        for log_type, backfill_file in latest.items():
+            if log_type in logfiles:
+                continue
+            stat = os.stat(backfill_file.file_path)
+            logfiles[log_type] = LogFile(
+                log_date=backfill_file.log_date,
+                log_type=log_type,
+                file_name=os.path.basename(backfill_file.file_path),
+                file_path=backfill_file.file_path,
+                last_modified=datetime.fromtimestamp(stat.st_mtime),
+                creation_time=datetime.fromtimestamp(stat.st_ctime),
+                file_size=backfill_file.file_size,
+                cursor_position=backfill_file.file_size,
+                patterns=config.patterns.get(log_type, '{}'),
+                file_dev=stat.st_dev,
+                file_ino=stat.st_ino,
+                server=self.server
+            )
+            db.add(logfiles[log_type])
+            created.add(log_type)
+            logger.info(f'LogFile {log_label(self.server, log_type)} criado a partir do arquivo "{backfill_file.file_path}".')
+        db.commit()
+
+        selected = []
+        for backfill_file in files:
+            followed_by_reader = backfill_file.log_type not in created and \
+                os.path.dirname(os.path.normpath(backfill_file.file_path)) == logs_dir and \
+                backfill_file.log_date >= logfiles[backfill_file.log_type].log_date
+            if not followed_by_reader:
+                selected.append(backfill_file)
+
+        return selected, {log_type: logfile.id for log_type, logfile in logfiles.items()}
+
+    def plan_chunks(self, db: Session, files: list[BackfillFile]) -> list[Chunk]:
+        """Divide os arquivos em trechos, ignorando os já importados em uma execução anterior."""
+        checkpoints: dict[str, dict[int, int]] = {}
+        for checkpoint in db.execute(select(BackfillCheckpoint.file_path, BackfillCheckpoint.chunk_start, BackfillCheckpoint.chunk_size)):
+            checkpoints.setdefault(checkpoint.file_path, {})[checkpoint.chunk_start] = checkpoint.chunk_size
+
+        chunks = []
+        for backfill_file in files:
+            done = checkpoints.get(backfill_file.file_path, {})
+            chunk_size = next(iter(done.values()), self.chunk_size) # Mantém os trechos de uma execução anterior
+            for start in range(0, max(backfill_file.file_size, 1), chunk_size):
+                if start not in done:
+                    chunks.append(Chunk(backfill_file, start, min(start + chunk_size, backfill_file.file_size), chunk_size))
+        return chunks
+
+    def write_chunk(self, db: Session, chunk: Chunk, log_file_id: int, rows: list[tuple], lines: int, blocks: list[RawBlockData]) -> int:
+        """Grava os logs de um trecho (e as suas contagens nos rollups e linhas originais) junto com o seu checkpoint, na mesma transação.
+        Retorna os logs gravados."""
+        try:
+            if blocks:
+                db.connection().exec_driver_sql(
+                    'INSERT INTO raw_blocks (server, log_type, file_name, start_offset, end_offset, lines, first_date, last_date, data, created_at) '
+                    'VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, CURRENT_TIMESTAMP) ON CONFLICT (server, file_name, start_offset) DO NOTHING',
+                    [(self.server, chunk.file.log_type, os.path.basename(chunk.file.file_path), *block) for block in blocks]
+                )
+            if rows:
+                connection = db.connection()
+                # Os logs do mesmo arquivo já gravados pelo Reader (ou por outra importação) não são duplicados
+                source_id = get_source_id(connection, self.server, chunk.file.log_type, os.path.basename(chunk.file.file_path))
+                rows = new_rows(rows, lambda row: (row[3], row[0]), stored_keys(connection, source_id, (row[3] for row in rows)))
+            if rows:
+                sql = (
+                    'INSERT OR IGNORE INTO logs (pattern_name, log_file_id, log_file_type, server, log_date, json_data, source_id, byte_offset, created_at) '
+                    'VALUES (?, ?, ?, ?, ?, ?, ?, ?, CURRENT_TIMESTAMP)'
+                )
+                params = [(pattern_name, log_file_id, chunk.file.log_type, self.server, log_date, '' if self.storage else data, source_id, byte_offset) for pattern_name, log_date, data, byte_offset in rows]
+                if self.storage is None:
+                    connection.exec_driver_sql(sql, params)
+                else:
+                    log_ids = insert_log_ids(connection, sql, params)
+                    self.storage.insert_events(connection, log_ids, [(chunk.file.log_type, pattern_name, data) for pattern_name, _, data, _ in rows])
+                    rows = [row for row, log_id in zip(rows, log_ids) if log_id is not None]
+                if self.rollups is not None:
+                    self.rollups.apply(db, [
+                        {'log_file_type': chunk.file.log_type, 'pattern_name': pattern_name, 'log_date': log_date, 'data' if self.storage else 'json_data': data}
+                        for pattern_name, log_date, data, _ in rows
+                    ])
+            db.execute(insert(BackfillCheckpoint.__table__).values(
+                file_path=chunk.file.file_path,
+                chunk_start=chunk.start,
+                chunk_end=chunk.end,
+                chunk_size=chunk.chunk_size,
+                lines=lines,
+                rows=len(rows)
+            ))
+            db.commit()
+        except BaseException:
+            db.rollback()
+            raise
+        return len(rows)
+
+    def run(self) -> None:
+        files = self.collect_files()
+
+        with database.create_session() as db:
+            files, logfile_ids = self.prepare_logfiles(db, files)
+            chunks = self.plan_chunks(db, files)
+
+            total_bytes = sum(chunk.end - chunk.start for chunk in chunks)
+            logger.info(f'Importando {len(files)} arquivos: {len(chunks)} trechos, {total_bytes / 1024 / 1024:.1f} MB, {self.workers} processos.')
+            if not chunks:
+                return
+
+            first_log_id = db.execute(select(func.coalesce(func.max(Log.id), 0))).scalar() # Os logs importados têm ids maiores
+            done_bytes = 0
+            total_lines = 0
+            total_rows = 0
+            started_at = time.monotonic()
+            reported_at = started_at
+            pending_chunks = iter(chunks)
+            running: dict[Future, Chunk] = {}
+
+            with ProcessPoolExecutor(self.workers, initializer=_init_worker, initargs=(config.patterns, config.default_pattern, self.storage is not None, self.raw_store)) as executor:
+                try:
+                    while True:
+                        while len(running) < self.workers * 2: # Limita os trechos em memória aguardando gravação
+                            chunk = next(pending_chunks, None)
+                            if chunk is None:
+                                break
+                            future = executor.submit(_parse_chunk, chunk.file.file_path, chunk.file.log_type, chunk.start, chunk.end)
+                            running[future] = chunk
+
+                        if not running:
+                            break
+
+                        completed, _ = wait(running, return_when=FIRST_COMPLETED)
+                        for future in completed:
+                            chunk = running.pop(future)
+                            rows, lines, blocks = future.result()
+                            written = self.write_chunk(db, chunk, logfile_ids[chunk.file.log_type], rows, lines, blocks)
+
+                            done_bytes += chunk.end - chunk.start
+                            total_lines += lines
+                            total_rows += written
+
+                        now = time.monotonic()
+                        if now - reported_at >= 5:
+                            reported_at = now
+                            logger.info(f'Progresso: {done_bytes / total_bytes:.1%}, {total_lines / (now - started_at):.0f} linhas/s, {total_rows} logs gravados.')
+
+                except KeyboardInterrupt:
+                    executor.shutdown(wait=False, cancel_futures=True)
+                    logger.warning('Combinação CTRL + C pressionada. Os trechos já gravados não serão importados novamente na próxima execução.')
+                    if config.sessions_enabled:
+                        logger.warning('Os eventos de sessão já importados não foram aplicados, utilize "sessions.py --rebuild" para recriar as sessões.')
+                    return
+
+            elapsed = time.monotonic() - started_at
+            logger.info(f'Importação concluída: {total_lines} linhas, {total_rows} logs em {elapsed:.1f} segundos ({total_lines / max(elapsed, 1e-9):.0f} linhas/s).')
+
+            if config.sessions_enabled:
+                self.apply_sessions(db, {chunk.file for chunk in chunks}, first_log_id)
+
+    def apply_sessions(self, db: Session, files: set[BackfillFile], first_log_id: int) -> None:
+        """Aplica nas sessões dos jogadores os eventos de conexão e desconexão importados (logs com id maior que `first_log_id`).
+
+        Cada arquivo é uma execução encerrada do servidor: as suas sessões são montadas apenas com os seus eventos e as que
+        ficaram abertas são encerradas no fim do arquivo (data de modificação). As sessões e o tempo de jogo já gravados
+        não são recriados, então o tempo de jogo dos logs que já expiraram é mantido.
+        """
+        tracker = create_tracker()
+        session_files = sorted((backfill_file for backfill_file in files if tracker.is_session_log_type(backfill_file.log_type)), key=lambda backfill_file: backfill_file.log_date)
+        if not session_files:
+            return
+
+        sessions = 0
+        try:
+            for backfill_file in session_files:
+                source_id = db.connection().exec_driver_sql(
+                    'SELECT id FROM log_sources WHERE server = ? AND file_name = ?', (self.server, os.path.basename(backfill_file.file_path))
+                ).scalar()
+                if source_id is None:
+                    continue
+                events = list(tracker.query_events(db, Log.source_id == source_id, Log.id > first_log_id))
+                sessions += tracker.replay(db, self.server, events, datetime.fromtimestamp(os.path.getmtime(backfill_file.file_path)))
+            db.commit()
+        except BaseException:
+            db.rollback()
+            raise
+        logger.info(f'{sessions} sessões de jogadores gravadas a partir de {len(session_files)} arquivos importados.')
+
+def main(argv: Optional[list[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description='Importa arquivos de log antigos do Project Zomboid para a database.')
+    parser.add_argument('--server', default=next(iter(config.servers)), help='Servidor dos logs importados (padrão: primeiro servidor da seção [servers]).')
+    parser.add_argument('--path', help='Diretório com os arquivos de log (padrão: pasta Logs do servidor).')
+    parser.add_argument('--recursive', action='store_true', help='Inclui os subdiretórios.')
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1, help='Quantidade de processos de leitura.')
+    parser.add_argument('--chunk-size', type=int, default=32, help='Tamanho dos trechos de cada arquivo em MB.')
+    parser.add_argument('--type', action='append', dest='log_types', help='Importa apenas o tipo de log informado (pode ser repetido).')
+    args = parser.parse_args(argv)
+
+    path = args.path or config.servers.get(args.server)
+    if path is None:
+        parser.error(f'o servidor "{args.server}" não está na seção [servers], informe o diretório com --path.')
+
+    Backfill(
+        path=path,
+        workers=max(args.workers, 1),
+        chunk_size=max(args.chunk_size, 1) * 1024 * 1024,
+        recursive=args.recursive,
+        log_types=args.log_types,
+        server=args.server
+    ).run()
@@ -1,9 +1,10 @@
 # ┓ ┏┓┏┓┳┓┏┓┳┓┳┓┏┓  ┏┓┳┳┓┏┓┳┓┏┓┓ 
 # ┃ ┣ ┃┃┃┃┣┫┣┫┃┃┃┃  ┣┫┃┃┃┣┫┣┫┣┫┃ 
 # ┗┛┗┛┗┛┛┗┛┗┛┗┻┛┗┛  ┛┗┛ ┗┛┗┛┗┛┗┗┛
-# Modified: 23/09/2024
+# Modified: 16/10/2026
 
 import os
+import re
 import sys
 import logging
 from configparser import ConfigParser
@@ -11,6 +12,9 @@ from .globals import get_root_dir
 
 logger = logging.getLogger('app.config')
 
+DEFAULT_SERVER = 'default' # Nome do servidor do [path] zomboid, sem a seção [servers]
+SERVER_NAME_REGEX = re.compile(r'^[\w.-]+$')
+
 class EmptyConfigurationError(ValueError):
     def __init__(self, message: str, *args: object) -> None:
         super().__init__(message, *args)
@@ -37,7 +41,8 @@ class Config:
             logger.info('Configurações: OK!')
 
     def load_config(self) -> None:
-        config_file = os.path.join(self.ROOT_DIR, 'config.ini')
+        # A variável de ambiente permite apontar outro arquivo de configuração (ex. benchmarks)
+        config_file = os.environ.get('PZLA_CONFIG') or os.path.join(self.ROOT_DIR, 'config.ini')
 
         if not os.path.exists(config_file):
             logger.error(f'O arquivo de configuração "{config_file}" não foi encontrado.')
@@ -48,7 +53,7 @@ class Config:
                         content = f2.read().decode(encoding='utf-8')
                         normalized_content = content.replace('\r\n', '\n').replace('\r', '\n')
                         f1.write(normalized_content)
-                    logger.critical(f'Um novo arquivo de configuração foi gerado no diretório "{self.ROOT_DIR}". Preencha-o corretamente e inicie a aplicação novamente.')
+                    logger.critical(f'Um novo arquivo de configuração foi gerado no diretório "{os.path.dirname(config_file)}". Preencha-o corretamente e inicie a aplicação novamente.')
                     sys.exit()
                 
             except PermissionError as error:
@@ -69,7 +74,72 @@ class Config:
     def setup_default_values(self) -> None:
         self.default_reading_frequency = 10
         self.default_expiration_time = 0
+        self.default_max_lines_per_cycle = 5000
+        self.default_max_bytes_per_cycle = 1024 * 1024 # 1 MB
+        self.default_write_batch_size = 10000
+        self.default_write_batch_interval = 0
+        self.default_watcher = 'auto'
+        self.default_storage = 'json'
+        self.default_engine = 'sync'
+        self.default_engine_queue_size = 64
         self.default_pattern = {}
+        self.default_database_options = {
+            'journal_mode': 'WAL',
+            'synchronous': 'NORMAL',
+            'cache_size': -65536, # 64 MB (valores negativos são em KB)
+            'mmap_size': 268435456, # 256 MB
+            'temp_store': 'MEMORY',
+            'busy_timeout': 5000, # Milissegundos
+            'checkpoint_interval': 300, # Segundos
+            'optimize_interval': 3600 # Segundos
+        }
+        self.default_retention_options = {
+            'interval': 60, # Segundos
+            'batch_size': 5000,
+            'batch_pause': 0.05, # Segundos
+            'archive_dir': ''
+        }
+        self.default_metrics_options = {
+            'enabled': 'false',
+            'summary_interval': 60, # Segundos
+            'http_host': '127.0.0.1',
+            'http_port': 0 # 0 = endpoint desativado
+        }
+        self.default_logging_options = {
+            'mode': 'sync',
+            'queue_size': 10000, # 0 = fila sem limite
+            'unmatched_interval': 60, # Segundos, 0 = um aviso por linha
+            'unmatched_samples': 3,
+            'memory_report_interval': 600 # Segundos, 0 = desativado
+        }
+        self.default_rollups_options = {
+            'enabled': 'false',
+            'granularities': 'minute, hour, day',
+            'steamid_granularities': 'hour, day', # Vazio = sem a contagem de steamids distintos
+            'steamid_group': 'steamid',
+            'minute_retention': 172800, # Segundos, 0 = mantém para sempre
+            'hour_retention': 7776000,
+            'day_retention': 0,
+            'clean_interval': 3600 # Segundos
+        }
+        self.default_raw_store_options = {
+            'enabled': 'false',
+            'block_size': 1024 * 1024, # Bytes de linhas originais por bloco
+            'compression_level': 6, # 1 (mais rápido) a 9 (menor)
+            'retention': 0, # Segundos, 0 = mantém para sempre
+            'clean_interval': 3600 # Segundos
+        }
+        self.default_search_options = {
+            'enabled': 'false',
+            'log_types': 'chat, admin, user' # Vazio = todos os tipos de log
+        }
+        self.default_sessions_options = {
+            'enabled': 'false',
+            'log_type': 'user',
+            'connect_pattern': 'fully connected',
+            'disconnect_pattern': 'disconnected player',
+            'steamid_group': 'steamid'
+        }
     
     def process_configs(self) -> None:
         try:
@@ -77,6 +147,13 @@ class Config:
             path_database = self._config.get('path', 'database', fallback=None)
             app_reading_frequency = self._config.get('app', 'reading_frequency', fallback=None)
             app_expiration_time = self._config.get('app', 'expiration_time', fallback=None)
+            app_max_lines_per_cycle = self._config.get('app', 'max_lines_per_cycle', fallback=None)
+            app_max_bytes_per_cycle = self._config.get('app', 'max_bytes_per_cycle', fallback=None)
+            app_write_batch_size = self._config.get('app', 'write_batch_size', fallback=None)
+            app_write_batch_interval = self._config.get('app', 'write_batch_interval', fallback=None)
+            app_watcher = self._config.get('app', 'watcher', fallback=None)
+            app_storage = self._config.get('app', 'storage', fallback=None)
+            app_engine = self._config.get('app', 'engine', fallback=None)
             default_pattern = self._config.get('default', 'pattern', fallback=None)
 
             patterns = {}
@@ -93,7 +170,31 @@ class Config:
 
             self.patterns = patterns
 
-            if path_zomboid is None:
+            pattern_types = {}
+            if 'pattern_types' in self._config.sections():
+                for option_name, value in self._config.items('pattern_types'):
+                    option_name_split = option_name.split('__')
+                    groups = {}
+                    for item in value.split(','):
+                        parts = [part.strip() for part in item.split(':')]
+                        if not parts[0]:
+                            continue
+                        type_name = parts[1].lower() if len(parts) > 1 and parts[1] else 'text'
+                        if type_name not in ('text', 'int', 'float'):
+                            raise ValueError(f'Tipo "{type_name}" inválido para o grupo "{parts[0]}" do pattern "{option_name}", utilize text, int ou float.')
+                        groups[parts[0]] = (type_name, len(parts) > 2 and parts[2].lower() == 'index')
+
+                    pattern_types.setdefault(option_name_split[0], {})[option_name_split[1]] = groups
+                    logger.debug(f'Tipos carregados: log: {option_name_split[0]} name: {option_name_split[1]}: {value}')
+
+            self.pattern_types = pattern_types
+
+            servers = {}
+            if 'servers' in self._config.sections():
+                for server, value in self._config.items('servers'):
+                    if value.strip():
+                        servers[server] = value.strip()
+            if not servers and path_zomboid is None:
                 raise EmptyConfigurationError('O caminho para o diretório do Project Zomboid não pôde ser carregado. Verifique o arquivo de configuração e tente novamente.')
             if path_database is None:
                 raise EmptyConfigurationError('O caminho para o caminho para o arquivo do banco de dados SQL não pôde ser carregado. Verifique o arquivo de configuração e tente novamente.')
@@ -103,17 +204,53 @@ class Config:
             if app_expiration_time is None:
                 logger.warning(f'O tempo de expiração dos logs no banco de dados não foi configurado corretamente. Os logs não serão removidos automaticamente.')
                 app_expiration_time = self.default_expiration_time
+            if app_max_lines_per_cycle is None:
+                logger.debug(f'O limite de linhas por ciclo não foi configurado. Utilizando um valor padrão {self.default_max_lines_per_cycle}.')
+                app_max_lines_per_cycle = self.default_max_lines_per_cycle
+            if app_max_bytes_per_cycle is None:
+                logger.debug(f'O limite de bytes por ciclo não foi configurado. Utilizando um valor padrão {self.default_max_bytes_per_cycle}.')
+                app_max_bytes_per_cycle = self.default_max_bytes_per_cycle
+            if app_write_batch_size is None:
+                logger.debug(f'O tamanho do lote de gravação não foi configurado. Utilizando um valor padrão {self.default_write_batch_size}.')
+                app_write_batch_size = self.default_write_batch_size
+            if app_write_batch_interval is None:
+                logger.debug(f'O intervalo do lote de gravação não foi configurado. Utilizando um valor padrão {self.default_write_batch_interval}.')
+                app_write_batch_interval = self.default_write_batch_interval
+            if app_watcher is None:
+                logger.debug(f'O modo de monitoramento dos logs não foi configurado. Utilizando um valor padrão {self.default_watcher}.')
+                app_watcher = self.default_watcher
+            elif app_watcher not in ('auto', 'inotify', 'polling'):
+                logger.warning(f'O modo de monitoramento dos logs não foi configurado corretamente. Utilizando um valor padrão {self.default_watcher}.')
+                app_watcher = self.default_watcher
+            if app_storage is None:
+                logger.debug(f'O modo de armazenamento dos logs não foi configurado. Utilizando um valor padrão {self.default_storage}.')
+                app_storage = self.default_storage
+            elif app_storage not in ('json', 'typed'):
+                logger.warning(f'O modo de armazenamento dos logs não foi configurado corretamente. Utilizando um valor padrão {self.default_storage}.')
+                app_storage = self.default_storage
+            if app_engine is None:
+                logger.debug(f'O modo de execução da leitura não foi configurado. Utilizando um valor padrão {self.default_engine}.')
+                app_engine = self.default_engine
+            elif app_engine not in ('sync', 'async'):
+                logger.warning(f'O modo de execução da leitura não foi configurado corretamente. Utilizando um valor padrão {self.default_engine}.')
+                app_engine = self.default_engine
             if default_pattern is None:
                 raise EmptyConfigurationError(f'O pattern default não foi configurado corretamente.')
 
-            path_zomboid = os.path.normpath(path_zomboid.format(user=os.environ.get('USER') or os.environ.get('USERNAME')))
-            if not os.path.exists(path_zomboid):
-                raise FileNotFoundError('Caminho para o diretório do Project Zomboid não encontrado.')
-            
-            path_zomboid_logs = os.path.join(path_zomboid, 'Logs')
-            logger.info(f'Diretório para a pasta "Logs" do Project Zomboid definida como: "{path_zomboid_logs}"')
-            if not os.path.exists(path_zomboid_logs):
-                raise FileNotFoundError('Caminho para a pasta "Logs" do Project Zomboid não encontrado.')
+            if servers:
+                if path_zomboid is not None:
+                    logger.debug('A seção [servers] foi configurada, o diretório [path] zomboid não será utilizado.')
+            else:
+                servers = {DEFAULT_SERVER: path_zomboid}
+
+            servers_logs = {}
+            for server, server_path in servers.items():
+                if not SERVER_NAME_REGEX.match(server):
+                    raise ValueError(f'Nome de servidor inválido: "{server}" (utilize apenas letras, números, ".", "-" e "_").')
+                servers_logs[server] = self.process_server_path(server, server_path)
+
+            path_zomboid_logs = next(iter(servers_logs.values()))
+            path_zomboid = os.path.dirname(path_zomboid_logs)
             
             path_database = path_database.format(app_path=get_root_dir())
             path_database = os.path.normpath(path_database)
@@ -124,17 +261,274 @@ class Config:
             try:
                 self.app_reading_frequency = float(app_reading_frequency)
                 self.app_expiration_time = int(app_expiration_time)
+                self.app_max_lines_per_cycle = int(app_max_lines_per_cycle)
+                self.app_max_bytes_per_cycle = int(app_max_bytes_per_cycle)
+                self.app_write_batch_size = int(app_write_batch_size)
+                self.app_write_batch_interval = float(app_write_batch_interval)
+                self.app_watcher = app_watcher
+                self.app_storage = app_storage
+                self.app_engine = app_engine
             except ValueError as error:
                 raise error(f'Tipo inválido na configuração: {error}')
             
-            self.path_zomboid = path_zomboid
+            self.path_zomboid = path_zomboid # Diretório do primeiro servidor
             self.path_zomboid_logs = path_zomboid_logs
+            self.servers = servers_logs # Nome do servidor: pasta "Logs"
             self.path_database = path_database
             self.default_pattern = {'default': default_pattern}
 
+            self.process_database_configs()
+            self.process_retention_configs()
+            self.process_metrics_configs()
+            self.process_engine_configs()
+            self.process_sessions_configs()
+            self.process_logging_configs()
+            self.process_search_configs()
+            self.process_rollups_configs()
+            self.process_raw_store_configs()
+
         except EmptyConfigurationError as error:
             logger.critical(f'Parece que você não definiu uma configuração obrigatória: {error}')
             sys.exit()
         except Exception as error:
             logger.critical(f'Erro ao carregar configurações: {error}')
-            sys.exit()
\ No newline at end of file
+            sys.exit()
+
+    def process_server_path(self, server: str, path_zomboid: str) -> str:
+        """Valida o diretório do Project Zomboid de um servidor e retorna a sua pasta "Logs"."""
+        path_zomboid = os.path.normpath(path_zomboid.format(user=os.environ.get('USER') or os.environ.get('USERNAME')))
+        if not os.path.exists(path_zomboid):
+            raise FileNotFoundError(f'Caminho para o diretório do Project Zomboid do servidor "{server}" não encontrado.')
+
+        path_zomboid_logs = os.path.join(path_zomboid, 'Logs')
+        logger.info(f'Diretório para a pasta "Logs" do Project Zomboid do servidor "{server}" definida como: "{path_zomboid_logs}"')
+        if not os.path.exists(path_zomboid_logs):
+            raise FileNotFoundError(f'Caminho para a pasta "Logs" do Project Zomboid do servidor "{server}" não encontrado.')
+        return path_zomboid_logs
+
+    def process_database_configs(self) -> None:
+        options = {}
+        for option, default in self.default_database_options.items():
+            value = self._config.get('database', option, fallback=None)
+            if value is None:
+                logger.debug(f'A opção "{option}" da database não foi configurada. Utilizando um valor padrão {default}.')
+                value = default
+            options[option] = value
+
+        choices = {
+            'journal_mode': ('DELETE', 'TRUNCATE', 'PERSIST', 'MEMORY', 'WAL', 'OFF'),
+            'synchronous': ('OFF', 'NORMAL', 'FULL', 'EXTRA'),
+            'temp_store': ('DEFAULT', 'FILE', 'MEMORY')
+        }
+        for option, valid_values in choices.items():
+            options[option] = str(options[option]).upper()
+            if options[option] not in valid_values:
+                logger.warning(f'Valor inválido para a opção "{option}" da database: {options[option]}. Utilizando um valor padrão {self.default_database_options[option]}.')
+                options[option] = self.default_database_options[option]
+
+        try:
+            self.database_journal_mode = options['journal_mode']
+            self.database_synchronous = options['synchronous']
+            self.database_temp_store = options['temp_store']
+            self.database_cache_size = int(options['cache_size'])
+            self.database_mmap_size = int(options['mmap_size'])
+            self.database_busy_timeout = int(options['busy_timeout'])
+            self.database_checkpoint_interval = float(options['checkpoint_interval'])
+            self.database_optimize_interval = float(options['optimize_interval'])
+        except ValueError as error:
+            raise ValueError(f'Tipo inválido na configuração da database: {error}')
+
+    def process_retention_configs(self) -> None:
+        options = {}
+        for option, default in self.default_retention_options.items():
+            value = self._config.get('retention', option, fallback=None)
+            if value is None:
+                logger.debug(f'A opção "{option}" da limpeza dos logs não foi configurada. Utilizando um valor padrão "{default}".')
+                value = default
+            options[option] = value
+
+        rules = {}
+        if 'retention_rules' in self._config.sections():
+            for option_name, value in self._config.items('retention_rules'):
+                option_name_split = option_name.split('__', 1)
+                log_type = option_name_split[0]
+                pattern_name = option_name_split[1] if len(option_name_split) > 1 else ''
+
+                try:
+                    rules.setdefault(log_type, {})[pattern_name] = int(value)
+                except ValueError:
+                    raise ValueError(f'Tempo de expiração inválido para a regra "{option_name}": {value}')
+
+                logger.debug(f'Regra de expiração carregada: log: {log_type} name: {pattern_name or "*"}: {value}')
+
+        archive_dir = str(options['archive_dir']).strip()
+        if archive_dir:
+            archive_dir = os.path.normpath(archive_dir.format(app_path=get_root_dir()))
+            logger.info(f'Os logs expirados serão arquivados no diretório "{archive_dir}" antes de serem removidos.')
+
+        try:
+            self.retention_interval = float(options['interval'])
+            self.retention_batch_size = int(options['batch_size'])
+            self.retention_batch_pause = float(options['batch_pause'])
+            self.retention_archive_dir = archive_dir or None
+            self.retention_rules = rules
+        except ValueError as error:
+            raise ValueError(f'Tipo inválido na configuração da limpeza dos logs: {error}')
+
+    def process_metrics_configs(self) -> None:
+        options = {}
+        for option, default in self.default_metrics_options.items():
+            value = self._config.get('metrics', option, fallback=None)
+            if value is None:
+                logger.debug(f'A opção "{option}" das métricas não foi configurada. Utilizando um valor padrão "{default}".')
+                value = default
+            options[option] = value
+
+        enabled = str(options['enabled']).strip().lower()
+        if enabled not in ('true', 'false'):
+            logger.warning(f'Valor inválido para a opção "enabled" das métricas: {enabled}. Utilizando um valor padrão "{self.default_metrics_options["enabled"]}".')
+            enabled = self.default_metrics_options['enabled']
+
+        try:
+            self.metrics_enabled = enabled == 'true'
+            self.metrics_summary_interval = float(options['summary_interval'])
+            self.metrics_http_host = str(options['http_host']).strip() or self.default_metrics_options['http_host']
+            self.metrics_http_port = int(options['http_port'])
+        except ValueError as error:
+            raise ValueError(f'Tipo inválido na configuração das métricas: {error}')
+
+    def process_engine_configs(self) -> None:
+        queue_size = self._config.get('engine', 'queue_size', fallback=None)
+        if queue_size is None:
+            logger.debug(f'A opção "queue_size" do modo async não foi configurada. Utilizando um valor padrão "{self.default_engine_queue_size}".')
+            queue_size = self.default_engine_queue_size
+
+        priorities = {}
+        if 'engine_priorities' in self._config.sections():
+            for log_type, value in self._config.items('engine_priorities'):
+                try:
+                    priorities[log_type] = int(value)
+                except ValueError:
+                    raise ValueError(f'Prioridade inválida para o log "{log_type}": {value}')
+                logger.debug(f'Prioridade carregada: log: {log_type}: {value}')
+
+        try:
+            self.engine_queue_size = max(int(queue_size), 1)
+            self.engine_priorities = priorities
+        except ValueError as error:
+            raise ValueError(f'Tipo inválido na configuração do modo async: {error}')
+
+    def process_sessions_configs(self) -> None:
+        options = {}
+        for option, default in self.default_sessions_options.items():
+            value = self._config.get('sessions', option, fallback=None)
+            if value is None or not str(value).strip():
+                logger.debug(f'A opção "{option}" das sessões dos jogadores não foi configurada. Utilizando um valor padrão "{default}".')
+                value = default
+            options[option] = str(value).strip()
+
+        enabled = options['enabled'].lower()
+        if enabled not in ('true', 'false'):
+            logger.warning(f'Valor inválido para a opção "enabled" das sessões dos jogadores: {enabled}. Utilizando um valor padrão "{self.default_sessions_options["enabled"]}".')
+            enabled = self.default_sessions_options['enabled']
+
+        self.sessions_enabled = enabled == 'true'
+        self.sessions_log_type = options['log_type']
+        # Os nomes dos patterns vêm das opções da seção [patterns], gravadas em minúsculas pelo ConfigParser
+        self.sessions_connect_pattern = options['connect_pattern'].lower()
+        self.sessions_disconnect_pattern = options['disconnect_pattern'].lower()
+        self.sessions_steamid_group = options['steamid_group']
+
+    def process_logging_configs(self) -> None:
+        options = {}
+        for option, default in self.default_logging_options.items():
+            value = self._config.get('logging', option, fallback=None)
+            if value is None or not str(value).strip():
+                logger.debug(f'A opção "{option}" do logging não foi configurada. Utilizando um valor padrão "{default}".')
+                value = default
+            options[option] = str(value).strip()
+
+        mode = options['mode'].lower()
+        if mode not in ('queue', 'sync'):
+            logger.warning(f'Valor inválido para a opção "mode" do logging: {mode}. Utilizando um valor padrão "{self.default_logging_options["mode"]}".')
+            mode = self.default_logging_options['mode']
+
+        try:
+            self.logging_mode = mode
+            self.logging_queue_size = max(int(options['queue_size']), 0)
+            self.logging_unmatched_interval = max(float(options['unmatched_interval']), 0)
+            self.logging_unmatched_samples = max(int(options['unmatched_samples']), 0)
+            self.logging_memory_report_interval = float(options['memory_report_interval'])
+        except ValueError as error:
+            raise ValueError(f'Tipo inválido na configuração do logging: {error}')
+
+    def process_search_configs(self) -> None:
+        options = {}
+        for option, default in self.default_search_options.items():
+            value = self._config.get('search', option, fallback=None)
+            if value is None:
+                logger.debug(f'A opção "{option}" da busca não foi configurada. Utilizando um valor padrão "{default}".')
+                value = default
+            options[option] = str(value).strip()
+
+        enabled = options['enabled'].lower()
+        if enabled not in ('true', 'false'):
+            logger.warning(f'Valor inválido para a opção "enabled" da busca: {enabled}. Utilizando um valor padrão "{self.default_search_options["enabled"]}".')
+            enabled = self.default_search_options['enabled']
+
+        self.search_enabled = enabled == 'true'
+        self.search_log_types = [log_type.strip() for log_type in options['log_types'].split(',') if log_type.strip()] or None
+
+    def process_rollups_configs(self) -> None:
+        options = {}
+        for option, default in self.default_rollups_options.items():
+            value = self._config.get('rollups', option, fallback=None)
+            if value is None:
+                logger.debug(f'A opção "{option}" dos rollups não foi configurada. Utilizando um valor padrão "{default}".')
+                value = default
+            options[option] = str(value).strip()
+
+        enabled = options['enabled'].lower()
+        if enabled not in ('true', 'false'):
+            logger.warning(f'Valor inválido para a opção "enabled" dos rollups: {enabled}. Utilizando um valor padrão "{self.default_rollups_options["enabled"]}".')
+            enabled = self.default_rollups_options['enabled']
+
+        granularities = {}
+        for option in ('granularities', 'steamid_granularities'):
+            granularities[option] = [granularity.strip().lower() for granularity in options[option].split(',') if granularity.strip()]
+            for granularity in granularities[option]:
+                if granularity not in ('minute', 'hour', 'day'):
+                    raise ValueError(f'Granularidade inválida na opção "{option}" dos rollups: {granularity} (utilize minute, hour ou day)')
+
+        try:
+            self.rollups_enabled = enabled == 'true'
+            self.rollups_granularities = granularities['granularities']
+            self.rollups_steamid_granularities = granularities['steamid_granularities']
+            self.rollups_steamid_group = options['steamid_group']
+            self.rollups_retention = {granularity: int(options[f'{granularity}_retention']) for granularity in ('minute', 'hour', 'day')}
+            self.rollups_clean_interval = float(options['clean_interval'])
+        except ValueError as error:
+            raise ValueError(f'Tipo inválido na configuração dos rollups: {error}')
+
+    def process_raw_store_configs(self) -> None:
+        options = {}
+        for option, default in self.default_raw_store_options.items():
+            value = self._config.get('raw_store', option, fallback=None)
+            if value is None:
+                logger.debug(f'A opção "{option}" do raw_store não foi configurada. Utilizando um valor padrão "{default}".')
+                value = default
+            options[option] = str(value).strip()
+
+        enabled = options['enabled'].lower()
+        if enabled not in ('true', 'false'):
+            logger.warning(f'Valor inválido para a opção "enabled" do raw_store: {enabled}. Utilizando um valor padrão "{self.default_raw_store_options["enabled"]}".')
+            enabled = self.default_raw_store_options['enabled']
+
+        try:
+            self.raw_store_enabled = enabled == 'true'
+            self.raw_store_block_size = max(int(options['block_size']), 4096)
+            self.raw_store_level = min(max(int(options['compression_level']), 1), 9)
+            self.raw_store_retention = int(options['retention'])
+            self.raw_store_clean_interval = float(options['clean_interval'])
+        except ValueError as error:
+            raise ValueError(f'Tipo inválido na configuração do raw_store: {error}')
@@ -1,41 +1,70 @@
 # ┓ ┏┓┏┓┳┓┏┓┳┓┳┓┏┓  ┏┓┳┳┓┏┓┳┓┏┓┓ 
 # ┃ ┣ ┃┃┃┃┣┫┣┫┃┃┃┃  ┣┫┃┃┃┣┫┣┫┣┫┃ 
 # ┗┛┗┛┗┛┛┗┛┗┛┗┻┛┗┛  ┛┗┛ ┗┛┗┛┗┛┗┗┛
-# Modified: 23/09/2024
+# Modified: 16/10/2026
 
 import os
 import re
 import json
+import sqlite3
 import logging
 from datetime import datetime, timedelta
-from sqlalchemy import create_engine, Column, Integer, Text, func, DateTime, ForeignKey, text
+from sqlalchemy import create_engine, event, Column, Integer, Float, Text, LargeBinary, func, DateTime, ForeignKey, Index, UniqueConstraint, text, Connection
 from sqlalchemy.exc import SQLAlchemyError
 from sqlalchemy.orm import sessionmaker, Session, declarative_base
 from contextlib import contextmanager
-from typing import Generator, Any, Union
+from typing import Generator, Any, Union, Optional, TYPE_CHECKING
 from .globals import get_root_dir
-from .config import Config
+from .config import Config, DEFAULT_SERVER
+from .scanner import log_label
+
+if TYPE_CHECKING:
+    from .scanner import LogFileEntry
 
 logger = logging.getLogger('app.database')
 
+MIGRATIONS_DIR = os.path.join(get_root_dir(), 'app', 'migrations')
+MIGRATION_FILENAME_REGEX = re.compile(r'^(\d+)_(.+)\.sql$')
+
 config = Config()
 Base = declarative_base()
 
+def split_sql_script(sql_script: str) -> list[str]:
+    """Divide um script SQL em comandos, mantendo inteiros os comandos com ';' internos (ex. triggers)."""
+    commands = []
+    command = ''
+    for part in sql_script.split(';'):
+        command += part + ';'
+        if sqlite3.complete_statement(command):
+            if command.strip(' \t\r\n;'):
+                commands.append(command.strip())
+            command = ''
+    return commands
+
 class LogFile(Base):
     __tablename__ = 'log_files'
 
     id = Column(Integer, primary_key=True, autoincrement=True)
+    server = Column(Text, nullable=False, default=DEFAULT_SERVER)  # Nome do servidor (seção [servers])
     patterns = Column(Text, default='{}') 
     log_date = Column(DateTime, nullable=False)  # Data do nome do arquivo
-    log_type = Column(Text, nullable=False)  # Tipo de log
+    log_type = Column(Text, nullable=False)  # Tipo de log, único em cada servidor
     file_name = Column(Text, nullable=False)  # Nome completo do arquivo
     file_path = Column(Text, nullable=False)  # Caminho completo do arquivo
     last_modified = Column(DateTime, nullable=False)  # Última modificação
     creation_time = Column(DateTime, nullable=False)  # Criação no sistema
     file_size = Column(Integer, nullable=False)  # Tamanho em bytes
     cursor_position = Column(Integer, default=0)  # Posição do cursor
+    file_dev = Column(Integer)  # Dispositivo do arquivo (identidade)
+    file_ino = Column(Integer)  # Inode do arquivo (identidade)
+    fingerprint = Column(Text)  # Hash do início do arquivo (identidade)
+    fingerprint_size = Column(Integer, default=0)  # Bytes utilizados no hash
     created_at = Column(DateTime, nullable=False, default=func.now())  # Criação na DB
 
+    __table_args__ = (
+        Index('ix_log_files_server_type', 'server', 'log_type', unique=True),
+    )
+
     def __init__(
         self,
         log_date: datetime,
@@ -46,9 +75,15 @@ class LogFile(Base):
         file_size: int,
         creation_time: datetime,
         cursor_position: int = 0,
-        patterns: Union[dict, str] = '{}'
+        patterns: Union[dict, str] = '{}',
+        file_dev: Optional[int] = None,
+        file_ino: Optional[int] = None,
+        fingerprint: Optional[str] = None,
+        fingerprint_size: int = 0,
+        server: str = DEFAULT_SERVER
     ) -> None:
     
+        self.server = server
         self.log_date = log_date
         self.log_type = log_type
         self.file_name = file_name
@@ -57,6 +92,10 @@ class LogFile(Base):
         self.file_size = file_size
         self.creation_time = creation_time
         self.cursor_position = cursor_position
+        self.file_dev = file_dev
+        self.file_ino = file_ino
+        self.fingerprint = fingerprint
+        self.fingerprint_size = fingerprint_size
         self.set_patterns(patterns)
 
     def set_patterns(self, patterns: Union[dict, str]) -> None:
@@ -69,6 +108,11 @@ class LogFile(Base):
         else:
             self.patterns = patterns if isinstance(patterns, str) and re.match(r'^\{.*\}$', patterns) else '{}'
 
+    @property
+    def label(self) -> str:
+        """Nome do LogFile nas mensagens: o tipo de log, com o servidor quando não é o 'default'."""
+        return log_label(self.server, self.log_type)
+
     def get_patterns(self) -> dict:
         try:
             return json.loads(self.patterns) if self.patterns else {}
@@ -76,15 +120,16 @@ class LogFile(Base):
             logger.exception(f'Erro ao desserializar pattern do JSON: {error}')
             return {}
 
-    def has_changed(self, log_file: 'LogFile', time_tolerance: int = 1) -> bool:
-        """Compara se houve mudanças em relação a outro LogFile."""
-        return (log_file.log_date - self.log_date > timedelta(seconds=time_tolerance)) or \
-               self.file_name != log_file.file_name or \
-               self.file_path != log_file.file_path or \
-               (log_file.last_modified - self.last_modified > timedelta(seconds=time_tolerance)) or \
-               (log_file.creation_time - self.creation_time > timedelta(seconds=time_tolerance)) or \
-               self.file_size != log_file.file_size or \
-               self.cursor_position != log_file.cursor_position
+    def has_changed(self, entry: 'LogFileEntry', time_tolerance: int = 1) -> bool:
+        """Compara se o arquivo no disco mudou em relação ao LogFile."""
+        return abs(entry.log_date - self.log_date) > timedelta(seconds=time_tolerance) or \
+               self.file_name != entry.file_name or \
+               self.file_path != entry.file_path or \
+               abs(entry.last_modified - self.last_modified) > timedelta(seconds=time_tolerance) or \
+               abs(entry.creation_time - self.creation_time) > timedelta(seconds=time_tolerance) or \
+               self.file_size != entry.file_size or \
+               self.file_dev != entry.file_dev or \
+               self.file_ino != entry.file_ino
     
     def is_older_than(self, log_file: 'LogFile') -> bool:
         """Verifica se o LogFile atual é mais antigo que o fornecido."""
@@ -93,6 +138,7 @@ class LogFile(Base):
     def to_dict(self, isoformat: bool = False) -> dict:
         return {
             'id': self.id,
+            'server': self.server,
             'log_date': self.log_date if not isoformat else self.log_date.isoformat(),
             'log_type': self.log_type,
             'file_name': self.file_name,
@@ -101,6 +147,9 @@ class LogFile(Base):
             'creation_time': self.creation_time if not isoformat else self.creation_time.isoformat(),
             'file_size': self.file_size,
             'cursor_position': self.cursor_position,
+            'file_dev': self.file_dev,
+            'file_ino': self.file_ino,
+            'fingerprint': self.fingerprint,
             'created_at': self.created_at if not isoformat else self.created_at.isoformat()
         }
     
@@ -116,9 +165,17 @@ class Log(Base):
     pattern_name = Column(Text, nullable=False)
     log_file_id = Column(Integer, ForeignKey('log_files.id'), nullable=False)  # Referência à tabela log_files
     log_file_type = Column(Text, nullable=False)  # Tipo do arquivo de log
+    server = Column(Text, nullable=False, default=DEFAULT_SERVER)  # Nome do servidor do arquivo de log
     log_date = Column(DateTime, nullable=False)  # Data estampada na linha do log
     json_data = Column(Text, nullable=False)  # Dados do log processados em JSON
-    created_at = Column(DateTime, nullable=False, default=func.now())  # Data de registro na DB
+    created_at = Column(DateTime, nullable=False, default=func.now(), index=True)  # Data de registro na DB
+    source_id = Column(Integer, ForeignKey('log_sources.id'))  # Arquivo de onde a linha foi lida (NULL nos logs antigos)
+    byte_offset = Column(Integer)  # Posição da linha no arquivo em bytes
+
+    __table_args__ = (
+        Index('ix_logs_type_pattern_date', 'log_file_type', 'pattern_name', 'log_date'),
+        Index('ix_logs_source_offset', 'source_id', 'byte_offset', 'pattern_name', unique=True),
+    )
 
     def __init__(
         self, 
@@ -126,13 +183,117 @@ class Log(Base):
         log_file_id: int,
         log_file_type: str,
         log_date: datetime,
-        json_data: str
+        json_data: str,
+        server: str = DEFAULT_SERVER
     ) -> None:
         self.pattern_name = pattern_name
         self.log_file_id = log_file_id
         self.log_file_type = log_file_type
         self.log_date = log_date
         self.json_data = json_data
+        self.server = server
+
+class LogSource(Base):
+    __tablename__ = 'log_sources'
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    server = Column(Text, nullable=False, default=DEFAULT_SERVER)  # Nome do servidor
+    log_type = Column(Text, nullable=False)  # Tipo de log
+    file_name = Column(Text, nullable=False)  # Nome do arquivo de log, único em cada servidor
+    created_at = Column(DateTime, nullable=False, default=func.now())  # Data de registro na DB
+
+    __table_args__ = (
+        UniqueConstraint('server', 'file_name'),
+    )
+
+class BackfillCheckpoint(Base):
+    __tablename__ = 'backfill_checkpoints'
+
+    file_path = Column(Text, primary_key=True)  # Caminho completo do arquivo importado
+    chunk_start = Column(Integer, primary_key=True)  # Início do trecho do arquivo em bytes
+    chunk_end = Column(Integer, nullable=False)  # Fim do trecho do arquivo em bytes
+    chunk_size = Column(Integer, nullable=False)  # Tamanho dos trechos utilizado no arquivo
+    lines = Column(Integer, nullable=False)  # Linhas lidas no trecho
+    rows = Column(Integer, nullable=False)  # Logs gravados a partir do trecho
+    created_at = Column(DateTime, nullable=False, default=func.now())  # Data de registro na DB
+
+    def __init__(self, file_path: str, chunk_start: int, chunk_end: int, chunk_size: int, lines: int, rows: int) -> None:
+        self.file_path = file_path
+        self.chunk_start = chunk_start
+        self.chunk_end = chunk_end
+        self.chunk_size = chunk_size
+        self.lines = lines
+        self.rows = rows
+
+class PlayerSession(Base):
+    __tablename__ = 'player_sessions'
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    server = Column(Text, nullable=False, default=DEFAULT_SERVER)  # Servidor da sessão
+    steamid = Column(Text, nullable=False)  # Steamid do jogador
+    connected_at = Column(DateTime, nullable=False)  # Data do log de conexão
+    disconnected_at = Column(DateTime)  # Data do encerramento (NULL enquanto o jogador está online)
+    duration = Column(Float)  # Duração da sessão em segundos
+    close_reason = Column(Text)  # disconnect, reconnect ou rotation
+
+class PlayerPlaytime(Base):
+    __tablename__ = 'player_playtime'
+
+    server = Column(Text, primary_key=True, default=DEFAULT_SERVER)  # Servidor das sessões
+    steamid = Column(Text, primary_key=True)  # Steamid do jogador
+    sessions = Column(Integer, nullable=False, default=0)  # Sessões encerradas
+    playtime = Column(Float, nullable=False, default=0)  # Soma das durações em segundos
+    last_seen = Column(DateTime)  # Encerramento da última sessão
+
+class PlayerSessionReset(Base):
+    __tablename__ = 'player_session_resets'
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    reset_at = Column(DateTime, nullable=False)  # Data em que as sessões abertas foram encerradas
+    reason = Column(Text, nullable=False)  # Motivo do encerramento
+    server = Column(Text, nullable=False, default=DEFAULT_SERVER)  # Servidor com as sessões encerradas
+
+class ExportWatermark(Base):
+    __tablename__ = 'export_watermarks'
+
+    target = Column(Text, primary_key=True)  # Nome do destino da exportação
+    last_id = Column(Integer, nullable=False, default=0)  # Maior id de logs já exportado
+    rows = Column(Integer, nullable=False, default=0)  # Total de logs exportados
+    updated_at = Column(DateTime, nullable=False, default=func.now())  # Última exportação
+
+class LogRollup(Base):
+    __tablename__ = 'log_rollups'
+
+    granularity = Column(Text, primary_key=True)  # minute, hour ou day
+    bucket = Column(DateTime, primary_key=True)  # Início do período, pela data dos logs
+    log_file_type = Column(Text, primary_key=True)  # Tipo do arquivo de log
+    pattern_name = Column(Text, primary_key=True)  # Nome do pattern
+    logs = Column(Integer, nullable=False, default=0)  # Logs gravados no período
+    steamids = Column(Integer)  # Steamids distintos no período (NULL sem a contagem de steamids)
+
+class LogRollupSteamid(Base):
+    __tablename__ = 'log_rollup_steamids'
+
+    granularity = Column(Text, primary_key=True)  # minute, hour ou day
+    bucket = Column(DateTime, primary_key=True)  # Início do período
+    log_file_type = Column(Text, primary_key=True)  # Tipo do arquivo de log
+    pattern_name = Column(Text, primary_key=True)  # Nome do pattern
+    steamid = Column(Text, primary_key=True)  # Steamid presente no período
+
+class RawBlock(Base):
+    __tablename__ = 'raw_blocks'
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    server = Column(Text, nullable=False, default=DEFAULT_SERVER)  # Nome do servidor
+    log_type = Column(Text, nullable=False)  # Tipo de log
+    file_name = Column(Text, nullable=False)  # Nome do arquivo de log
+    start_offset = Column(Integer, nullable=False)  # Início do bloco no arquivo em bytes
+    end_offset = Column(Integer, nullable=False)  # Fim do bloco no arquivo em bytes
+    lines = Column(Integer, nullable=False, default=0)  # Linhas no bloco
+    first_date = Column(DateTime)  # Data do primeiro log com match no bloco
+    last_date = Column(DateTime)  # Data do último log com match no bloco
+    data = Column(LargeBinary, nullable=False)  # Linhas originais comprimidas (zlib)
+    created_at = Column(DateTime, nullable=False, default=func.now())  # Data de registro na DB
 
 class Database:
     _instance = None
@@ -145,8 +306,33 @@ class Database:
     def __init__(self) -> None:
         if not hasattr(self, '_already_initialized'):
             self.engine = create_engine(f'sqlite:///{config.path_database}')
+            event.listen(self.engine, 'connect', self.apply_pragmas)
             self._already_initialized = True
 
+    def apply_pragmas(self, dbapi_connection: sqlite3.Connection, connection_record: Any) -> None:
+        """Aplica o perfil de desempenho configurado em cada nova conexão com o SQLite."""
+        cursor = dbapi_connection.cursor()
+        try:
+            cursor.execute(f'PRAGMA busy_timeout = {config.database_busy_timeout}')
+            cursor.execute(f'PRAGMA journal_mode = {config.database_journal_mode}')
+            cursor.execute(f'PRAGMA synchronous = {config.database_synchronous}')
+            cursor.execute(f'PRAGMA cache_size = {config.database_cache_size}')
+            cursor.execute(f'PRAGMA mmap_size = {config.database_mmap_size}')
+            cursor.execute(f'PRAGMA temp_store = {config.database_temp_store}')
+        finally:
+            cursor.close()
+
+    def checkpoint(self) -> None:
+        """Move as páginas do WAL para a database sem bloquear leitores ou aguardar por eles."""
+        with self.engine.connect() as connection:
+            busy, log_pages, checkpointed_pages = connection.exec_driver_sql('PRAGMA wal_checkpoint(PASSIVE)').one()
+            logger.debug(f'Checkpoint do WAL: {checkpointed_pages} de {log_pages} páginas{" (database ocupada)" if busy else ""}.')
+
+    def optimize(self) -> None:
+        with self.engine.connect() as connection:
+            connection.exec_driver_sql('PRAGMA optimize')
+            logger.debug('PRAGMA optimize executado.')
+
     def setup_database(self) -> None:
         with self.engine.connect() as connection:
             sql_script = ''
@@ -161,17 +347,54 @@ class Database:
                     logger.critical(f'Erro ao ler arquivo com o script de inicialização SQL: {error}')
                     return
                 try:
-                    for command in sql_script.split(';'):
-                        command = command.strip()
-                        if command:
-                            connection.execute(text(command))
+                    for command in split_sql_script(sql_script):
+                        connection.exec_driver_sql(command)
                     connection.commit()
+                    self.migrate(connection)
                 except SQLAlchemyError as error:
                     logger.critical(f'Erro durante a inicialização do banco de dados através do script SQL: {error}', exc_info=True, stack_info=True)
                     connection.rollback()
             finally:
                 connection.close()
-            
+
+    def get_migrations(self) -> list[tuple[int, str, str]]:
+        """Retorna as migrações (versão, nome, caminho) do diretório "app/migrations" em ordem de versão."""
+        migrations = []
+        for file_name in os.listdir(MIGRATIONS_DIR):
+            m_match = MIGRATION_FILENAME_REGEX.match(file_name)
+            if m_match:
+                migrations.append((int(m_match.group(1)), m_match.group(2), os.path.join(MIGRATIONS_DIR, file_name)))
+        return sorted(migrations)
+
+    def migrate(self, connection: Connection) -> None:
+        """Aplica as migrações com versão maior que a registrada na tabela schema_version, cada uma em uma transação."""
+        current_version = connection.exec_driver_sql('SELECT COALESCE(MAX(version), 0) FROM schema_version').scalar()
+        connection.commit()
+
+        for version, name, path in self.get_migrations():
+            if version <= current_version:
+                continue
+
+            with open(path, encoding='utf-8') as f:
+                sql_script = f.read()
+
+            logger.info(f'Aplicando a migração {version} ({name}) na database.')
+            try:
+                connection.exec_driver_sql('BEGIN') # O driver do SQLite não inicia transações antes de comandos DDL
+                deleted = 0
+                for command in split_sql_script(sql_script):
+                    result = connection.exec_driver_sql(command)
+                    if re.match(r'(?:\s*--[^\n]*\n)*\s*DELETE\b', command, re.IGNORECASE) and result.rowcount > 0:
+                        deleted += result.rowcount
+                connection.execute(text('INSERT INTO schema_version (version, name) VALUES (:version, :name)'), {'version': version, 'name': name})
+                connection.commit()
+            except SQLAlchemyError:
+                connection.rollback()
+                raise
+
+            if deleted:
+                logger.warning(f'A migração {version} ({name}) removeu {deleted} registros da database.')
+
     @contextmanager
     def create_session(self) -> Generator[Session, Any, None]:
         session_maker = sessionmaker(self.engine)
@@ -21,4 +21,10 @@ CREATE TABLE IF NOT EXISTS logs (
     json_data TEXT NOT NULL,
     created_at DATETIME NOT NULL DEFAULT (datetime('now', 'localtime')),
     FOREIGN KEY (log_file_id) REFERENCES log_files (id)
+);
+
+CREATE TABLE IF NOT EXISTS schema_version (
+    version INTEGER PRIMARY KEY,
+    name TEXT NOT NULL,
+    applied_at DATETIME NOT NULL DEFAULT (datetime('now', 'localtime'))
 );
\ No newline at end of file
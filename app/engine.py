@@ -0,0 +1,374 @@
+# ┓ ┏┓┏┓┳┓┏┓┳┓┳┓┏┓  ┏┓┳┳┓┏┓┳┓┏┓┓
+# ┃ ┣ ┃┃┃┃┣┫┣┫┃┃┃┃  ┣┫┃┃┃┣┫┣┫┣┫┃
+# ┗┛┗┛┗┛┛┗┛┗┛┗┻┛┗┛  ┛┗┛ ┗┛┗┛┗┛┗┗┛
+# Modified: 16/10/2026
+
+import time
+import signal
+import asyncio
+import logging
+import itertools
+from concurrent.futures import ThreadPoolExecutor
+from typing import NamedTuple, Optional, Callable, Any
+from sqlalchemy.orm import Session
+from .config import Config
+from .database import Database
+from .metrics import Metrics
+from .reader import Reader
+from .rawstore import RawChunk
+from .filereader import line_offsets
+from .scanner import log_label
+from .watcher import create_watcher
+
+logger = logging.getLogger('app.engine')
+config = Config()
+database = Database()
+metrics = Metrics()
+
+class LogFileState(NamedTuple):
+    """Cópia dos campos de um LogFile usados pelas tarefas de leitura, fora da sessão da database."""
+    id: int
+    server: str
+    log_type: str
+    file_path: str
+    file_size: int
+    file_dev: Optional[int]
+    file_ino: Optional[int]
+    cursor_position: int # Considerando as linhas que ainda estão no buffer do LogWriter
+    is_rotated: bool # Existe um arquivo mais novo do mesmo tipo
+    generation: int # Muda quando o LogFile passa a acompanhar outro arquivo
+
+class ReadChunk(NamedTuple):
+    log_file_id: int
+    label: str # Servidor e tipo de log, para as mensagens
+    generation: int
+    cursor_position: int # Posição após a última linha do trecho
+    rows: list[dict]
+    raw: Optional[RawChunk] # Linhas originais do trecho, com o raw_store ativo
+
+class ParsedChunk(NamedTuple):
+    """Trecho lido de um arquivo com os patterns aplicados, montado na thread de leitura."""
+    lines: int
+    cursor_position: int # Posição após a última linha do trecho
+    matched: list[tuple[str, dict, int]]
+    unmatched: int
+    rows: list[dict]
+    raw: Optional[RawChunk]
+    read_seconds: float
+    match_seconds: float
+    serialize_seconds: float
+
+class ReaderTask:
+    def __init__(self, state: LogFileState, task: asyncio.Task = None) -> None:
+        self.state = state
+        self.task = task
+        self.wake = asyncio.Event()
+
+    async def wait(self) -> None:
+        """Aguarda a próxima verificação dos arquivos (um aviso recebido durante a leitura não é perdido)."""
+        await self.wake.wait()
+        self.wake.clear()
+
+class AsyncEngine:
+    """Executa a leitura com uma tarefa asyncio por LogFile e uma única tarefa de gravação.
+
+    Cada tarefa lê o seu arquivo a partir da própria posição, com a leitura, os patterns e a montagem das linhas
+    em uma thread (asyncio.to_thread), e coloca os trechos lidos em uma fila limitada (`queue_size`); com a fila
+    cheia as tarefas aguardam a gravação (backpressure). A tarefa
+    de gravação junta os trechos em lotes e os grava pelo LogWriter em uma thread dedicada, a única que
+    utiliza a sessão da database, então as linhas e o cursor de cada trecho continuam sendo gravados
+    na mesma transação. A verificação dos arquivos, a limpeza e a manutenção também rodam nessa thread.
+
+    A fila é ordenada pela prioridade do tipo de log (`[engine_priorities]`) e, no mesmo tipo, pela ordem
+    de leitura. No encerramento (CTRL + C) as leituras são interrompidas, os trechos já lidos e completos
+    são gravados e nenhum trecho parcial é gravado.
+    """
+
+    def __init__(self, reader: Reader) -> None:
+        self.reader = reader
+        self.priorities = config.engine_priorities
+        self.tasks: dict[int, ReaderTask] = {}
+        self.sequence = itertools.count()
+        self.executor: Optional[ThreadPoolExecutor] = None
+        self.db: Optional[Session] = None
+        self.queue: Optional[asyncio.PriorityQueue] = None
+        self.stopping: Optional[asyncio.Event] = None
+
+    def get_priority(self, log_type: str) -> int:
+        return self.priorities.get(log_type.lower(), 0) # O ConfigParser grava as opções em minúsculas
+
+    async def run_db(self, function: Callable, *args: Any) -> Any:
+        """Executa a função na thread da database."""
+        return await asyncio.get_running_loop().run_in_executor(self.executor, function, *args)
+
+    def sync_logfiles(self) -> list[LogFileState]:
+        """Atualiza os LogFiles dos servidores com alterações (thread da database) e retorna o estado de cada um para
+        as tarefas de leitura."""
+        servers = self.reader.servers_to_sync()
+        with metrics.timer('update_cached_logsfiles'):
+            self.reader.update_cached_logsfiles(servers)
+        with metrics.timer('update_database_logfiles'):
+            self.reader.update_database_logfiles(self.db, servers)
+        self.reader.patterns.refresh(config.patterns, config.default_pattern)
+
+        states = []
+        for db_logfile in self.reader.query_logfiles(self.db):
+            newest = self.reader.cached_logfiles.get((db_logfile.server, db_logfile.log_type))
+            states.append(LogFileState(
+                db_logfile.id,
+                db_logfile.server,
+                db_logfile.log_type,
+                db_logfile.file_path,
+                db_logfile.file_size,
+                db_logfile.file_dev,
+                db_logfile.file_ino,
+                self.reader.writer.get_cursor(db_logfile.id, db_logfile.cursor_position),
+                newest is not None and (newest.file_dev, newest.file_ino) != (db_logfile.file_dev, db_logfile.file_ino),
+                self.reader.generations.get(db_logfile.id, 0)
+            ))
+        self.reader.backlog_servers = {state.server for state in states if state.cursor_position < state.file_size or state.is_rotated}
+        return states
+
+    def write_chunks(self, chunks: list[ReadChunk], flush: bool) -> None:
+        """Adiciona os trechos ao LogWriter e grava o lote se necessário (thread da database)."""
+        writer = self.reader.writer
+        for chunk in chunks:
+            if chunk.generation != self.reader.generations.get(chunk.log_file_id, 0):
+                # O LogFile passou a acompanhar outro arquivo depois da leitura do trecho
+                logger.debug(f'Trecho do arquivo anterior do LogFile {chunk.label} descartado.')
+                continue
+            writer.add(chunk.log_file_id, chunk.cursor_position, chunk.rows, chunk.raw)
+
+        if writer.is_full() or writer.is_due() or (flush and writer.cursors):
+            writer.flush(self.db)
+
+    def maintain(self) -> None:
+        self.reader.clean_logs(self.db)
+        self.reader.clean_rollups(self.db)
+        self.reader.clean_raw_store(self.db)
+        self.reader.run_maintenance()
+        self.reader.release_session(self.db)
+        self.reader.report_memory()
+
+    async def read_loop(self, reader_task: ReaderTask) -> None:
+        """Lê o arquivo de um LogFile trecho a trecho, colocando os trechos na fila de gravação."""
+        state = reader_task.state
+        generation = state.generation
+        position = state.cursor_position
+        priority = -self.get_priority(state.log_type)
+
+        while True:
+            state = reader_task.state
+            if state.generation != generation:
+                generation = state.generation
+                position = state.cursor_position
+
+            if position >= state.file_size and not state.is_rotated:
+                await reader_task.wait()
+                continue
+
+            try:
+                chunk = await asyncio.to_thread(self.parse_chunk, state, position)
+            except Exception as error:
+                logger.exception(f'Erro ao ler o arquivo de log do LogFile {log_label(state.server, state.log_type)}: {error}')
+                await reader_task.wait()
+                continue
+
+            if chunk is None:
+                await reader_task.wait() # Sem linhas completas ou erro de leitura: aguarda a próxima verificação
+                continue
+
+            if metrics.enabled:
+                metrics.observe_stage('read_logs_read', chunk.read_seconds)
+                metrics.observe_stage('read_logs_match', chunk.match_seconds)
+                metrics.observe_stage('read_logs_serialize', chunk.serialize_seconds)
+                self.reader.record_lines(state.server, state.log_type, chunk.lines, chunk.cursor_position - position, chunk.matched, chunk.unmatched)
+                metrics.set('pzla_lag_bytes', max(state.file_size - chunk.cursor_position, 0), server=state.server, log_type=state.log_type)
+
+            # Aguarda espaço na fila quando a gravação está atrasada
+            await self.queue.put((priority, next(self.sequence), ReadChunk(state.id, log_label(state.server, state.log_type), generation, chunk.cursor_position, chunk.rows, chunk.raw)))
+            position = chunk.cursor_position
+
+    def parse_chunk(self, state: LogFileState, position: int) -> Optional[ParsedChunk]:
+        """Lê o próximo trecho do arquivo, aplica os patterns e monta as linhas da tabela logs (thread de leitura).
+
+        Os patterns e a serialização são a parte cara de um trecho grande, então rodam junto com a leitura fora do
+        event loop, sem atrasar as outras tarefas de leitura e a de gravação. Retorna None sem linhas completas ou
+        com erro de leitura.
+        """
+        started = time.perf_counter()
+        log_lines, new_position, raw_data = self.reader._read_log_lines(
+            state, position, config.app_max_lines_per_cycle, config.app_max_bytes_per_cycle, state.is_rotated
+        )
+        if log_lines is None or new_position == position:
+            return None
+
+        match_started = time.perf_counter()
+        matched, unmatched = self.reader.match_lines(state.log_type, log_lines)
+        serialize_started = time.perf_counter()
+        rows = self.reader.build_rows(state.id, state.server, state.log_type, matched, state.file_path, line_offsets(raw_data, position))
+        raw_store = self.reader.writer.raw_store
+        raw = raw_store.chunk(state.id, state.server, state.log_type, state.file_path, position, raw_data, rows) if raw_store is not None else None
+        return ParsedChunk(
+            len(log_lines),
+            new_position,
+            matched,
+            unmatched,
+            rows,
+            raw,
+            match_started - started,
+            serialize_started - match_started,
+            time.perf_counter() - serialize_started
+        )
+
+    async def write_loop(self) -> None:
+        """Grava os trechos da fila em lotes, na thread da database, até receber o aviso de encerramento."""
+        writer = self.reader.writer
+        finished = False
+        while not finished:
+            timeout = writer.time_until_due()
+            chunks = []
+            try:
+                item = await asyncio.wait_for(self.queue.get(), None if timeout == float('inf') else timeout)
+                rows = 0
+                while True:
+                    if item[2] is None:
+                        finished = True # Aviso de encerramento: os trechos anteriores já foram retirados da fila
+                        break
+                    chunks.append(item[2])
+                    rows += len(item[2].rows)
+                    if self.queue.empty() or (writer.batch_size > 0 and len(writer) + rows >= writer.batch_size):
+                        break
+                    item = self.queue.get_nowait()
+            except asyncio.TimeoutError:
+                pass # O intervalo do lote terminou sem novos trechos: grava o que está no buffer
+
+            try:
+                await self.run_db(self.write_chunks, chunks, finished or not chunks)
+            except Exception as error:
+                # O LogWriter mantém o buffer para uma nova tentativa
+                logger.exception(f'Erro ao gravar os logs na database: {error}')
+                if not finished:
+                    await asyncio.sleep(config.app_reading_frequency)
+
+    def update_tasks(self, states: list[LogFileState]) -> None:
+        """Cria as tarefas dos novos LogFiles, encerra as dos removidos e acorda as demais."""
+        current = {state.id: state for state in states}
+        for log_file_id in list(self.tasks):
+            if log_file_id not in current:
+                self.tasks.pop(log_file_id).task.cancel()
+                self.reader.close_file_reader(log_file_id)
+
+        for state in sorted(states, key=lambda state: -self.get_priority(state.log_type)):
+            reader_task = self.tasks.get(state.id)
+            if reader_task is None:
+                reader_task = self.tasks[state.id] = ReaderTask(state)
+                label = log_label(state.server, state.log_type)
+                reader_task.task = asyncio.create_task(self.read_loop(reader_task), name=f'reader-{label}')
+                logger.debug(f'Tarefa de leitura do LogFile {label} iniciada (prioridade {self.get_priority(state.log_type)}).')
+            reader_task.state = state
+            reader_task.wake.set()
+
+    async def wait_for_changes(self, watcher) -> None:
+        """Aguarda um evento do watcher, o intervalo de leitura ou o encerramento."""
+        waiting = asyncio.ensure_future(asyncio.to_thread(watcher.wait, self.reader.watch_timeout()))
+        stopping = asyncio.ensure_future(self.stopping.wait())
+        await asyncio.wait({waiting, stopping}, return_when=asyncio.FIRST_COMPLETED)
+        stopping.cancel()
+
+    async def supervise(self) -> None:
+        """Verifica os arquivos de log a cada evento do watcher ou intervalo de leitura."""
+        watcher = create_watcher(config.servers.values(), config.app_watcher)
+        self.reader.watcher = watcher
+        try:
+            while not self.stopping.is_set():
+                cycle_started = time.perf_counter()
+                try:
+                    states = await self.run_db(self.sync_logfiles)
+                    self.update_tasks(states)
+                    await self.run_db(self.maintain)
+                except Exception as error:
+                    logger.exception(f'Erro ao verificar os arquivos de log: {error}')
+                    await self.run_db(self.db.rollback)
+                metrics.inc('pzla_cycles_total')
+                metrics.observe_stage('cycle', time.perf_counter() - cycle_started)
+                metrics.maybe_log_summary()
+                self.reader.unmatched.report()
+                await self.wait_for_changes(watcher)
+        finally:
+            watcher.close()
+
+    async def shutdown(self, writer_task: asyncio.Task) -> None:
+        """Interrompe as leituras e aguarda a gravação dos trechos completos que já estavam na fila."""
+        for reader_task in self.tasks.values():
+            reader_task.task.cancel()
+        await asyncio.gather(*(reader_task.task for reader_task in self.tasks.values()), return_exceptions=True)
+
+        # A tarefa de gravação não é cancelada: um trecho retirado da fila e ainda não gravado seria perdido
+        # e o cursor dos trechos seguintes avançaria sobre ele. O aviso de encerramento é o último item da fila.
+        if not writer_task.done():
+            await self.queue.put((float('inf'), next(self.sequence), None))
+            await writer_task
+        else:
+            chunks = []
+            while not self.queue.empty():
+                chunks.append(self.queue.get_nowait()[2])
+            await self.run_db(self.write_chunks, chunks, True)
+
+    async def main(self) -> None:
+        self.queue = asyncio.PriorityQueue(config.engine_queue_size)
+        self.stopping = asyncio.Event()
+        loop = asyncio.get_running_loop()
+        try:
+            loop.add_signal_handler(signal.SIGINT, self.request_stop)
+        except (NotImplementedError, RuntimeError):
+            pass # Windows: o CTRL + C cancela a tarefa principal e o encerramento acontece no finally
+
+        writer_task = asyncio.create_task(self.write_loop(), name='writer')
+        supervisor = asyncio.create_task(self.supervise(), name='supervisor')
+        try:
+            # A supervisão termina no encerramento; as duas tarefas só terminam antes com um erro inesperado
+            done, _ = await asyncio.wait({writer_task, supervisor}, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                task.result()
+        finally:
+            supervisor.cancel()
+            await asyncio.gather(supervisor, return_exceptions=True)
+            await self.shutdown(writer_task)
+
+    def request_stop(self) -> None:
+        if not self.stopping.is_set():
+            logger.warning('Combinação CTRL + C pressionada. Preparando para encerrar com segurança...')
+            self.stopping.set()
+
+    def run(self) -> None:
+        logger.debug('Modo async iniciado.')
+        logger.info('Pressione CTRL + C para encerrar a aplicação com segurança.')
+
+        self.executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='database')
+        metrics.start()
+        with database.create_session() as db:
+            self.db = db
+            try:
+                asyncio.run(self.main())
+                logger.warning('Você encerrou a aplicação com segurança.')
+            except KeyboardInterrupt:
+                logger.warning('Combinação CTRL + C pressionada. Você encerrou a aplicação com segurança.')
+            except Exception as e:
+                logger.critical(f'Um erro crítico encerrou a aplicação: {e}', exc_info=True, stack_info=True)
+                self.executor.submit(db.rollback).result()
+            finally:
+                self.executor.submit(self.commit_pending).result()
+                self.executor.shutdown()
+                self.reader.close_file_readers()
+                metrics.close()
+                self.reader.unmatched.report(force=True)
+                logger.debug('Modo async finalizado e sessão de database encerrada.')
+
+    def commit_pending(self) -> None:
+        try:
+            if self.db.dirty or self.db.new or self.db.deleted:
+                self.db.commit()
+        except Exception as error:
+            logger.exception(f'Erro ao commitar alterações pendentes antes de encerrar a aplicação: {error}')
+            self.db.rollback()
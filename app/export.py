@@ -0,0 +1,267 @@
+# ┓ ┏┓┏┓┳┓┏┓┳┓┳┓┏┓  ┏┓┳┳┓┏┓┳┓┏┓┓
+# ┃ ┣ ┃┃┃┃┣┫┣┫┃┃┃┃  ┣┫┃┃┃┣┫┣┫┣┫┃
+# ┗┛┗┛┗┛┛┗┛┗┛┗┻┛┗┛  ┛┗┛ ┗┛┗┛┗┛┗┗┛
+# Modified: 16/10/2026
+
+import io
+import os
+import csv
+import gzip
+import json
+import time
+import logging
+import argparse
+from collections import OrderedDict
+from typing import NamedTuple, Optional, TextIO
+from sqlalchemy import select, func
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.orm import Session
+from .database import Database, ExportWatermark
+
+logger = logging.getLogger('app.export')
+database = Database()
+
+EXPORT_FORMATS = ('jsonl', 'csv')
+COMPRESSIONS = {'gzip': '.gz', 'zstd': '.zst', 'none': ''} # Compressão: extensão dos arquivos
+SPLITS = ('type', 'day')
+CSV_COLUMNS = ('id', 'pattern_name', 'log_file_id', 'log_file_type', 'log_date', 'data', 'created_at')
+
+class ExportReport(NamedTuple):
+    rows: int
+    files: int
+    last_id: int
+    elapsed: float
+
+def load_zstandard():
+    try:
+        import zstandard
+    except ImportError:
+        raise RuntimeError('A compressão zstd precisa do pacote zstandard (pip install zstandard).')
+    return zstandard
+
+def open_output(path: str, compression: str) -> TextIO:
+    """Abre o arquivo para acréscimo. Cada abertura acrescenta um novo membro gzip ou frame zstd, ambos válidos no mesmo arquivo."""
+    if compression == 'gzip':
+        return gzip.open(path, 'at', encoding='utf-8', newline='', compresslevel=6)
+    if compression == 'zstd':
+        compressor = load_zstandard().ZstdCompressor(level=3)
+        return io.TextIOWrapper(compressor.stream_writer(open(path, 'ab')), encoding='utf-8', newline='')
+    return open(path, 'a', encoding='utf-8', newline='')
+
+def format_jsonl(row: tuple) -> str:
+    """Monta a linha JSONL sem desserializar o json_data, que já é um objeto JSON."""
+    log_id, pattern_name, log_file_id, log_file_type, log_date, json_data, created_at = row
+    return (
+        f'{{"id": {log_id}, "pattern_name": {json.dumps(pattern_name)}, "log_file_id": {log_file_id}, '
+        f'"log_file_type": {json.dumps(log_file_type)}, "log_date": {json.dumps(log_date)}, '
+        f'"data": {json_data or "{}"}, "created_at": {json.dumps(created_at)}}}\n'
+    )
+
+class ExportFile:
+    def __init__(self, path: str, export_format: str, compression: str) -> None:
+        is_new = not os.path.exists(path) or os.path.getsize(path) == 0
+        self.file = open_output(path, compression)
+        self.csv_writer = csv.writer(self.file) if export_format == 'csv' else None
+        if self.csv_writer is not None and is_new:
+            self.csv_writer.writerow(CSV_COLUMNS)
+
+    def write(self, rows: list[tuple]) -> None:
+        if self.csv_writer is not None:
+            self.csv_writer.writerows(rows)
+        else:
+            self.file.write(''.join(map(format_jsonl, rows)))
+
+    def close(self) -> None:
+        self.file.close()
+
+class Exporter:
+    """Exporta os logs em JSONL ou CSV, lendo a tabela logs em páginas por id (keyset) com memória limitada.
+
+    Cada página é lida pela faixa de ids da página anterior em diante, então o custo de cada consulta não depende
+    de quantos logs já foram exportados. O último id exportado de cada destino (`target`) fica na tabela
+    export_watermarks e a próxima execução começa dele. Os arquivos são abertos para acréscimo, um por destino,
+    tipo de log e/ou dia conforme `split`, com no máximo `max_open_files` abertos ao mesmo tempo.
+
+    A marca é gravada depois que os arquivos são fechados (a cada `checkpoint_rows` e no final); os logs de uma
+    execução interrompida depois da última marca são exportados novamente na próxima execução.
+    """
+
+    def __init__(
+        self,
+        output_dir: str,
+        target: str = 'logs',
+        export_format: str = 'jsonl',
+        compression: str = 'gzip',
+        split: tuple[str, ...] = (),
+        log_types: Optional[list[str]] = None,
+        batch_size: int = 10000,
+        max_open_files: int = 32,
+        checkpoint_rows: int = 1_000_000,
+        full: bool = False
+    ) -> None:
+        self.output_dir = output_dir
+        self.target = target
+        self.export_format = export_format
+        self.compression = compression
+        self.split = split
+        self.log_types = list(log_types) if log_types else None
+        self.batch_size = max(batch_size, 1)
+        self.max_open_files = max(max_open_files, 1)
+        self.checkpoint_rows = checkpoint_rows
+        self.full = full
+        self.files: OrderedDict[str, ExportFile] = OrderedDict() # Ordem de uso, do menos ao mais recente
+        self.paths: set[str] = set()
+
+        if compression == 'zstd':
+            load_zstandard() # Falha antes de exportar se o pacote não estiver instalado
+
+    def path_for(self, log_file_type: str, log_date: str) -> str:
+        name = self.target
+        if 'type' in self.split:
+            name += f'_{log_file_type}'
+        if 'day' in self.split:
+            name += f'_{log_date[:10]}'
+        return os.path.join(self.output_dir, f'{name}.{self.export_format}{COMPRESSIONS[self.compression]}')
+
+    def get_file(self, path: str) -> ExportFile:
+        export_file = self.files.get(path)
+        if export_file is not None:
+            self.files.move_to_end(path)
+            return export_file
+
+        if len(self.files) >= self.max_open_files:
+            self.files.popitem(last=False)[1].close()
+        export_file = self.files[path] = ExportFile(path, self.export_format, self.compression)
+        self.paths.add(path)
+        return export_file
+
+    def close_files(self) -> None:
+        while self.files:
+            self.files.popitem(last=False)[1].close()
+
+    def load_watermark(self, db: Session) -> tuple[int, int]:
+        row = db.execute(select(ExportWatermark.last_id, ExportWatermark.rows).where(ExportWatermark.target == self.target)).first()
+        return (row.last_id, row.rows) if row is not None else (0, 0)
+
+    def save_watermark(self, db: Session, last_id: int, rows: int) -> None:
+        table = ExportWatermark.__table__
+        statement = sqlite_insert(table).values(target=self.target, last_id=last_id, rows=rows, updated_at=func.now())
+        try:
+            db.execute(statement.on_conflict_do_update(
+                index_elements=[table.c.target],
+                set_={'last_id': statement.excluded.last_id, 'rows': statement.excluded.rows, 'updated_at': statement.excluded.updated_at}
+            ))
+            db.commit()
+        except BaseException:
+            db.rollback()
+            raise
+
+    def read_page(self, db: Session, last_id: int) -> tuple[list[tuple], int]:
+        """Retorna os logs da próxima página após `last_id` e o último id da página (0 se não houver mais logs).
+
+        Os ids são lidos da tabela logs pela chave primária e as linhas da view logs_json pela faixa de ids,
+        que inclui o json_data dos logs gravados nas tabelas tipadas (storage=typed).
+        """
+        connection = db.connection()
+        type_filter = ''
+        parameters: tuple = ()
+        if self.log_types:
+            type_filter = f' AND log_file_type IN ({", ".join("?" * len(self.log_types))})'
+            parameters = tuple(self.log_types)
+
+        ids = connection.exec_driver_sql(
+            f'SELECT id FROM logs WHERE id > ?{type_filter} ORDER BY id LIMIT ?', (last_id, *parameters, self.batch_size)
+        ).fetchall()
+        if not ids:
+            return [], 0
+
+        rows = connection.exec_driver_sql(
+            'SELECT id, pattern_name, log_file_id, log_file_type, log_date, json_data, created_at FROM logs_json '
+            f'WHERE id BETWEEN ? AND ?{type_filter} ORDER BY id',
+            (ids[0][0], ids[-1][0], *parameters)
+        ).fetchall()
+        return rows, ids[-1][0]
+
+    def write_page(self, rows: list[tuple]) -> None:
+        if not self.split:
+            self.get_file(self.path_for('', '')).write(rows)
+            return
+
+        grouped: dict[str, list[tuple]] = {}
+        for row in rows:
+            grouped.setdefault(self.path_for(row[3], row[4]), []).append(row)
+        for path, path_rows in grouped.items():
+            self.get_file(path).write(path_rows)
+
+    def run(self) -> ExportReport:
+        os.makedirs(self.output_dir, exist_ok=True)
+        started_at = time.monotonic()
+        reported_at = started_at
+        exported = 0
+
+        with database.create_session() as db:
+            last_id, total_rows = self.load_watermark(db)
+            if self.full:
+                last_id = 0
+            saved_id = last_id
+            next_checkpoint = self.checkpoint_rows
+            logger.info(f'Exportando os logs após o id {last_id} para o destino "{self.target}" em "{self.output_dir}".')
+
+            try:
+                while True:
+                    rows, page_last_id = self.read_page(db, last_id)
+                    if not page_last_id:
+                        break
+                    db.commit() # Não mantém a transação de leitura aberta entre as páginas (permite o checkpoint do WAL)
+
+                    self.write_page(rows)
+                    exported += len(rows)
+                    last_id = page_last_id
+
+                    if self.checkpoint_rows > 0 and exported >= next_checkpoint:
+                        next_checkpoint = exported + self.checkpoint_rows
+                        self.close_files() # Os arquivos ficam completos até a marca gravada
+                        self.save_watermark(db, last_id, total_rows + exported)
+                        saved_id = last_id
+
+                    now = time.monotonic()
+                    if now - reported_at >= 5:
+                        reported_at = now
+                        logger.info(f'Progresso: {exported} logs exportados, {exported / (now - started_at):.0f} logs/s, último id {last_id}.')
+            except KeyboardInterrupt:
+                logger.warning('Combinação CTRL + C pressionada. A exportação continua do último id gravado na próxima execução.')
+            finally:
+                self.close_files()
+                if last_id != saved_id:
+                    self.save_watermark(db, last_id, total_rows + exported)
+
+        report = ExportReport(exported, len(self.paths), last_id, time.monotonic() - started_at)
+        logger.info(f'Exportação concluída: {report.rows} logs em {report.files} arquivos em {report.elapsed:.1f} segundos ({report.rows / max(report.elapsed, 1e-9):.0f} logs/s), último id {report.last_id}.')
+        return report
+
+def main(argv: Optional[list[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description='Exporta os logs da database em JSONL ou CSV, apenas os novos desde a última exportação.')
+    parser.add_argument('--output', required=True, help='Diretório onde os arquivos são criados (ou acrescentados).')
+    parser.add_argument('--target', default='logs', help='Nome do destino: prefixo dos arquivos e chave da marca de exportação (padrão: logs).')
+    parser.add_argument('--format', choices=EXPORT_FORMATS, default='jsonl', dest='export_format', help='Formato dos arquivos.')
+    parser.add_argument('--compression', choices=tuple(COMPRESSIONS), default='gzip', help='Compressão dos arquivos (zstd precisa do pacote zstandard).')
+    parser.add_argument('--split', action='append', choices=SPLITS, default=[], help='Divide os arquivos por tipo de log e/ou dia da data do log (pode ser repetido).')
+    parser.add_argument('--type', action='append', dest='log_types', help='Exporta apenas o tipo de log informado (pode ser repetido).')
+    parser.add_argument('--batch-size', type=int, default=10000, help='Logs lidos por consulta.')
+    parser.add_argument('--full', action='store_true', help='Exporta todos os logs desde o início, ignorando a marca da última exportação.')
+    args = parser.parse_args(argv)
+
+    try:
+        exporter = Exporter(
+            output_dir=args.output,
+            target=args.target,
+            export_format=args.export_format,
+            compression=args.compression,
+            split=tuple(args.split),
+            log_types=args.log_types,
+            batch_size=args.batch_size,
+            full=args.full
+        )
+    except RuntimeError as error:
+        parser.error(str(error))
+    exporter.run()
@@ -0,0 +1,140 @@
+# ┓ ┏┓┏┓┳┓┏┓┳┓┳┓┏┓  ┏┓┳┳┓┏┓┳┓┏┓┓
+# ┃ ┣ ┃┃┃┃┣┫┣┫┃┃┃┃  ┣┫┃┃┃┣┫┣┫┣┫┃
+# ┗┛┗┛┗┛┛┗┛┗┛┗┻┛┗┛  ┛┗┛ ┗┛┗┛┗┛┗┗┛
+# Modified: 16/10/2026
+
+import os
+import logging
+import threading
+from itertools import accumulate
+from typing import Optional
+
+logger = logging.getLogger('app.filereader')
+
+READ_SIZE = 1024 * 1024 # Bytes lidos por chamada quando não há limite por ciclo
+
+def complete_lines_end(data: bytes, max_lines: int = 0, final: bool = False) -> int:
+    """Retorna quantos bytes do trecho formam linhas completas, até `max_lines` linhas (0 = sem limite).
+
+    Um trecho sem quebra de linha no final é mantido para o próximo ciclo, exceto se `final`
+    (fim de um arquivo que não recebe mais escritas). As quebras de linha são procuradas nos
+    bytes, sem dividir nem copiar o trecho.
+    """
+    if max_lines > 0:
+        lines = data.count(b'\n') + (1 if final and data and data[-1] != 0x0A else 0)
+        if lines > max_lines:
+            end = -1
+            for _ in range(max_lines):
+                end = data.find(b'\n', end + 1)
+            return end + 1
+    if final:
+        return len(data)
+    return data.rfind(b'\n') + 1
+
+def decode_lines(data: bytes, end: int, encoding: str = 'utf-8') -> list[str]:
+    """Decodifica de uma só vez as linhas completas data[:end] e as divide, sem as quebras de linha.
+
+    Decodificar o trecho inteiro é mais barato do que decodificar cada linha, e a quebra de linha
+    nunca faz parte de um caractere multibyte em UTF-8, então as linhas resultantes são as mesmas.
+    """
+    if end <= 0:
+        return []
+    lines = str(memoryview(data)[:end], encoding, 'ignore').split('\n')
+    if data[end - 1] == 0x0A:
+        lines.pop() # Item vazio após a última quebra de linha
+    return lines
+
+def line_offsets(data: bytes, start: int = 0) -> list[int]:
+    """Posição em bytes (a partir de `start`) do início de cada linha do trecho, na mesma ordem de `decode_lines`."""
+    return list(accumulate((len(line) + 1 for line in bytes(data).split(b'\n')), initial=start))
+
+class LogFileReader:
+    """Leitor de um arquivo de log que mantém o arquivo aberto entre os ciclos de leitura.
+
+    Cada ciclo lê o trecho novo com uma única chamada (pread) a partir do cursor, sem seek nem
+    reabertura do arquivo. O arquivo é reaberto se o dispositivo/inode esperado mudar (arquivo
+    substituído). No Windows o arquivo é fechado após cada leitura, já que um arquivo aberto
+    impede o jogo de renomear ou remover os logs na rotação.
+
+    As leituras do modo async rodam em threads: `close` aguarda a leitura em andamento, então o
+    descritor nunca é fechado (e reutilizado pelo sistema) durante um pread, e o leitor fechado
+    não abre o arquivo novamente.
+    """
+
+    def __init__(self, path: str, keep_open: bool = os.name != 'nt') -> None:
+        self.path = path
+        self.keep_open = keep_open
+        self._fd: Optional[int] = None
+        self._identity: Optional[tuple[int, int]] = None
+        self._lock = threading.Lock()
+        self._closed = False
+
+    def _open(self, identity: Optional[tuple[int, int]]) -> int:
+        if self._fd is not None and identity is not None and identity != self._identity:
+            logger.debug(f'Arquivo "{self.path}" substituído, reabrindo.')
+            self._close_fd()
+
+        if self._fd is None:
+            self._fd = os.open(self.path, os.O_RDONLY | getattr(os, 'O_BINARY', 0))
+            stat = os.fstat(self._fd)
+            self._identity = (stat.st_dev, stat.st_ino)
+        return self._fd
+
+    def _pread(self, fd: int, size: int, position: int) -> bytes:
+        if hasattr(os, 'pread'):
+            return os.pread(fd, size, position)
+        os.lseek(fd, position, os.SEEK_SET)
+        return os.read(fd, size)
+
+    def read(self, position: int, max_bytes: int = 0, identity: Optional[tuple[int, int]] = None) -> tuple[bytes, bool]:
+        """Lê a partir de `position` até `max_bytes` (0 = até o fim). Retorna os bytes e se o fim do arquivo foi alcançado.
+
+        Se o trecho lido não possuir nenhuma quebra de linha (uma única linha maior que o limite),
+        a leitura continua até o fim da linha para não travar o cursor.
+        """
+        with self._lock:
+            if self._closed:
+                raise ValueError(f'O leitor do arquivo "{self.path}" já foi fechado.')
+            return self._read(position, max_bytes, identity)
+
+    def _read(self, position: int, max_bytes: int, identity: Optional[tuple[int, int]]) -> tuple[bytes, bool]:
+        fd = self._open(identity)
+        try:
+            size = max_bytes if max_bytes > 0 else READ_SIZE
+            data = self._pread(fd, size, position)
+            at_eof = len(data) < size
+            if at_eof or (max_bytes > 0 and b'\n' in data):
+                return data, at_eof
+
+            # Sem limite (lê tudo o que existe agora) ou uma linha maior que o limite (lê até o fim dela)
+            parts = [data]
+            offset = position + len(data)
+            while not at_eof and (max_bytes <= 0 or b'\n' not in parts[-1]):
+                part = self._pread(fd, READ_SIZE, offset)
+                parts.append(part)
+                offset += len(part)
+                at_eof = len(part) < READ_SIZE
+            data = b''.join(parts)
+
+            if max_bytes > 0:
+                end = data.find(b'\n')
+                if end != -1:
+                    return data[:end + 1], False
+            return data, at_eof
+        finally:
+            if not self.keep_open:
+                self._close_fd()
+
+    def close(self) -> None:
+        with self._lock:
+            self._closed = True
+            self._close_fd()
+
+    def _close_fd(self) -> None:
+        if self._fd is not None:
+            try:
+                os.close(self._fd)
+            except OSError:
+                pass
+            self._fd = None
+            self._identity = None
@@ -1,12 +1,16 @@
 # ┓ ┏┓┏┓┳┓┏┓┳┓┳┓┏┓  ┏┓┳┳┓┏┓┳┓┏┓┓ 
 # ┃ ┣ ┃┃┃┃┣┫┣┫┃┃┃┃  ┣┫┃┃┃┣┫┣┫┣┫┃ 
 # ┗┛┗┛┗┛┛┗┛┗┛┗┻┛┗┛  ┛┗┛ ┗┛┗┛┗┛┗┗┛
-# Modified: 22/09/2024, 17:00 (UTC/GMT -03:00) 
+# Modified: 16/10/2026
 
 import os
+import time
+import queue
+import atexit
 import logging
-from logging import Logger, Formatter
-from logging.handlers import RotatingFileHandler
+import threading
+from logging import Logger, Formatter, LogRecord
+from logging.handlers import RotatingFileHandler, QueueHandler, QueueListener
 from typing import Optional, Literal
 from .globals import get_root_dir
 
@@ -65,3 +69,100 @@ class LoggerManager:
             logger.addHandler(file_handler)
 
         return logger
+
+    @classmethod
+    def start_queue(cls, name: str, queue_size: int = 0) -> Optional[QueueListener]:
+        """Move os handlers do logger para uma thread (QueueListener), deixando no logger apenas um DroppingQueueHandler.
+
+        A formatação, as cores e a escrita no terminal e no arquivo deixam de ser feitas pela thread que registra o
+        log. Com `queue_size` maior que 0 a fila é limitada e os registros excedentes são descartados e contados.
+        A thread é encerrada ao sair do programa, depois de escrever os registros pendentes.
+        """
+        logger = logging.getLogger(name)
+        handlers = [handler for handler in logger.handlers if not isinstance(handler, QueueHandler)]
+        if not handlers:
+            return None
+
+        log_queue = queue.Queue(max(queue_size, 0))
+        listener = QueueListener(log_queue, *handlers, respect_handler_level=True)
+        for handler in handlers:
+            logger.removeHandler(handler)
+        logger.addHandler(DroppingQueueHandler(log_queue))
+
+        listener.start()
+        atexit.register(listener.stop)
+        return listener
+
+class DroppingQueueHandler(QueueHandler):
+    """QueueHandler que nunca bloqueia: com a fila cheia o registro é descartado e o total de descartes é
+    informado no próximo registro que couber na fila."""
+
+    def __init__(self, log_queue: queue.Queue) -> None:
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def enqueue(self, record: LogRecord) -> None:
+        if self.dropped:
+            dropped_record = logging.makeLogRecord({
+                'name': 'app.logger',
+                'levelno': logging.WARNING,
+                'levelname': 'WARNING',
+                'msg': f'{self.dropped} registros de log descartados com a fila de logs cheia.'
+            })
+            try:
+                self.queue.put_nowait(dropped_record)
+            except queue.Full:
+                self.dropped += 1
+                return
+            # O resumo já está na fila: a partir daqui só são contados os descartes seguintes
+            self.dropped = 0
+
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+class AggregatedWarning:
+    """Agrupa avisos repetidos (ex. linhas sem match) em um resumo periódico por chave.
+
+    Cada chave acumula a quantidade de ocorrências e até `samples` exemplos, escritos em um único aviso a cada
+    `interval` segundos. Com `interval` igual a 0, cada ocorrência é escrita imediatamente com `message`.
+    """
+
+    def __init__(self, logger: Logger, message: str, summary: str, interval: float = 60, samples: int = 3) -> None:
+        self.logger = logger
+        self.message = message # Argumentos: chave e exemplo
+        self.summary = summary # Argumentos: chave, quantidade e segundos desde o último resumo
+        self.interval = interval
+        self.samples = max(samples, 0)
+        self.counts: dict[str, int] = {}
+        self.examples: dict[str, list[str]] = {}
+        self.last_report = time.monotonic()
+        self.lock = threading.Lock()
+
+    def add(self, key: str, example: str) -> None:
+        if self.interval <= 0:
+            self.logger.warning(self.message, key, example)
+            return
+
+        with self.lock:
+            self.counts[key] = self.counts.get(key, 0) + 1
+            examples = self.examples.setdefault(key, [])
+            if len(examples) < self.samples:
+                examples.append(example)
+
+    def report(self, force: bool = False) -> None:
+        """Escreve o resumo das ocorrências acumuladas se o intervalo passou (ou sempre, com `force`)."""
+        now = time.monotonic()
+        if not force and now - self.last_report < self.interval:
+            return
+
+        with self.lock:
+            counts, examples = self.counts, self.examples
+            self.counts, self.examples = {}, {}
+            elapsed = now - self.last_report
+            self.last_report = now
+
+        for key, count in counts.items():
+            lines = ''.join(f'\n    {example}' for example in examples.get(key, ()))
+            self.logger.warning(self.summary + '%s', key, count, elapsed, f', exemplos:{lines}' if lines else '.')
@@ -0,0 +1,305 @@
+# ┓ ┏┓┏┓┳┓┏┓┳┓┳┓┏┓  ┏┓┳┳┓┏┓┳┓┏┓┓
+# ┃ ┣ ┃┃┃┃┣┫┣┫┃┃┃┃  ┣┫┃┃┃┣┫┣┫┣┫┃
+# ┗┛┗┛┗┛┛┗┛┗┛┗┻┛┗┛  ┛┗┛ ┗┛┗┛┗┛┗┗┛
+# Modified: 16/10/2026
+
+import os
+import sys
+import time
+import logging
+import threading
+from bisect import bisect_left
+from contextlib import nullcontext
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Optional
+from .config import Config, DEFAULT_SERVER
+from .scanner import log_label
+
+logger = logging.getLogger('app.metrics')
+config = Config()
+
+# Limites (em segundos) dos buckets dos histogramas de duração
+DURATION_BUCKETS = (0.0005, 0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# Nome: (tipo, descrição) das métricas expostas no formato texto do Prometheus
+DEFINITIONS = {
+    'pzla_stage_duration_seconds': ('histogram', 'Duração de cada etapa do looping principal.'),
+    'pzla_cycles_total': ('counter', 'Quantidade de loopings executados.'),
+    'pzla_lines_read_total': ('counter', 'Linhas lidas dos arquivos de log.'),
+    'pzla_bytes_read_total': ('counter', 'Bytes lidos dos arquivos de log.'),
+    'pzla_lines_matched_total': ('counter', 'Linhas que combinaram com cada pattern.'),
+    'pzla_lines_unmatched_total': ('counter', 'Linhas que não combinaram com nenhum pattern.'),
+    'pzla_logs_written_total': ('counter', 'Logs gravados na database.'),
+    'pzla_logs_duplicate_total': ('counter', 'Logs de trechos lidos novamente ignorados por já estarem gravados.'),
+    'pzla_logs_deleted_total': ('counter', 'Logs expirados removidos pela limpeza.'),
+    'pzla_logs_archived_total': ('counter', 'Logs expirados arquivados pela limpeza.'),
+    'pzla_lag_bytes': ('gauge', 'Bytes ainda não lidos de cada LogFile (tamanho do arquivo - cursor).'),
+    'pzla_lines_per_second': ('gauge', 'Linhas lidas por segundo no último intervalo do resumo.'),
+    'pzla_memory_rss_bytes': ('gauge', 'Memória residente do processo no último registro do uso de memória.')
+}
+
+Labels = tuple[tuple[str, str], ...]
+
+class Histogram:
+    """Histograma com buckets fixos, no formato do Prometheus (contagens cumulativas na exportação)."""
+
+    def __init__(self, buckets: tuple[float, ...] = DURATION_BUCKETS) -> None:
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1) # O último é o bucket +Inf
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def quantile(self, q: float, since: Optional[list[int]] = None) -> float:
+        """Retorna o limite do bucket onde está o quantil `q` (opcionalmente só das observações após `since`)."""
+        counts = self.counts if since is None else [count - previous for count, previous in zip(self.counts, since)]
+        total = sum(counts)
+        if total == 0:
+            return 0.0
+        rank = q * total
+        accumulated = 0
+        for index, count in enumerate(counts):
+            accumulated += count
+            if accumulated >= rank:
+                return self.buckets[index] if index < len(self.buckets) else float('inf')
+        return float('inf')
+
+def escape_label(value: str) -> str:
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+def format_labels(labels: Labels, extra: Labels = ()) -> str:
+    items = [f'{name}="{escape_label(value)}"' for name, value in labels + extra]
+    return '{' + ','.join(items) + '}' if items else ''
+
+def format_value(value: float) -> str:
+    if value == float('inf'):
+        return '+Inf'
+    return repr(float(value)) if isinstance(value, float) and not value.is_integer() else str(int(value))
+
+def format_bytes(value: float) -> str:
+    for unit in ('B', 'KB', 'MB'):
+        if abs(value) < 1024:
+            return f'{value:.0f} {unit}' if unit == 'B' else f'{value:.1f} {unit}'
+        value /= 1024
+    return f'{value:.1f} GB'
+
+def series_label(labels: Labels) -> str:
+    """Servidor e tipo de log de uma série, para o resumo no log."""
+    labels = dict(labels)
+    return log_label(labels.get('server', DEFAULT_SERVER), labels['log_type'])
+
+def current_rss_bytes() -> Optional[int]:
+    """Memória residente atual do processo em bytes (Linux). Em outros sistemas retorna o pico, ou None sem o módulo resource."""
+    try:
+        with open('/proc/self/statm', 'rb') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, IndexError, AttributeError):
+        pass
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss # KB no Linux, bytes no macOS
+    return peak if sys.platform == 'darwin' else peak * 1024
+
+class Metrics:
+    """Contadores, gauges e histogramas das etapas da leitura dos logs.
+
+    Desativado, todos os métodos retornam imediatamente e `timer` devolve um contexto vazio, então o
+    custo nas etapas se resume a uma chamada. As etapas que contam linhas acumulam os valores em
+    variáveis locais e os registram uma vez por trecho lido, nunca por linha.
+    Ativado, as métricas podem ser consultadas em um endpoint HTTP local (formato texto do Prometheus)
+    e um resumo é escrito periodicamente no log.
+    """
+
+    _instance = None
+
+    def __new__(cls) -> 'Metrics':
+        if cls._instance is None:
+            cls._instance = super().__new__(cls)
+        return cls._instance
+
+    def __init__(self) -> None:
+        if hasattr(self, '_already_initialized'):
+            return
+        self.enabled = config.metrics_enabled
+        self.summary_interval = config.metrics_summary_interval
+        self.http_host = config.metrics_http_host
+        self.http_port = config.metrics_http_port
+        self.counters: dict[tuple[str, Labels], float] = {}
+        self.gauges: dict[tuple[str, Labels], float] = {}
+        self.histograms: dict[tuple[str, Labels], Histogram] = {}
+        self._lock = threading.Lock()
+        self._server: Optional[ThreadingHTTPServer] = None
+        self._null_timer = nullcontext()
+        self._last_summary = time.monotonic()
+        self._summary_counters: dict[tuple[str, Labels], float] = {}
+        self._summary_histograms: dict[str, list[int]] = {}
+        self._already_initialized = True
+
+    def inc(self, name: str, value: float = 1, **labels: str) -> None:
+        if not self.enabled:
+            return
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            self.counters[key] = self.counters.get(key, 0) + value
+
+    def set(self, name: str, value: float, **labels: str) -> None:
+        if not self.enabled:
+            return
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            self.gauges[key] = value
+
+    def observe(self, name: str, value: float, **labels: str) -> None:
+        if not self.enabled:
+            return
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            histogram = self.histograms.get(key)
+            if histogram is None:
+                histogram = self.histograms[key] = Histogram()
+            histogram.observe(value)
+
+    def observe_stage(self, stage: str, seconds: float) -> None:
+        self.observe('pzla_stage_duration_seconds', seconds, stage=stage)
+
+    def timer(self, stage: str):
+        """Contexto que mede a duração de uma etapa (`with metrics.timer('read_logs'): ...`)."""
+        if not self.enabled:
+            return self._null_timer
+        return StageTimer(self, stage)
+
+    def render(self) -> str:
+        """Retorna todas as métricas no formato texto do Prometheus."""
+        with self._lock:
+            counters = list(self.counters.items())
+            gauges = list(self.gauges.items())
+            histograms = [(key, list(histogram.counts), histogram.sum, histogram.count, histogram.buckets) for key, histogram in self.histograms.items()]
+
+        samples: dict[str, list[str]] = {}
+        for (name, labels), value in sorted(counters + gauges):
+            samples.setdefault(name, []).append(f'{name}{format_labels(labels)} {format_value(value)}')
+        for (name, labels), counts, total, count, buckets in sorted(histograms, key=lambda item: item[0]):
+            lines = samples.setdefault(name, [])
+            accumulated = 0
+            for limit, bucket_count in zip(buckets + (float('inf'),), counts):
+                accumulated += bucket_count
+                bucket_labels = format_labels(labels, (('le', format_value(limit)),))
+                lines.append(f'{name}_bucket{bucket_labels} {accumulated}')
+            lines.append(f'{name}_sum{format_labels(labels)} {format_value(total)}')
+            lines.append(f'{name}_count{format_labels(labels)} {count}')
+
+        output = []
+        for name in sorted(samples):
+            metric_type, description = DEFINITIONS.get(name, ('untyped', ''))
+            output.append(f'# HELP {name} {description}')
+            output.append(f'# TYPE {name} {metric_type}')
+            output.extend(samples[name])
+        return '\n'.join(output) + '\n'
+
+    def start(self) -> None:
+        """Inicia o endpoint HTTP em uma thread daemon, se configurado (porta diferente de 0)."""
+        if not self.enabled or self.http_port <= 0 or self._server is not None:
+            return
+
+        metrics = self
+
+        class MetricsHandler(BaseHTTPRequestHandler):
+            def do_GET(self) -> None:
+                if self.path.split('?', 1)[0] not in ('/', '/metrics'):
+                    self.send_error(404)
+                    return
+                body = metrics.render().encode('utf-8')
+                self.send_response(200)
+                self.send_header('Content-Type', 'text/plain; version=0.0.4; charset=utf-8')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format: str, *args) -> None:
+                logger.debug(f'Endpoint de métricas: {format % args}')
+
+        try:
+            self._server = ThreadingHTTPServer((self.http_host, self.http_port), MetricsHandler)
+        except OSError as error:
+            logger.error(f'Não foi possível iniciar o endpoint de métricas em {self.http_host}:{self.http_port}: {error}')
+            return
+
+        self._server.daemon_threads = True
+        threading.Thread(target=self._server.serve_forever, name='metrics-http', daemon=True).start()
+        logger.info(f'Métricas disponíveis em http://{self.http_host}:{self.http_port}/metrics')
+
+    def close(self) -> None:
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+    def maybe_log_summary(self) -> None:
+        """Escreve o resumo das métricas no log a cada `summary_interval` segundos."""
+        if not self.enabled or self.summary_interval <= 0:
+            return
+        now = time.monotonic()
+        elapsed = now - self._last_summary
+        if elapsed < self.summary_interval:
+            return
+        self._last_summary = now
+        logger.info(self.summary(elapsed))
+
+    def summary(self, elapsed: float) -> str:
+        """Resume o intervalo desde o último resumo: linhas/s, duração dos ciclos, atraso e taxa de match."""
+        with self._lock:
+            counters = dict(self.counters)
+            gauges = dict(self.gauges)
+            cycle = self.histograms.get(('pzla_stage_duration_seconds', (('stage', 'cycle'),)))
+            cycle_counts = list(cycle.counts) if cycle is not None else None
+
+        delta = lambda key: counters.get(key, 0) - self._summary_counters.get(key, 0)
+        total = lambda name: sum(delta(key) for key in counters if key[0] == name)
+
+        lines_read = total('pzla_lines_read_total')
+        lines_per_second = lines_read / elapsed if elapsed > 0 else 0.0
+        self.set('pzla_lines_per_second', round(lines_per_second, 1))
+
+        parts = [f'{lines_read:.0f} linhas lidas ({lines_per_second:.1f} linhas/s)', f'{total("pzla_logs_written_total"):.0f} logs gravados']
+
+        if cycle_counts is not None:
+            previous = self._summary_histograms.get('cycle')
+            if previous is None or sum(cycle_counts) > sum(previous):
+                parts.append(f'ciclo p50 {format_value(cycle.quantile(0.5, previous))}s p99 {format_value(cycle.quantile(0.99, previous))}s')
+            self._summary_histograms['cycle'] = cycle_counts
+
+        lag = [f'{series_label(labels)}={format_bytes(value)}' for (name, labels), value in sorted(gauges.items()) if name == 'pzla_lag_bytes' and value > 0]
+        parts.append(f'atraso: {", ".join(lag) if lag else "nenhum"}')
+
+        ratios = []
+        for key in sorted(counters):
+            name, labels = key
+            if name != 'pzla_lines_read_total' or delta(key) <= 0:
+                continue
+            unmatched = delta(('pzla_lines_unmatched_total', labels))
+            ratios.append(f'{series_label(labels)} {(1 - unmatched / delta(key)) * 100:.1f}%')
+        if ratios:
+            parts.append(f'match: {", ".join(ratios)}')
+
+        self._summary_counters = counters
+        return 'Métricas: ' + ', '.join(parts) + '.'
+
+class StageTimer:
+    __slots__ = ('metrics', 'stage', 'start')
+
+    def __init__(self, metrics: Metrics, stage: str) -> None:
+        self.metrics = metrics
+        self.stage = stage
+
+    def __enter__(self) -> 'StageTimer':
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.metrics.observe_stage(self.stage, time.perf_counter() - self.start)
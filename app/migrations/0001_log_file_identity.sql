@@ -0,0 +1,5 @@
+-- Identidade dos arquivos de log (dispositivo, inode e hash do início do arquivo)
+ALTER TABLE log_files ADD COLUMN file_dev INTEGER;
+ALTER TABLE log_files ADD COLUMN file_ino INTEGER;
+ALTER TABLE log_files ADD COLUMN fingerprint TEXT;
+ALTER TABLE log_files ADD COLUMN fingerprint_size INTEGER DEFAULT 0;
@@ -0,0 +1,11 @@
+-- Progresso da importação de arquivos antigos (backfill.py)
+CREATE TABLE IF NOT EXISTS backfill_checkpoints (
+    file_path TEXT NOT NULL,
+    chunk_start INTEGER NOT NULL,
+    chunk_end INTEGER NOT NULL,
+    chunk_size INTEGER NOT NULL,
+    lines INTEGER NOT NULL,
+    rows INTEGER NOT NULL,
+    created_at DATETIME NOT NULL DEFAULT (datetime('now', 'localtime')),
+    PRIMARY KEY (file_path, chunk_start)
+);
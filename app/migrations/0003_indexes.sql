@@ -0,0 +1,10 @@
+-- Índices para a limpeza dos logs expirados e para as consultas por tipo, pattern e data
+-- LogFiles repetidos do mesmo tipo (sem o índice único) são unidos no mais recente antes de criar o índice:
+-- os logs passam a apontar para o LogFile mantido e só então os repetidos são removidos (o runner informa quantos)
+UPDATE logs SET log_file_id = (
+    SELECT MAX(kept.id) FROM log_files kept WHERE kept.log_type = (SELECT duplicated.log_type FROM log_files duplicated WHERE duplicated.id = logs.log_file_id)
+) WHERE log_file_id IN (SELECT id FROM log_files WHERE id NOT IN (SELECT MAX(id) FROM log_files GROUP BY log_type));
+DELETE FROM log_files WHERE id NOT IN (SELECT MAX(id) FROM log_files GROUP BY log_type);
+CREATE UNIQUE INDEX IF NOT EXISTS ix_log_files_log_type ON log_files (log_type);
+CREATE INDEX IF NOT EXISTS ix_logs_created_at ON logs (created_at);
+CREATE INDEX IF NOT EXISTS ix_logs_type_pattern_date ON logs (log_file_type, pattern_name, log_date);
@@ -0,0 +1,12 @@
+-- Tabelas tipadas dos patterns (modo storage=typed), criadas pela aplicação quando necessário
+CREATE TABLE IF NOT EXISTS event_tables (
+    table_name TEXT PRIMARY KEY,
+    log_type TEXT NOT NULL,
+    pattern_name TEXT NOT NULL,
+    created_at DATETIME NOT NULL DEFAULT (datetime('now', 'localtime')),
+    UNIQUE (log_type, pattern_name)
+);
+
+-- Recriada com as tabelas tipadas sempre que uma delas é criada ou alterada
+CREATE VIEW IF NOT EXISTS logs_json AS
+SELECT id, pattern_name, log_file_id, log_file_type, log_date, json_data, created_at FROM logs WHERE json_data <> '';
@@ -0,0 +1,32 @@
+-- Sessões dos jogadores, mantidas pela gravação dos eventos de conexão e desconexão (app/sessions.py)
+CREATE TABLE IF NOT EXISTS player_sessions (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    steamid TEXT NOT NULL,
+    connected_at DATETIME NOT NULL,
+    disconnected_at DATETIME,
+    duration REAL,
+    close_reason TEXT
+);
+
+-- No máximo uma sessão aberta por jogador; as consultas de jogadores online leem apenas este índice
+CREATE UNIQUE INDEX IF NOT EXISTS ux_player_sessions_online ON player_sessions (steamid) WHERE disconnected_at IS NULL;
+CREATE INDEX IF NOT EXISTS ix_player_sessions_steamid ON player_sessions (steamid, connected_at);
+
+-- Tempo de jogo acumulado das sessões encerradas de cada jogador
+CREATE TABLE IF NOT EXISTS player_playtime (
+    steamid TEXT PRIMARY KEY,
+    sessions INTEGER NOT NULL DEFAULT 0,
+    playtime REAL NOT NULL DEFAULT 0,
+    last_seen DATETIME
+);
+
+-- Momentos em que todas as sessões abertas foram encerradas (rotação do arquivo de log a cada início do servidor)
+CREATE TABLE IF NOT EXISTS player_session_resets (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    reset_at DATETIME NOT NULL,
+    reason TEXT NOT NULL
+);
+
+CREATE VIEW IF NOT EXISTS online_players AS
+SELECT steamid, connected_at, (julianday('now', 'localtime') - julianday(connected_at)) * 86400 AS online_seconds
+FROM player_sessions WHERE disconnected_at IS NULL;
@@ -0,0 +1,7 @@
+-- Último id exportado de cada destino do export.py, para que cada execução exporte apenas os logs novos
+CREATE TABLE IF NOT EXISTS export_watermarks (
+    target TEXT PRIMARY KEY,
+    last_id INTEGER NOT NULL DEFAULT 0,
+    rows INTEGER NOT NULL DEFAULT 0,
+    updated_at DATETIME NOT NULL DEFAULT (datetime('now', 'localtime'))
+);
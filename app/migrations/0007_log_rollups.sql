@@ -0,0 +1,21 @@
+-- Quantidade de logs por período (minuto, hora e dia), tipo de log e pattern, mantida pela gravação dos logs (app/rollups.py)
+-- As contagens possuem a sua própria expiração, então os gráficos continuam disponíveis após a limpeza da tabela logs
+CREATE TABLE IF NOT EXISTS log_rollups (
+    granularity TEXT NOT NULL,
+    bucket DATETIME NOT NULL,
+    log_file_type TEXT NOT NULL,
+    pattern_name TEXT NOT NULL,
+    logs INTEGER NOT NULL DEFAULT 0,
+    steamids INTEGER,
+    PRIMARY KEY (granularity, bucket, log_file_type, pattern_name)
+) WITHOUT ROWID;
+
+-- Steamids de cada período das granularidades com a contagem de steamids distintos
+CREATE TABLE IF NOT EXISTS log_rollup_steamids (
+    granularity TEXT NOT NULL,
+    bucket DATETIME NOT NULL,
+    log_file_type TEXT NOT NULL,
+    pattern_name TEXT NOT NULL,
+    steamid TEXT NOT NULL,
+    PRIMARY KEY (granularity, bucket, log_file_type, pattern_name, steamid)
+) WITHOUT ROWID;
@@ -0,0 +1,18 @@
+-- Linhas originais dos arquivos de log em blocos comprimidos (zlib), pelo nome do arquivo e posição em bytes (app/rawstore.py)
+-- Permite processar novamente o histórico com os patterns atuais (reparse.py), sem os arquivos da pasta Logs
+CREATE TABLE IF NOT EXISTS raw_blocks (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    log_type TEXT NOT NULL,
+    file_name TEXT NOT NULL,
+    start_offset INTEGER NOT NULL,
+    end_offset INTEGER NOT NULL,
+    lines INTEGER NOT NULL DEFAULT 0,
+    first_date DATETIME,
+    last_date DATETIME,
+    data BLOB NOT NULL,
+    created_at DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE UNIQUE INDEX IF NOT EXISTS ix_raw_blocks_file_offset ON raw_blocks (file_name, start_offset);
+CREATE INDEX IF NOT EXISTS ix_raw_blocks_type_date ON raw_blocks (log_type, last_date);
+CREATE INDEX IF NOT EXISTS ix_raw_blocks_created_at ON raw_blocks (created_at);
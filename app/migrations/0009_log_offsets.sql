@@ -0,0 +1,13 @@
+-- Arquivos de log de onde os logs foram lidos, identificados pelo nome do arquivo (data de criação e tipo de log)
+CREATE TABLE IF NOT EXISTS log_sources (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    log_type TEXT NOT NULL,
+    file_name TEXT NOT NULL UNIQUE,
+    created_at DATETIME NOT NULL DEFAULT (datetime('now', 'localtime'))
+);
+
+-- Chave natural de cada log: arquivo, posição da linha no arquivo em bytes e pattern (app/sources.py)
+-- Ler novamente um trecho já gravado não duplica os logs. Os logs gravados antes desta migração ficam sem chave (NULL)
+ALTER TABLE logs ADD COLUMN source_id INTEGER REFERENCES log_sources (id);
+ALTER TABLE logs ADD COLUMN byte_offset INTEGER;
+CREATE UNIQUE INDEX IF NOT EXISTS ix_logs_source_offset ON logs (source_id, byte_offset, pattern_name);
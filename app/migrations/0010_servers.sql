@@ -0,0 +1,36 @@
+-- Servidores da seção [servers]: cada servidor possui um LogFile por tipo de log
+-- Os registros anteriores pertencem ao servidor 'default' (o diretório da seção [path])
+ALTER TABLE log_files ADD COLUMN server TEXT NOT NULL DEFAULT 'default';
+DROP INDEX IF EXISTS ix_log_files_log_type;
+CREATE UNIQUE INDEX IF NOT EXISTS ix_log_files_server_type ON log_files (server, log_type);
+
+ALTER TABLE logs ADD COLUMN server TEXT NOT NULL DEFAULT 'default';
+
+-- Servidores diferentes podem ter arquivos com o mesmo nome (mesma data de início): a chave dos logs passa a ser
+-- única por servidor e nome do arquivo. A tabela é recriada para trocar a restrição UNIQUE, mantendo os ids
+CREATE TABLE IF NOT EXISTS log_sources_new (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    server TEXT NOT NULL DEFAULT 'default',
+    log_type TEXT NOT NULL,
+    file_name TEXT NOT NULL,
+    created_at DATETIME NOT NULL DEFAULT (datetime('now', 'localtime')),
+    UNIQUE (server, file_name)
+);
+INSERT INTO log_sources_new (id, log_type, file_name, created_at) SELECT id, log_type, file_name, created_at FROM log_sources;
+DROP TABLE log_sources;
+ALTER TABLE log_sources_new RENAME TO log_sources;
+
+ALTER TABLE raw_blocks ADD COLUMN server TEXT NOT NULL DEFAULT 'default';
+DROP INDEX IF EXISTS ix_raw_blocks_file_offset;
+CREATE UNIQUE INDEX IF NOT EXISTS ix_raw_blocks_server_file_offset ON raw_blocks (server, file_name, start_offset);
+
+-- As sessões são de cada servidor: o início de um servidor (rotação do log user) encerra apenas as sessões dele
+ALTER TABLE player_sessions ADD COLUMN server TEXT NOT NULL DEFAULT 'default';
+DROP INDEX IF EXISTS ux_player_sessions_online;
+CREATE UNIQUE INDEX IF NOT EXISTS ux_player_sessions_online ON player_sessions (server, steamid) WHERE disconnected_at IS NULL;
+ALTER TABLE player_session_resets ADD COLUMN server TEXT NOT NULL DEFAULT 'default';
+
+DROP VIEW IF EXISTS online_players;
+CREATE VIEW online_players AS
+SELECT steamid, connected_at, (julianday('now', 'localtime') - julianday(connected_at)) * 86400 AS online_seconds, server
+FROM player_sessions WHERE disconnected_at IS NULL;
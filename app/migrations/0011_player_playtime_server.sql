@@ -0,0 +1,13 @@
+-- O tempo de jogo é de cada servidor, como as sessões: a chave passa a ser (server, steamid)
+-- A tabela é recriada para trocar a chave primária; o tempo acumulado antes dos servidores pertence ao servidor 'default'
+CREATE TABLE IF NOT EXISTS player_playtime_new (
+    server TEXT NOT NULL DEFAULT 'default',
+    steamid TEXT NOT NULL,
+    sessions INTEGER NOT NULL DEFAULT 0,
+    playtime REAL NOT NULL DEFAULT 0,
+    last_seen DATETIME,
+    PRIMARY KEY (server, steamid)
+);
+INSERT INTO player_playtime_new (steamid, sessions, playtime, last_seen) SELECT steamid, sessions, playtime, last_seen FROM player_playtime;
+DROP TABLE player_playtime;
+ALTER TABLE player_playtime_new RENAME TO player_playtime;
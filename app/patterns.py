@@ -0,0 +1,174 @@
+# ┓ ┏┓┏┓┳┓┏┓┳┓┳┓┏┓  ┏┓┳┳┓┏┓┳┓┏┓┓
+# ┃ ┣ ┃┃┃┃┣┫┣┫┃┃┃┃  ┣┫┃┃┃┣┫┣┫┣┫┃
+# ┗┛┗┛┗┛┛┗┛┗┛┗┻┛┗┛  ┛┗┛ ┗┛┗┛┗┛┗┗┛
+# Modified: 16/10/2026
+
+import re
+import logging
+from typing import NamedTuple, Optional
+
+logger = logging.getLogger('app.patterns')
+
+class CompiledPattern(NamedTuple):
+    name: str
+    regex: re.Pattern
+    literal: Optional[str]  # Trecho fixo obrigatório em qualquer linha que combine com o regex
+
+QUANTIFIER_RE = re.compile(r'\{(?:\d+|\d*,\d*)\}') # {m}, {m,n}, {m,} e {,n}
+ESCAPE_ARGUMENTS = {'x': 2, 'u': 4, 'U': 8} # Dígitos hexadecimais após o escape
+
+def skip_escape(pattern: str, i: int) -> Optional[int]:
+    """Retorna a posição após o escape alfanumérico em `i` (ex. \\d, \\x41, \\N{...}, \\1, \\012), incluindo o seu argumento.
+    Retorna None se o argumento não for reconhecido."""
+    escaped = pattern[i + 1]
+    i += 2
+    if escaped in ESCAPE_ARGUMENTS:
+        return i + ESCAPE_ARGUMENTS[escaped]
+    if escaped == 'N':
+        end = pattern.find('}', i)
+        return end + 1 if pattern[i:i + 1] == '{' and end >= 0 else None
+    if escaped.isdigit():
+        # Octal ou referência a um grupo: até 3 dígitos no total
+        digits_start = i - 1
+        while i < len(pattern) and i - digits_start < 3 and pattern[i].isdigit():
+            i += 1
+    return i
+
+def extract_literal(pattern: str) -> Optional[str]:
+    """Extrai o maior trecho literal obrigatório do regex, considerando apenas o nível mais externo.
+
+    É conservador: na dúvida o trecho é descartado, e uma sintaxe não reconhecida retorna None, então o literal
+    retornado sempre aparece em qualquer linha que combine com o regex.
+    """
+    runs = []
+    current = ''
+    depth = 0
+    in_class = False
+    i = 0
+
+    while i < len(pattern):
+        char = pattern[i]
+
+        if in_class:
+            if char == ']':
+                in_class = False
+            i += 2 if char == '\\' else 1
+            continue
+
+        literal = None
+        if char == '\\':
+            escaped = pattern[i + 1:i + 2]
+            if not escaped:
+                return None
+            if escaped.isalnum():
+                # Classes (\\d, \\w), âncoras (\\b, \\A), códigos (\\x41, \\u00e9, \\N{...}) e referências (\\1) encerram o trecho
+                i = skip_escape(pattern, i)
+                if i is None:
+                    return None
+            else:
+                literal = escaped
+                i += 2
+        elif char == '[':
+            in_class = True
+            i += 1
+            if pattern[i:i + 1] == '^':
+                i += 1
+            if pattern[i:i + 1] == ']':
+                i += 1 # "]" logo após a abertura faz parte do conjunto
+        elif char == '(':
+            depth += 1
+            i += 1
+        elif char == ')':
+            depth -= 1
+            i += 1
+        elif char == '|':
+            if depth == 0:
+                return None # Alternância no nível externo: nenhum trecho é obrigatório
+            i += 1
+        elif char == '{':
+            quantifier = QUANTIFIER_RE.match(pattern, i)
+            if quantifier is None:
+                return None # "{" literal, não tratado
+            i = quantifier.end()
+        elif char in '.^$*+?}':
+            i += 1
+        else:
+            literal = char
+            i += 1
+
+        if literal is not None and depth == 0 and not in_class:
+            next_char = pattern[i:i + 1]
+            if next_char in ('?', '*', '{'):
+                literal = None # Caractere opcional ou repetido
+            elif next_char == '+':
+                current += literal
+                literal = None
+                runs.append(current)
+                current = ''
+                continue
+
+        if literal is not None and depth == 0:
+            current += literal
+        else:
+            if current:
+                runs.append(current)
+            current = ''
+
+    if current:
+        runs.append(current)
+
+    return max(runs, key=len) if runs else None
+
+class PatternRegistry:
+    """Guarda os regex de cada tipo de log já compilados, com um filtro literal rápido antes do regex."""
+
+    def __init__(self, patterns: dict, default_pattern: dict, prefilter: bool = True) -> None:
+        self.prefilter = prefilter
+        self._source = None
+        self._compiled: dict[str, list[CompiledPattern]] = {}
+        self._default: list[CompiledPattern] = []
+        self.refresh(patterns, default_pattern)
+
+    def refresh(self, patterns: dict, default_pattern: dict) -> bool:
+        """Recompila os patterns apenas se a configuração mudou."""
+        if self._source == (patterns, default_pattern):
+            return False
+
+        self._compiled = {log_type: self._compile(log_patterns) for log_type, log_patterns in patterns.items()}
+        self._default = self._compile(default_pattern)
+        self._source = ({log_type: dict(log_patterns) for log_type, log_patterns in patterns.items()}, dict(default_pattern))
+        logger.debug(f'Patterns compilados para {len(self._compiled)} tipos de log.')
+        return True
+
+    def _compile(self, patterns: dict) -> list[CompiledPattern]:
+        compiled = []
+        for name, pattern in patterns.items():
+            try:
+                regex = re.compile(pattern)
+            except re.error as error:
+                logger.error(f'Pattern "{name}" inválido, será ignorado: {error}')
+                continue
+
+            if 'datetime' not in regex.groupindex:
+                logger.error(f'Pattern "{name}" não possui o grupo de captura "datetime" com a data do log, será ignorado.')
+                continue
+
+            literal = None
+            if self.prefilter and not regex.flags & (re.IGNORECASE | re.VERBOSE):
+                literal = extract_literal(pattern)
+            compiled.append(CompiledPattern(name, regex, literal))
+        return compiled
+
+    def get(self, log_type: str) -> list[CompiledPattern]:
+        return self._compiled.get(log_type) or self._default
+
+    def match(self, log_type: str, line: str) -> list[tuple[str, re.Match]]:
+        """Retorna todos os patterns do tipo de log que combinam com a linha."""
+        matches = []
+        for name, regex, literal in self.get(log_type):
+            if literal is not None and literal not in line:
+                continue
+            match = regex.match(line)
+            if match:
+                matches.append((name, match))
+        return matches
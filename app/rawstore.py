@@ -0,0 +1,238 @@
+# ┓ ┏┓┏┓┳┓┏┓┳┓┳┓┏┓  ┏┓┳┳┓┏┓┳┓┏┓┓
+# ┃ ┣ ┃┃┃┃┣┫┣┫┃┃┃┃  ┣┫┃┃┃┣┫┣┫┣┫┃
+# ┗┛┗┛┗┛┛┗┛┗┛┗┻┛┗┛  ┛┗┛ ┗┛┗┛┗┛┗┗┛
+# Modified: 16/10/2026
+
+import os
+import re
+import time
+import zlib
+import logging
+from datetime import datetime, timedelta
+from typing import Iterator, NamedTuple, Optional
+from sqlalchemy.orm import Session
+from .config import Config
+from .retention import utc_now
+from .timestamps import TimestampDecoder, log_date_decoder
+
+logger = logging.getLogger('app.rawstore')
+config = Config()
+
+DATE_FORMAT = '%Y-%m-%d %H:%M:%S.%f' # Formato das datas gravado pelo SQLAlchemy
+DATE_SCAN_LINES = 100 # Linhas verificadas no início e no fim de um trecho até encontrar uma linha com data
+
+class RawChunk(NamedTuple):
+    """Trecho de linhas completas lido de um arquivo de log, com as datas dos logs com match no trecho."""
+    log_file_id: int
+    server: str
+    log_type: str
+    file_name: str
+    start: int # Posição do início do trecho no arquivo em bytes
+    data: bytes
+    first_date: Optional[datetime]
+    last_date: Optional[datetime]
+
+    @property
+    def end(self) -> int:
+        return self.start + len(self.data)
+
+class OpenBlock:
+    """Último bloco gravado de um LogFile, que continua recebendo as linhas seguintes do mesmo arquivo."""
+
+    def __init__(self, block_id: int, file_name: str, start: int, end: int, compressor) -> None:
+        self.id = block_id
+        self.file_name = file_name
+        self.start = start
+        self.end = end
+        self.compressor = compressor
+
+def decompress_block(data: bytes) -> bytes:
+    """Retorna as linhas originais de um bloco. Os blocos abertos não possuem o fim do fluxo zlib, então
+    são descomprimidos com um decompressobj em vez do zlib.decompress."""
+    return zlib.decompressobj().decompress(data)
+
+def format_date(moment: Optional[datetime]) -> Optional[str]:
+    return moment.strftime(DATE_FORMAT) if moment is not None else None
+
+def _forward_lines(data: bytes) -> Iterator[bytes]:
+    start = 0
+    while start < len(data):
+        end = data.find(b'\n', start)
+        end = len(data) if end == -1 else end
+        yield data[start:end]
+        start = end + 1
+
+def _backward_lines(data: bytes) -> Iterator[bytes]:
+    end = len(data) - 1 if data.endswith(b'\n') else len(data)
+    while end > 0:
+        start = data.rfind(b'\n', 0, end) + 1
+        yield data[start:end]
+        end = start - 1
+
+def _first_date(lines: Iterator[bytes], date_regex: re.Pattern, log_dates: TimestampDecoder) -> Optional[datetime]:
+    for _, line in zip(range(DATE_SCAN_LINES), lines):
+        d_match = date_regex.match(line.decode('utf-8', errors='ignore').strip())
+        if d_match:
+            try:
+                return log_dates.decode(d_match.group('datetime'))
+            except ValueError:
+                continue
+    return None
+
+def line_dates(data: bytes, date_regex: re.Pattern, log_dates: TimestampDecoder) -> tuple[Optional[datetime], Optional[datetime]]:
+    """Datas da primeira e da última linha do trecho com data, pelo pattern [default]. As datas dos blocos não dependem
+    dos patterns de cada tipo, então uma linha sem match continua dentro do período do seu bloco para o reparse."""
+    return _first_date(_forward_lines(data), date_regex, log_dates), _first_date(_backward_lines(data), date_regex, log_dates)
+
+class RawStore:
+    """Guarda as linhas originais lidas dos arquivos de log em blocos comprimidos na tabela raw_blocks.
+
+    Os blocos são identificados pelo servidor, pelo nome do arquivo e pela posição em bytes, e são gravados pelo LogWriter
+    na mesma transação dos logs e dos cursores. Cada trecho lido é comprimido uma única vez: o compressor do
+    último bloco de cada LogFile fica em memória e os novos trechos do mesmo arquivo são adicionados ao final
+    do bloco (Z_SYNC_FLUSH), sem descomprimir nem comprimir novamente o que já foi gravado, até o bloco atingir
+    `block_size` bytes. Após reiniciar ou após um erro na gravação, os trechos seguintes iniciam um novo bloco, sem
+    guardar novamente as linhas de um trecho lido de novo que já estão em um bloco.
+
+    Os blocos expiram `retention` segundos após a gravação (0 mantém para sempre), independente dos logs.
+    """
+
+    def __init__(self, block_size: int = 1024 * 1024, level: int = 6, retention: int = 0, clean_interval: float = 3600, date_pattern: Optional[str] = None) -> None:
+        self.block_size = max(block_size, 1)
+        self.date_regex = re.compile(date_pattern) if date_pattern else None
+        self.log_dates = log_date_decoder()
+        self.level = level
+        self.retention = retention
+        self.clean_interval = clean_interval
+        self.open_blocks: dict[int, OpenBlock] = {}
+        self.last_clean: Optional[float] = None
+
+    def chunk(self, log_file_id: int, server: str, log_type: str, file_path: str, start: int, data: bytes, rows: list[dict]) -> RawChunk:
+        """Monta o trecho lido de um arquivo com as datas das suas linhas e dos logs gerados a partir dele."""
+        data = bytes(data)
+        log_dates = [row['log_date'] for row in rows]
+        if self.date_regex is not None:
+            log_dates.extend(moment for moment in line_dates(data, self.date_regex, self.log_dates) if moment is not None)
+        return RawChunk(
+            log_file_id,
+            server,
+            log_type,
+            os.path.basename(file_path),
+            start,
+            data,
+            min(log_dates) if log_dates else None,
+            max(log_dates) if log_dates else None
+        )
+
+    def merge(self, chunks: list[RawChunk]) -> list[RawChunk]:
+        """Junta os trechos seguidos do mesmo arquivo, para que cada bloco seja atualizado uma vez por lote."""
+        merged: dict[int, list[RawChunk]] = {}
+        for chunk in chunks:
+            pending = merged.setdefault(chunk.log_file_id, [])
+            previous = pending[-1] if pending else None
+            if previous is not None and previous.file_name == chunk.file_name and previous.end == chunk.start:
+                first_dates = [moment for moment in (previous.first_date, chunk.first_date) if moment is not None]
+                last_dates = [moment for moment in (previous.last_date, chunk.last_date) if moment is not None]
+                pending[-1] = previous._replace(
+                    data=previous.data + chunk.data,
+                    first_date=min(first_dates) if first_dates else None,
+                    last_date=max(last_dates) if last_dates else None
+                )
+            else:
+                pending.append(chunk)
+        return [chunk for pending in merged.values() for chunk in pending]
+
+    def split(self, chunk: RawChunk, size: int) -> tuple[RawChunk, Optional[RawChunk]]:
+        """Divide o trecho na última quebra de linha antes de `size` bytes (ou na primeira depois, para uma linha maior)."""
+        if len(chunk.data) <= size:
+            return chunk, None
+        end = chunk.data.rfind(b'\n', 0, size) + 1 or chunk.data.find(b'\n', size) + 1
+        if end <= 0 or end >= len(chunk.data):
+            return chunk, None
+        return self.with_line_dates(chunk._replace(data=chunk.data[:end])), self.with_line_dates(chunk._replace(start=chunk.start + end, data=chunk.data[end:]))
+
+    def with_line_dates(self, chunk: RawChunk) -> RawChunk:
+        """Parte de um trecho dividido com as datas das suas próprias linhas (mantém as do trecho se não encontrar)."""
+        if self.date_regex is None:
+            return chunk
+        first_date, last_date = line_dates(chunk.data, self.date_regex, self.log_dates)
+        return chunk._replace(first_date=first_date or chunk.first_date, last_date=last_date or chunk.last_date)
+
+    def skip_stored(self, connection, chunk: RawChunk) -> Optional[RawChunk]:
+        """Remove do início do trecho as linhas já guardadas em um bloco (trecho lido novamente). Os blocos terminam
+        no fim de uma linha, então o restante do trecho começa na linha seguinte ao bloco."""
+        trimmed = False
+        while True:
+            stored_end = connection.exec_driver_sql(
+                'SELECT max(end_offset) FROM raw_blocks WHERE server = ? AND file_name = ? AND start_offset <= ? AND end_offset > ?',
+                (chunk.server, chunk.file_name, chunk.start, chunk.start)
+            ).scalar()
+            if stored_end is None:
+                return self.with_line_dates(chunk) if trimmed else chunk
+            if stored_end >= chunk.end:
+                return None
+            chunk = chunk._replace(start=stored_end, data=chunk.data[stored_end - chunk.start:])
+            trimmed = True
+
+    def append(self, db: Session, chunks: list[RawChunk]) -> None:
+        """Grava os trechos nos blocos abertos de cada LogFile ou em novos blocos. Não finaliza a transação."""
+        connection = db.connection()
+        for chunk in self.merge(chunks):
+            while chunk is not None:
+                block = self.open_blocks.get(chunk.log_file_id)
+                if block is None or block.file_name != chunk.file_name or block.end != chunk.start or block.end - block.start >= self.block_size:
+                    chunk = self.skip_stored(connection, chunk)
+                    if chunk is None:
+                        break
+                    compressor = zlib.compressobj(self.level)
+                    part, chunk = self.split(chunk, self.block_size)
+                    data = compressor.compress(part.data) + compressor.flush(zlib.Z_SYNC_FLUSH)
+                    block_id = connection.exec_driver_sql(
+                        'INSERT INTO raw_blocks (server, log_type, file_name, start_offset, end_offset, lines, first_date, last_date, data, created_at) '
+                        'VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, CURRENT_TIMESTAMP)',
+                        (part.server, part.log_type, part.file_name, part.start, part.end, part.data.count(b'\n'), format_date(part.first_date), format_date(part.last_date), data)
+                    ).lastrowid
+                    self.open_blocks[part.log_file_id] = OpenBlock(block_id, part.file_name, part.start, part.end, compressor)
+                else:
+                    part, chunk = self.split(chunk, self.block_size - (block.end - block.start))
+                    data = block.compressor.compress(part.data) + block.compressor.flush(zlib.Z_SYNC_FLUSH)
+                    # O operador || do SQLite retorna TEXT, o CAST mantém o bloco como BLOB
+                    connection.exec_driver_sql(
+                        'UPDATE raw_blocks SET data = CAST(data || ? AS BLOB), end_offset = ?, lines = lines + ?, '
+                        'first_date = coalesce(first_date, ?), last_date = coalesce(?, last_date) WHERE id = ?',
+                        (data, part.end, part.data.count(b'\n'), format_date(part.first_date), format_date(part.last_date), block.id)
+                    )
+                    block.end = part.end
+
+    def reset(self) -> None:
+        """Descarta os compressores dos blocos abertos (após um rollback), iniciando novos blocos na próxima gravação."""
+        self.open_blocks.clear()
+
+    def is_clean_due(self) -> bool:
+        return self.retention > 0 and (self.last_clean is None or time.monotonic() - self.last_clean >= self.clean_interval)
+
+    def clean(self, db: Session) -> int:
+        """Remove os blocos gravados há mais de `retention` segundos. Retorna os blocos removidos."""
+        self.last_clean = time.monotonic()
+        cutoff = utc_now() - timedelta(seconds=self.retention)
+        try:
+            deleted = db.connection().exec_driver_sql('DELETE FROM raw_blocks WHERE created_at < ?', (cutoff.strftime('%Y-%m-%d %H:%M:%S'),)).rowcount
+            db.commit()
+        except BaseException:
+            db.rollback()
+            raise
+
+        if deleted:
+            self.reset() # O bloco aberto de um LogFile pode ter sido removido
+            logger.info(f'{deleted} blocos de linhas originais expirados removidos.')
+        return deleted
+
+def create_raw_store() -> RawStore:
+    """Cria o RawStore com as opções da seção [raw_store]."""
+    return RawStore(
+        config.raw_store_block_size,
+        config.raw_store_level,
+        config.raw_store_retention,
+        config.raw_store_clean_interval,
+        config.default_pattern.get('default')
+    )
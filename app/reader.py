@@ -1,104 +1,249 @@
 # ┓ ┏┓┏┓┳┓┏┓┳┓┳┓┏┓  ┏┓┳┳┓┏┓┳┓┏┓┓ 
 # ┃ ┣ ┃┃┃┃┣┫┣┫┃┃┃┃  ┣┫┃┃┃┣┫┣┫┣┫┃ 
 # ┗┛┗┛┗┛┛┗┛┗┛┗┻┛┗┛  ┛┗┛ ┗┛┗┛┗┛┗┗┛
-# Modified: 23/09/2024
+# Modified: 16/10/2026
 
 import os
-import re
 import time
 import json
 import logging
-from datetime import datetime, timedelta
+import threading
+from collections import Counter
 from sqlalchemy.orm import Session
-from typing import Optional
+from typing import Iterable, Optional
 from .config import Config
-from .database import Database, LogFile, Log
+from .database import Database, LogFile
+from .writer import LogWriter
+from .patterns import PatternRegistry
+from .watcher import create_watcher
+from .retention import RetentionEngine, RetentionReport
+from .timestamps import log_date_decoder
+from .storage import TypedStorage
+from .search import table_change_hook
+from .sessions import create_tracker
+from .rollups import create_rollups
+from .rawstore import create_raw_store
+from .filereader import LogFileReader, complete_lines_end, decode_lines, line_offsets
+from .metrics import Metrics, current_rss_bytes, format_bytes
+from .logger import AggregatedWarning
+from .scanner import LogScanner, LogFileEntry, FINGERPRINT_SIZE, file_fingerprint, log_label
 
 logger = logging.getLogger('app.reader')
 config = Config()
 database = Database()
+metrics = Metrics()
+
+FULL_SYNC_INTERVAL = 60 # Segundos entre as verificações de todos os servidores com o inotify
 
 class Reader:
     def __init__(self):
         self.keyboard_interrupt = False
-        self.cached_logfiles = {}
+        self.cached_logfiles: dict[tuple[str, str], LogFileEntry] = {} # (servidor, tipo de log): arquivo mais recente
+        self.scanners = {server: LogScanner(path, server) for server, path in config.servers.items()}
+        self.backlog_servers: set[str] = set() # Servidores com linhas pendentes no último looping
+        self.last_full_sync: Optional[float] = None
+        self.writer = LogWriter(
+            config.app_write_batch_size,
+            config.app_write_batch_interval,
+            storage=TypedStorage(config.pattern_types, table_change_hook()) if config.app_storage == 'typed' else None,
+            sessions=create_tracker() if config.sessions_enabled else None,
+            rollups=create_rollups() if config.rollups_enabled else None,
+            raw_store=create_raw_store() if config.raw_store_enabled else None
+        )
+        self.patterns = PatternRegistry(config.patterns, config.default_pattern)
+        self.log_dates = log_date_decoder()
+        self.file_readers: dict[int, LogFileReader] = {}
+        self.file_readers_lock = threading.Lock() # O modo async lê os arquivos em threads
+        self.retention = RetentionEngine(
+            config.app_expiration_time,
+            config.retention_rules,
+            interval=config.retention_interval,
+            batch_size=config.retention_batch_size,
+            batch_pause=config.retention_batch_pause,
+            archive_dir=config.retention_archive_dir
+        )
+        self.last_retention: Optional[RetentionReport] = None
+        self.generations: dict[int, int] = {} # Incrementado quando o LogFile passa a acompanhar outro arquivo
+        self.watcher = None
+        self.has_backlog = False
+        self.last_latency = None
+        self.last_checkpoint = time.monotonic()
+        self.last_optimize = time.monotonic()
+        self.last_memory_report = time.monotonic()
+        self.unmatched = AggregatedWarning( # Avisos de linhas sem match agrupados por tipo de log
+            logger,
+            'Nenhum match para %s, linha: %s',
+            'Nenhum match para %s: %d linhas nos últimos %.0f segundos',
+            interval=config.logging_unmatched_interval,
+            samples=config.logging_unmatched_samples
+        )
 
     def check_exit(self) -> bool:
         return self.keyboard_interrupt
 
-    def update_cached_logsfiles(self) -> None:
-        logger.debug(f'Verificando se os logfiles em cache precisam de atualização.')
-        if not os.path.exists(config.path_zomboid_logs):
-            logger.error(f'O diretório "{config.path_zomboid_logs}" não foi encontrado.')
-            return
-        
-        for f_name in os.listdir(config.path_zomboid_logs):
-            f_fullpath = os.path.join(config.path_zomboid_logs, f_name)
-
-            if f_name.endswith('.txt'):
-                f_match = re.match(r'^(\d{2}-\d{2}-\d{2}_\d{2}-\d{2}-\d{2})_(.+)\.txt$', f_name)
-                
-                if f_match:
-                    f_datetime = datetime.strptime(f_match.group(1), '%d-%m-%y_%H-%M-%S')
-                    f_type = f_match.group(2)
-
-                    f_mtime = datetime.fromtimestamp(os.path.getmtime(f_fullpath))
-                    f_ctime = datetime.fromtimestamp(os.path.getctime(f_fullpath))
-                    f_size = os.path.getsize(f_fullpath)
-
-                    logfile = LogFile(
-                        log_date=f_datetime,
-                        log_type=f_type,
-                        file_name=f_name,
-                        file_path=f_fullpath,
-                        last_modified=f_mtime,
-                        creation_time=f_ctime,
-                        file_size=f_size,
-                        patterns=config.patterns.get(f_type, '{}')
-                    )
-
-                    if logfile.log_type in self.cached_logfiles:
-                        cached_logfile: LogFile = self.cached_logfiles[logfile.log_type]
-                        if cached_logfile.is_older_than(logfile):
-                            logger.debug(f'Logfile {cached_logfile.log_type} está desatualizado. Substituindo pelo logfile mais atual.')
-                            self.cached_logfiles[logfile.log_type] = logfile
-                    else:
-                        logger.debug(f'Logfile {logfile.log_type} não está em cache. Adicionando ao cache.')
-                        self.cached_logfiles[logfile.log_type] = logfile
+    def servers_to_sync(self) -> list[str]:
+        """Servidores verificados no looping: com o inotify, apenas os com arquivos alterados ou linhas pendentes,
+        então os servidores sem escritas não custam nada aos loopings. Todos são verificados a cada FULL_SYNC_INTERVAL."""
+        changes = self.watcher.changes() if self.watcher is not None else None
+        now = time.monotonic()
+        if changes is None or self.last_full_sync is None or now - self.last_full_sync >= FULL_SYNC_INTERVAL:
+            self.last_full_sync = now
+            return list(self.scanners)
+        return [server for server, scanner in self.scanners.items() if scanner.path in changes or server in self.backlog_servers]
+
+    def watch_timeout(self) -> float:
+        """Tempo máximo de espera do watcher entre os loopings. Com o inotify o looping fica bloqueado no descritor até
+        um evento ou a próxima verificação de todos os servidores (FULL_SYNC_INTERVAL), sem acordar a cada
+        reading_frequency em um servidor sem escritas; com polling, aguarda reading_frequency."""
+        if self.watcher is None or self.watcher.name != 'inotify':
+            return config.app_reading_frequency
+        if self.last_full_sync is None:
+            return 0
+        return max(0.0, self.last_full_sync + FULL_SYNC_INTERVAL - time.monotonic())
+
+    def query_logfiles(self, db: Session, servers: Optional[Iterable[str]] = None) -> list[LogFile]:
+        """LogFiles dos servidores informados (padrão: todos os configurados). Os LogFiles de um servidor removido
+        da seção [servers] continuam na database, sem leitura."""
+        return db.query(LogFile).filter(LogFile.server.in_(list(self.scanners if servers is None else servers))).all()
+
+    def update_cached_logsfiles(self, servers: Optional[Iterable[str]] = None) -> None:
+        logger.debug('Verificando se os logfiles em cache precisam de atualização.')
+        for server in self.scanners if servers is None else servers:
+            scanner = self.scanners[server]
+            if not os.path.exists(scanner.path):
+                logger.error(f'O diretório "{scanner.path}" do servidor "{server}" não foi encontrado.')
+                continue
+
+            try:
+                entries = scanner.scan()
+            except OSError as error:
+                logger.exception(f'Erro ao verificar o diretório de logs do servidor "{server}": {error}')
+                continue
+
+            for key in [key for key in self.cached_logfiles if key[0] == server and key[1] not in entries]:
+                del self.cached_logfiles[key]
+            for log_type, entry in entries.items():
+                self.cached_logfiles[(server, log_type)] = entry
 
         logger.debug('Verificação e atualização dos logfiles em cache concluída.')
 
-    def update_database_logfiles(self, db: Session) -> None:
+    def _set_logfile_entry(self, db_logfile: LogFile, entry: LogFileEntry) -> None:
+        db_logfile.log_date = entry.log_date
+        db_logfile.log_type = entry.log_type
+        db_logfile.file_name = entry.file_name
+        db_logfile.file_path = entry.file_path
+        db_logfile.last_modified = entry.last_modified
+        db_logfile.file_size = entry.file_size
+        db_logfile.creation_time = entry.creation_time
+        db_logfile.file_dev = entry.file_dev
+        db_logfile.file_ino = entry.file_ino
+
+    def _switch_logfile(self, db: Session, db_logfile: LogFile, entry: LogFileEntry) -> None:
+        """Passa o LogFile a acompanhar o arquivo informado, lendo-o desde o início."""
+        if db_logfile.id in self.writer.cursors:
+            self.writer.flush(db) # Grava as linhas pendentes do arquivo anterior antes de mover o cursor
+
+        logger.info(f'LogFile {db_logfile.label}: iniciando a leitura de "{entry.file_name}" (anterior: "{db_logfile.file_name}").')
+        sessions = self.writer.sessions
+        if sessions is not None and sessions.is_session_log_type(db_logfile.log_type):
+            sessions.close_all(db, db_logfile.last_modified, db_logfile.server) # Um novo arquivo de log a cada início do servidor
+        self.generations[db_logfile.id] = self.generations.get(db_logfile.id, 0) + 1
+        self._set_logfile_entry(db_logfile, entry)
+        db_logfile.cursor_position = 0
+        db_logfile.fingerprint, db_logfile.fingerprint_size = file_fingerprint(entry.file_path)
+
+    def _locate_logfile(self, db_logfile: LogFile) -> Optional[LogFileEntry]:
+        """Localiza o arquivo acompanhado pelo LogFile, mesmo que tenha sido renomeado dentro do diretório."""
+        scanner = self.scanners[db_logfile.server]
+        entry = scanner.get_entry(db_logfile.file_path)
+        if entry is not None and (entry.file_dev, entry.file_ino) == (db_logfile.file_dev, db_logfile.file_ino):
+            return entry
+
+        if db_logfile.file_ino is not None:
+            renamed = scanner.find_by_identity(db_logfile.log_type, db_logfile.file_dev, db_logfile.file_ino)
+            if renamed is not None:
+                return renamed
+
+        return entry
+
+    def _is_same_file(self, db_logfile: LogFile, entry: LogFileEntry) -> bool:
+        """Verifica se o arquivo é o mesmo acompanhado pelo LogFile, pelo inode e pelo hash do início do arquivo."""
+        if (entry.file_dev, entry.file_ino) != (db_logfile.file_dev, db_logfile.file_ino):
+            return False
+
+        fingerprint, fingerprint_size = file_fingerprint(entry.file_path, db_logfile.fingerprint_size or 0)
+        return fingerprint_size == (db_logfile.fingerprint_size or 0) and fingerprint == db_logfile.fingerprint
+
+    def _sync_logfile(self, db: Session, db_logfile: LogFile, newest: LogFileEntry) -> None:
+        scanner = self.scanners[db_logfile.server]
+        current = self._locate_logfile(db_logfile)
+
+        if current is None:
+            unread = max(db_logfile.file_size - db_logfile.cursor_position, 0)
+            logger.warning(f'O arquivo "{db_logfile.file_path}" do LogFile {db_logfile.label} não foi encontrado, {unread} bytes podem não ter sido lidos.')
+            self._switch_logfile(db, db_logfile, scanner.next_entry(db_logfile.log_type, db_logfile.log_date) or newest)
+            return
+
+        if db_logfile.file_ino is None:
+            # LogFile criado antes do controle de identidade dos arquivos: adota o arquivo atual
+            self._set_logfile_entry(db_logfile, current)
+            db_logfile.fingerprint, db_logfile.fingerprint_size = file_fingerprint(current.file_path)
+
+        elif db_logfile.has_changed(current):
+            if not self._is_same_file(db_logfile, current):
+                logger.warning(f'O arquivo "{current.file_path}" do LogFile {db_logfile.label} foi substituído, a leitura será reiniciada do início.')
+                self._switch_logfile(db, db_logfile, current)
+                return
+
+            if current.file_size < self.writer.get_cursor(db_logfile.id, db_logfile.cursor_position):
+                logger.warning(f'O arquivo "{current.file_path}" do LogFile {db_logfile.label} foi truncado, a leitura será reiniciada do início.')
+                self._switch_logfile(db, db_logfile, current)
+                return
+
+            logger.debug('Logfile %s está desatualizado. Atualizando informações.', db_logfile.label)
+            self._set_logfile_entry(db_logfile, current)
+            if (db_logfile.fingerprint_size or 0) < FINGERPRINT_SIZE:
+                db_logfile.fingerprint, db_logfile.fingerprint_size = file_fingerprint(current.file_path)
+
+        # Arquivo rotacionado: só passa para o próximo arquivo depois de ler todo o conteúdo
+        if (current.file_dev, current.file_ino) != (newest.file_dev, newest.file_ino):
+            if self.writer.get_cursor(db_logfile.id, db_logfile.cursor_position) >= current.file_size:
+                self._switch_logfile(db, db_logfile, scanner.next_entry(db_logfile.log_type, current.log_date) or newest)
+
+    def update_database_logfiles(self, db: Session, servers: Optional[Iterable[str]] = None) -> None:
         logger.debug('Verificando se os logfiles da database presisam de atualização.')
         try:
-            db_logfiles: list[LogFile] = db.query(LogFile).all()
+            servers = set(self.scanners if servers is None else servers)
+            db_logfiles = self.query_logfiles(db, servers)
 
-            db_logfiles_map = {db_logfile.log_type: db_logfile for db_logfile in db_logfiles}
+            db_logfiles_map = {(db_logfile.server, db_logfile.log_type): db_logfile for db_logfile in db_logfiles}
 
             for db_logfile in db_logfiles:
-                if not os.path.exists(db_logfile.file_path):
-                    logger.info(f'LogFile {db_logfile.log_type} removido, devido ao arquivo de log estar ausente: "{db_logfile.file_path}".')
+                key = (db_logfile.server, db_logfile.log_type)
+                if key not in self.cached_logfiles and not os.path.exists(db_logfile.file_path):
+                    logger.info(f'LogFile {db_logfile.label} removido, devido ao arquivo de log estar ausente: "{db_logfile.file_path}".')
+                    self.writer.discard(db_logfile.id)
                     db.delete(db_logfile)
-                    db_logfiles.remove(db_logfile)
+                    del db_logfiles_map[key]
+                    continue
                 if not db_logfile.patterns:
-                    logger.warning(f'LogFile {db_logfile.log_type} estava com patterns vazio. Foi definido um novo pattern.')
+                    logger.warning(f'LogFile {db_logfile.label} estava com patterns vazio. Foi definido um novo pattern.')
                     db_logfile.set_patterns(config.patterns.get(db_logfile.log_type, '{}'))
 
-            for cached_logfile in self.cached_logfiles.values():
-                if cached_logfile.log_type in db_logfiles_map:
-                    db_logfile: LogFile = db_logfiles_map[cached_logfile.log_type]
-                    if cached_logfile.has_changed(db_logfile):
-                        logger.debug(f'Logfile {db_logfile.log_type} está desatualizado. Atualizando informações.')
-                        db_logfile.log_date = cached_logfile.log_date
-                        db_logfile.log_type = cached_logfile.log_type
-                        db_logfile.file_name = cached_logfile.file_name
-                        db_logfile.file_path = cached_logfile.file_path
-                        db_logfile.last_modified = cached_logfile.last_modified
-                        db_logfile.file_size = cached_logfile.file_size
-                        db_logfile.creation_time = cached_logfile.creation_time
+            for key, cached_logfile in self.cached_logfiles.items():
+                if cached_logfile.server not in servers:
+                    continue
+                if key in db_logfiles_map:
+                    self._sync_logfile(db, db_logfiles_map[key], cached_logfile)
                 else:
-                    logger.debug(f'Logfile {cached_logfile.log_type} não encontrado na database. Adicionando à database.')
-                    db.add(cached_logfile)
+                    logger.debug('Logfile %s não encontrado na database. Adicionando à database.', log_label(*key))
+                    fingerprint, fingerprint_size = file_fingerprint(cached_logfile.file_path)
+                    db.add(LogFile(
+                        **cached_logfile._asdict(),
+                        patterns=config.patterns.get(cached_logfile.log_type, '{}'),
+                        fingerprint=fingerprint,
+                        fingerprint_size=fingerprint_size
+                    ))
             
             db.commit()
 
@@ -112,80 +257,130 @@ class Reader:
         finally:
             logger.debug('Verificação e atualização dos logfiles da database concluída.')
 
-    def _read_log(self, path: str, seek: int, encoding: str = 'utf-8') -> tuple[Optional[str], int]:
+    def _get_file_reader(self, db_logfile: LogFile) -> LogFileReader:
+        """Retorna o leitor aberto do arquivo acompanhado pelo LogFile, criando um novo se o arquivo mudou."""
+        previous = None
+        with self.file_readers_lock:
+            file_reader = self.file_readers.get(db_logfile.id)
+            if file_reader is None or file_reader.path != db_logfile.file_path:
+                previous = file_reader
+                file_reader = self.file_readers[db_logfile.id] = LogFileReader(db_logfile.file_path)
+        if previous is not None:
+            previous.close()
+        return file_reader
+
+    def close_file_reader(self, log_file_id: int, file_reader: Optional[LogFileReader] = None) -> None:
+        """Fecha o arquivo aberto do LogFile (apenas se ainda for `file_reader`, quando informado)."""
+        with self.file_readers_lock:
+            current = self.file_readers.get(log_file_id)
+            if current is None or (file_reader is not None and current is not file_reader):
+                return
+            del self.file_readers[log_file_id]
+        current.close() # Fora do lock: aguarda uma leitura em andamento do arquivo
+
+    def close_file_readers(self, keep: Optional[set[int]] = None) -> None:
+        """Fecha os arquivos abertos, exceto os dos LogFiles em `keep`."""
+        with self.file_readers_lock:
+            closed = [self.file_readers.pop(log_file_id) for log_file_id in list(self.file_readers) if keep is None or log_file_id not in keep]
+        for file_reader in closed:
+            file_reader.close()
+
+    def _read_log_lines(self, db_logfile: LogFile, seek: int, max_lines: int = 0, max_bytes: int = 0, final: bool = False, encoding: str = 'utf-8') -> tuple[Optional[list[str]], int, bytes]:
+        """Lê as linhas completas a partir de `seek`, respeitando os limites de linhas e bytes (0 = sem limite).
+        Uma linha incompleta no final do arquivo é mantida para o próximo ciclo, exceto se o arquivo
+        não receber mais escritas (`final`, ex. arquivo rotacionado). Retorna também os bytes das linhas lidas."""
+        file_reader = None
         try:
-            with open(path, 'rb') as f:
-                f.seek(seek)
-                line_bytes = f.readline()
-                return line_bytes.decode(encoding=encoding, errors='ignore'), seek + len(line_bytes)
-            
-        except UnicodeDecodeError as error:
-            logger.exception(f'Erro ao tentar decodificar linha lida a partir do arquivo de log "{path}" com a posição do cursor iniciando em {seek}: {error}')
-            return None, seek
+            identity = (db_logfile.file_dev, db_logfile.file_ino) if db_logfile.file_ino is not None else None
+            file_reader = self._get_file_reader(db_logfile)
+            data, at_eof = file_reader.read(seek, max_bytes, identity)
+            end = complete_lines_end(data, max_lines, final and at_eof)
+            return decode_lines(data, end, encoding), seek + end, memoryview(data)[:end]
+
         except PermissionError as error:
             logger.exception(f'Permissões insuficientes para ler arquivo de log: {error}')
-            return None, seek
         except FileNotFoundError as error:
             logger.exception(f'Arquivo de log não encontrado: {error}')
-            return None, seek
         except Exception as error:
             logger.exception(f'Erro ao ler arquivo de log: {error}')
-            return None, seek
-            
+
+        if file_reader is not None:
+            self.close_file_reader(db_logfile.id, file_reader) # Reabre o arquivo na próxima tentativa
+        return None, seek, b''
 
     def read_logs(self, db: Session) -> None:
         logger.debug('Iniciando leitura dos arquivos de log.')
         try:
-            db_logfiles = db.query(LogFile).all()
+            self.has_backlog = False
+            self.backlog_servers = set()
+            read_seconds = match_seconds = serialize_seconds = 0.0
+            db_logfiles = self.query_logfiles(db)
+            self.patterns.refresh(config.patterns, config.default_pattern)
 
             if not db_logfiles:
                 logger.info('Nenhum logfile encontrado para leitura.')
                 return
 
             for db_logfile in db_logfiles:
-                if db_logfile.cursor_position == db_logfile.file_size:
-                    logger.debug(f'Não existem novos logs para ler em "{db_logfile.log_type}".')
+                cursor_position = self.writer.get_cursor(db_logfile.id, db_logfile.cursor_position)
+
+                if cursor_position >= db_logfile.file_size:
+                    logger.debug('Não existem novos logs para ler em "%s".', db_logfile.label)
                     continue
 
-                log_line, new_cursor_position = self._read_log(db_logfile.file_path, db_logfile.cursor_position)
+                newest = self.cached_logfiles.get((db_logfile.server, db_logfile.log_type))
+                is_rotated = newest is not None and (newest.file_dev, newest.file_ino) != (db_logfile.file_dev, db_logfile.file_ino)
 
-                if log_line is not None:
-                    log_line = log_line.strip()
-                    logger.debug(f'Linha lida do logfile {db_logfile.log_type} de {db_logfile.cursor_position} até {new_cursor_position} de {db_logfile.file_size}: {log_line}')
-                    
-                    patterns = db_logfile.get_patterns() or config.default_pattern
-                    logger.debug(f'LogFile {db_logfile.log_type} utilizando {patterns}.')
-
-                    match_found = False
-                    for pattern_name, pattern in patterns.items():
-                        match = re.match(pattern, log_line)
-
-                        if match:
-                            match_found = True
-                            groups_dict = match.groupdict()
-                            logger.debug(groups_dict)
-
-                            try:
-                                json_data = json.dumps(groups_dict)
-                            except Exception as error:
-                                logger.exception(f'Erro ao serializar groups_dict para JSON: {error}')
-                                json_data = '{}'
-
-                            log = Log(
-                                pattern_name=pattern_name,
-                                log_file_id=db_logfile.id,
-                                log_file_type=db_logfile.log_type,
-                                log_date=datetime.strptime(match.group(1), '%d-%m-%y %H:%M:%S.%f'),
-                                json_data=json_data
-                            )
-
-                            db.add(log)              
-
-                    if not match_found:
-                        logger.warning(f'Nenhum match para {db_logfile.log_type}, linha: {log_line}')
-
-                db_logfile.cursor_position = new_cursor_position
-                db.commit()
+                read_started = time.perf_counter()
+                log_lines, new_cursor_position, raw_data = self._read_log_lines(
+                    db_logfile,
+                    cursor_position,
+                    config.app_max_lines_per_cycle,
+                    config.app_max_bytes_per_cycle,
+                    final=is_rotated
+                )
+                read_seconds += time.perf_counter() - read_started
+
+                if log_lines is None or new_cursor_position == cursor_position:
+                    continue
+
+                rows = []
+                if log_lines:
+                    logger.debug('%s linhas lidas do logfile %s de %s até %s de %s.', len(log_lines), db_logfile.label, cursor_position, new_cursor_position, db_logfile.file_size)
+                    match_started = time.perf_counter()
+                    matched, unmatched = self.match_lines(db_logfile.log_type, log_lines)
+                    serialize_started = time.perf_counter()
+                    rows = self.build_rows(db_logfile.id, db_logfile.server, db_logfile.log_type, matched, db_logfile.file_path, line_offsets(raw_data, cursor_position))
+
+                    if metrics.enabled:
+                        serialize_seconds += time.perf_counter() - serialize_started
+                        match_seconds += serialize_started - match_started
+                        self.record_lines(db_logfile.server, db_logfile.log_type, len(log_lines), new_cursor_position - cursor_position, matched, unmatched)
+
+                raw = None
+                if self.writer.raw_store is not None:
+                    raw = self.writer.raw_store.chunk(db_logfile.id, db_logfile.server, db_logfile.log_type, db_logfile.file_path, cursor_position, raw_data, rows)
+                self.writer.add(db_logfile.id, new_cursor_position, rows, raw)
+
+                if new_cursor_position < db_logfile.file_size or is_rotated:
+                    self.has_backlog = True # O limite por ciclo foi atingido antes do fim do arquivo ou há um arquivo mais novo
+                    self.backlog_servers.add(db_logfile.server)
+
+                if self.writer.is_full():
+                    self.writer.flush(db)
+
+            if self.writer.is_due():
+                self.writer.flush(db)
+
+            self.close_file_readers(keep={db_logfile.id for db_logfile in db_logfiles})
+
+            if metrics.enabled:
+                metrics.observe_stage('read_logs_read', read_seconds)
+                metrics.observe_stage('read_logs_match', match_seconds)
+                metrics.observe_stage('read_logs_serialize', serialize_seconds)
+                for db_logfile in db_logfiles:
+                    lag = db_logfile.file_size - self.writer.get_cursor(db_logfile.id, db_logfile.cursor_position)
+                    metrics.set('pzla_lag_bytes', max(lag, 0), server=db_logfile.server, log_type=db_logfile.log_type)
 
         except KeyboardInterrupt:
                 db.rollback()
@@ -197,32 +392,183 @@ class Reader:
         finally:
             logger.debug('Leitura dos arquivos de log concluída.')
 
+    def match_lines(self, log_type: str, log_lines: list[str]) -> tuple[list[tuple[str, dict, int]], int]:
+        """Aplica os patterns do tipo em cada linha. Retorna o pattern, os grupos e o índice da linha de cada match
+        e a quantidade de linhas sem match."""
+        debug_lines = logger.isEnabledFor(logging.DEBUG)
+        matched: list[tuple[str, dict, int]] = []
+        unmatched = 0
+
+        for index, log_line in enumerate(log_lines):
+            log_line = log_line.strip()
+            if debug_lines:
+                logger.debug('Linha lida do logfile %s: %s', log_type, log_line)
+
+            matches = self.patterns.match(log_type, log_line)
+            for pattern_name, match in matches:
+                groups_dict = match.groupdict()
+                if debug_lines:
+                    logger.debug('%s', groups_dict)
+                matched.append((pattern_name, groups_dict, index))
+
+            if not matches:
+                unmatched += 1
+                self.unmatched.add(log_type, log_line)
+
+        return matched, unmatched
+
+    def build_rows(self, log_file_id: int, server: str, log_type: str, matched: list[tuple[str, dict, int]], file_path: str, offsets: list[int]) -> list[dict]:
+        """Monta as linhas da tabela logs a partir dos grupos de cada match, serializando-os em JSON no modo json.
+        Cada linha recebe a chave do log: o servidor, o nome do arquivo e a posição da linha (`offsets`, pelo índice da linha)."""
+        rows = []
+        file_name = os.path.basename(file_path)
+        for pattern_name, groups_dict, index in matched:
+            row = {
+                'pattern_name': pattern_name,
+                'log_file_id': log_file_id,
+                'log_file_type': log_type,
+                'server': server,
+                'log_date': self.log_dates.decode(groups_dict['datetime']),
+                'json_data': '',
+                'file_name': file_name,
+                'byte_offset': offsets[index]
+            }
+
+            if self.writer.storage is not None:
+                row['data'] = groups_dict # Gravado nas tabelas tipadas, sem serializar
+            else:
+                try:
+                    row['json_data'] = json.dumps(groups_dict)
+                except Exception as error:
+                    logger.exception(f'Erro ao serializar groups_dict para JSON: {error}')
+                    row['json_data'] = '{}'
+
+            rows.append(row)
+        return rows
+
+    def record_lines(self, server: str, log_type: str, lines: int, bytes_read: int, matched: list[tuple[str, dict]], unmatched: int) -> None:
+        """Registra nas métricas as linhas de um trecho lido, uma vez por trecho."""
+        metrics.inc('pzla_lines_read_total', lines, server=server, log_type=log_type)
+        metrics.inc('pzla_bytes_read_total', bytes_read, server=server, log_type=log_type)
+        metrics.inc('pzla_lines_unmatched_total', unmatched, server=server, log_type=log_type)
+        for pattern_name, count in Counter(match[0] for match in matched).items():
+            metrics.inc('pzla_lines_matched_total', count, server=server, log_type=log_type, pattern=pattern_name)
+
     def clean_logs(self, db: Session) -> None:
-        if config.app_expiration_time and config.app_expiration_time > 0:
-            logger.debug('Iniciando limpeza dos logs.')
-            try:
-                cutoff_time = datetime.now() - timedelta(seconds=config.app_expiration_time)
-                deleted_logs_count = db.query(Log).filter(Log.created_at < cutoff_time).delete()
-                db.commit()  
+        """Remove os logs expirados pelo RetentionEngine, que possui o seu próprio intervalo de execução."""
+        if not self.retention.is_due():
+            return
 
-                if deleted_logs_count > 0:
-                    logger.info(f'Limpeza concluída: {deleted_logs_count} logs deletados.')
-                else:
-                    logger.debug('Nenhum log a ser deletado.')
-            except KeyboardInterrupt:
-                db.rollback()
-                self.keyboard_interrupt = True
-                logger.warning('Combinação CTRL + C pressionada. Preparando para encerrar com segurança...')
-            except Exception as error:
-                logger.exception(f'Erro ao limpar logs: {error}')
-                db.rollback()
-            finally:
-                logger.debug('Limpeza dos logs concluída.')
+        logger.debug('Iniciando limpeza dos logs.')
+        try:
+            self.last_retention = self.retention.run(db)
+            metrics.observe_stage('clean_logs', self.last_retention.elapsed)
+            metrics.inc('pzla_logs_deleted_total', self.last_retention.deleted)
+            metrics.inc('pzla_logs_archived_total', self.last_retention.archived)
+        except KeyboardInterrupt:
+            db.rollback()
+            self.keyboard_interrupt = True
+            logger.warning('Combinação CTRL + C pressionada. Preparando para encerrar com segurança...')
+        except Exception as error:
+            logger.exception(f'Erro ao limpar logs: {error}')
+            db.rollback()
+        finally:
+            logger.debug('Limpeza dos logs concluída.')
+
+    def clean_rollups(self, db: Session) -> None:
+        """Remove os períodos expirados dos rollups, com o intervalo e a expiração da seção [rollups]."""
+        rollups = self.writer.rollups
+        if rollups is None or not rollups.is_clean_due():
+            return
+
+        try:
+            rollups.clean(db)
+        except KeyboardInterrupt:
+            self.keyboard_interrupt = True
+            logger.warning('Combinação CTRL + C pressionada. Preparando para encerrar com segurança...')
+        except Exception as error:
+            logger.exception(f'Erro ao limpar os rollups: {error}')
+
+    def clean_raw_store(self, db: Session) -> None:
+        """Remove os blocos de linhas originais expirados, com o intervalo e a expiração da seção [raw_store]."""
+        raw_store = self.writer.raw_store
+        if raw_store is None or not raw_store.is_clean_due():
+            return
+
+        try:
+            raw_store.clean(db)
+        except KeyboardInterrupt:
+            self.keyboard_interrupt = True
+            logger.warning('Combinação CTRL + C pressionada. Preparando para encerrar com segurança...')
+        except Exception as error:
+            logger.exception(f'Erro ao limpar os blocos de linhas originais: {error}')
+
+    def run_maintenance(self) -> None:
+        """Executa periodicamente o checkpoint do WAL e o PRAGMA optimize."""
+        now = time.monotonic()
+        try:
+            if config.database_journal_mode == 'WAL' and config.database_checkpoint_interval > 0 and now - self.last_checkpoint >= config.database_checkpoint_interval:
+                self.last_checkpoint = now
+                database.checkpoint()
+            if config.database_optimize_interval > 0 and now - self.last_optimize >= config.database_optimize_interval:
+                self.last_optimize = now
+                database.optimize()
+        except KeyboardInterrupt:
+            self.keyboard_interrupt = True
+            logger.warning('Combinação CTRL + C pressionada. Preparando para encerrar com segurança...')
+        except Exception as error:
+            logger.exception(f'Erro durante a manutenção da database: {error}')
+
+    def release_session(self, db: Session) -> None:
+        """Encerra a transação e descarta os objetos carregados no looping, mantendo a sessão para o próximo.
+
+        Os LogFile são lidos novamente a cada looping e os logs são gravados sem objetos ORM, então nenhum estado da
+        sessão precisa sobreviver entre os loopings: o identity map não cresce com o tempo de execução e a transação
+        de leitura não fica aberta durante a espera (o que impediria os checkpoints do WAL).
+        """
+        try:
+            if db.dirty or db.new or db.deleted:
+                db.commit()
+        except KeyboardInterrupt:
+            db.rollback()
+            self.keyboard_interrupt = True
+            logger.warning('Combinação CTRL + C pressionada. Preparando para encerrar com segurança...')
+        except Exception as error:
+            logger.exception(f'Erro ao commitar alterações pendentes do looping: {error}')
+            db.rollback()
+        finally:
+            db.close()
+
+    def report_memory(self) -> None:
+        """Registra periodicamente o uso de memória do processo (e a métrica pzla_memory_rss_bytes)."""
+        now = time.monotonic()
+        if config.logging_memory_report_interval <= 0 or now - self.last_memory_report < config.logging_memory_report_interval:
+            return
+
+        self.last_memory_report = now
+        rss = current_rss_bytes()
+        if rss is None:
+            return
+        metrics.set('pzla_memory_rss_bytes', rss)
+        logger.info(f'Uso de memória: {format_bytes(rss)} (RSS), {len(self.writer)} logs aguardando gravação, {len(self.file_readers)} arquivos de log abertos.')
+
+    def report_latency(self) -> None:
+        """Informa o tempo entre o evento do sistema de arquivos e a gravação dos logs na database."""
+        if self.watcher is None or self.watcher.event_time is None or self.writer.cursors:
+            return
+
+        latency = time.monotonic() - self.watcher.event_time
+        self.watcher.event_time = None
+        self.last_latency = latency
+        logger.debug('Latência entre o evento e a gravação na database: %.1f ms.', latency * 1000)
 
     def run_mainloop(self) -> None:
         logger.debug('Looping principal iniciado.')
         logger.info('Pressione CTRL + C para encerrar a aplicação com segurança.')
 
+        self.watcher = create_watcher(config.servers.values(), config.app_watcher)
+        metrics.start()
+
         with database.create_session() as db:
             try:
                 while True:
@@ -232,18 +578,35 @@ class Reader:
                         logger.debug('Encerramento seguro aprovado, aplicação encerrada. Até mais!')
                         return
                     
-                    self.update_cached_logsfiles()
-                    self.update_database_logfiles(db)
-                    self.read_logs(db)
+                    cycle_started = time.perf_counter()
+                    servers = self.servers_to_sync()
+                    with metrics.timer('update_cached_logsfiles'):
+                        self.update_cached_logsfiles(servers)
+                    with metrics.timer('update_database_logfiles'):
+                        self.update_database_logfiles(db, servers)
+                    with metrics.timer('read_logs'):
+                        self.read_logs(db)
+                    self.report_latency()
                     self.clean_logs(db)
-
-                    if config.app_expiration_time and config.app_expiration_time > 0:
-                        pass
-                        # self.clean_database()
-
-                    frequency = config.app_reading_frequency
-                    logger.debug(f'Aguardando {frequency} segundos antes de iniciar o próximo looping.')
-                    time.sleep(frequency)
+                    self.clean_rollups(db)
+                    self.clean_raw_store(db)
+                    with metrics.timer('maintenance'):
+                        self.run_maintenance()
+                    self.release_session(db)
+                    self.report_memory()
+
+                    metrics.inc('pzla_cycles_total')
+                    metrics.observe_stage('cycle', time.perf_counter() - cycle_started)
+                    metrics.maybe_log_summary()
+                    self.unmatched.report()
+
+                    if self.has_backlog:
+                        logger.debug('Ainda existem logs pendentes, iniciando o próximo looping imediatamente.')
+                        continue
+
+                    timeout = min(self.watch_timeout(), self.writer.time_until_due())
+                    logger.debug('Aguardando até %.1f segundos antes de iniciar o próximo looping (%s).', timeout, self.watcher.name)
+                    self.watcher.wait(timeout)
 
             except KeyboardInterrupt:
                 logger.warning('Combinação CTRL + C pressionada. Você encerrou a aplicação com segurança.')
@@ -252,9 +615,14 @@ class Reader:
                 db.rollback()
             finally:
                 try:
+                    self.writer.flush(db)
                     if db.dirty or db.new or db.deleted:
                         db.commit()
                 except Exception as error:
                     logger.exception(f'Erro ao commitar alterações pendentes antes de encerrar a aplicação: {error}')
                     db.rollback()
-                logger.debug('Looping principal finalizado e sessão de database encerrada.')
\ No newline at end of file
+                self.watcher.close()
+                self.close_file_readers()
+                metrics.close()
+                self.unmatched.report(force=True)
+                logger.debug('Looping principal finalizado e sessão de database encerrada.')
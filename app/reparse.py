@@ -0,0 +1,336 @@
+# ┓ ┏┓┏┓┳┓┏┓┳┓┳┓┏┓  ┏┓┳┳┓┏┓┳┓┏┓┓
+# ┃ ┣ ┃┃┃┃┣┫┣┫┃┃┃┃  ┣┫┃┃┃┣┫┣┫┣┫┃
+# ┗┛┗┛┗┛┛┗┛┗┛┗┻┛┗┛  ┛┗┛ ┗┛┗┛┗┛┗┗┛
+# Modified: 16/10/2026
+
+import os
+import time
+import logging
+import argparse
+from datetime import datetime
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor, Future, FIRST_COMPLETED, wait
+from typing import NamedTuple, Optional
+from sqlalchemy.orm import Session
+from .config import Config
+from .database import Database
+from .backfill import _init_worker, _parse_line, _line_dates
+from .filereader import line_offsets
+from .scanner import log_label
+from .sources import get_source_id, stored_keys, new_rows
+from .rawstore import decompress_block, DATE_FORMAT
+from .storage import TypedStorage, insert_log_ids
+from .search import table_change_hook
+from .sessions import create_tracker
+from .rollups import create_rollups, parse_datetime
+
+logger = logging.getLogger('app.reparse')
+config = Config()
+database = Database()
+
+class BlockInfo(NamedTuple):
+    id: int
+    server: str
+    log_type: str
+    file_name: str
+    start_offset: int
+    end_offset: int
+    first_date: Optional[str]
+    last_date: Optional[str]
+    created_at: str
+
+class ReparseReport(NamedTuple):
+    blocks: int
+    lines: int
+    deleted: int
+    inserted: int
+    patterns: Counter # Logs gerados por (tipo de log, pattern)
+    elapsed: float
+
+def _parse_block(block_id: int, log_type: str, data: bytes, start_offset: int, since: Optional[str], until: Optional[str], encoding: str = 'utf-8') -> tuple[int, list[tuple], int, Optional[str], Optional[str]]:
+    """Processa as linhas originais de um bloco com os patterns atuais.
+
+    Retorna o id do bloco, as tuplas (pattern_name, log_date, json_data, byte_offset) dos logs dentro do intervalo
+    [since, until), a quantidade de linhas do bloco e a primeira e a última data das linhas e dos logs do bloco.
+    """
+    rows = []
+    data = decompress_block(data)
+    text = data.decode(encoding, errors='ignore')
+    lines = text.split('\n')
+    if lines and not lines[-1]:
+        lines.pop() # Item vazio após a última quebra de linha
+    for log_line, byte_offset in zip(lines, line_offsets(data, start_offset)):
+        _parse_line(log_type, log_line.strip(), rows, byte_offset)
+
+    dates = [row[1] for row in rows] + _line_dates(data)
+    first_date = min(dates, default=None)
+    last_date = max(dates, default=None)
+    if since is not None or until is not None:
+        rows = [row for row in rows if (since is None or row[1] >= since) and (until is None or row[1] < until)]
+    return block_id, rows, len(lines), first_date, last_date
+
+class Reparse:
+    """Processa novamente as linhas guardadas pelo raw_store com os patterns atuais, substituindo os logs.
+
+    Os blocos do intervalo são processados em paralelo e os novos logs são gravados, os logs antigos dos mesmos
+    trechos são removidos e os rollups do intervalo são contados novamente em uma única transação, então a tabela
+    logs nunca fica com o intervalo vazio ou duplicado. Os logs antigos substituídos são os do mesmo arquivo entre
+    o início e o fim de cada bloco, pela chave dos logs. Os logs gravados antes da chave (sem `source_id`) são
+    substituídos pelo tipo de log entre a primeira e a última data de cada sequência contínua de blocos de um
+    arquivo, então os logs de períodos sem linhas guardadas (raw_store desativado ou blocos expirados) não são alterados.
+    """
+
+    def __init__(
+        self,
+        log_types: Optional[list[str]] = None,
+        since: Optional[datetime] = None,
+        until: Optional[datetime] = None,
+        workers: int = 1,
+        dry_run: bool = False
+    ) -> None:
+        self.log_types = log_types or None
+        self.since = since.strftime(DATE_FORMAT) if since is not None else None
+        self.until = until.strftime(DATE_FORMAT) if until is not None else None
+        self.workers = max(workers, 1)
+        self.dry_run = dry_run
+        self.storage = TypedStorage(config.pattern_types, table_change_hook()) if config.app_storage == 'typed' else None
+        self.rollups = create_rollups() if config.rollups_enabled else None
+
+    def select_blocks(self, connection) -> list[BlockInfo]:
+        """Blocos dos tipos de log selecionados com logs no intervalo. Blocos sem nenhum log com match (sem datas)
+        são sempre incluídos, já que os patterns atuais podem gerar logs a partir deles."""
+        conditions = []
+        params = []
+        if self.log_types:
+            conditions.append(f'log_type IN ({", ".join("?" * len(self.log_types))})')
+            params.extend(self.log_types)
+        if self.since is not None:
+            conditions.append('(last_date IS NULL OR last_date >= ?)')
+            params.append(self.since)
+        if self.until is not None:
+            conditions.append('(first_date IS NULL OR first_date < ?)')
+            params.append(self.until)
+
+        where = f'WHERE {" AND ".join(conditions)} ' if conditions else ''
+        return [BlockInfo(*row) for row in connection.exec_driver_sql(
+            'SELECT id, server, log_type, file_name, start_offset, end_offset, first_date, last_date, created_at '
+            f'FROM raw_blocks {where}ORDER BY server, log_type, file_name, start_offset',
+            tuple(params)
+        )]
+
+    def plan_runs(self, blocks: list[BlockInfo]) -> dict[int, int]:
+        """Agrupa os blocos em sequências contínuas do mesmo arquivo do servidor. Retorna o índice da sequência de cada bloco."""
+        runs = {}
+        run = -1
+        previous = None
+        for block in blocks:
+            if previous is None or (previous.server, previous.log_type, previous.file_name, previous.end_offset) != (block.server, block.log_type, block.file_name, block.start_offset):
+                run += 1
+            runs[block.id] = run
+            previous = block
+        return runs
+
+    def date_conditions(self) -> tuple[list[str], list[str]]:
+        """Condições do intervalo [since, until) pela data dos logs."""
+        conditions = []
+        params = []
+        if self.since is not None:
+            conditions.append('log_date >= ?')
+            params.append(self.since)
+        if self.until is not None:
+            conditions.append('log_date < ?')
+            params.append(self.until)
+        return conditions, params
+
+    def delete_block(self, connection, max_log_id: int, source_id: int, block: BlockInfo) -> int:
+        """Remove os logs antigos (id até `max_log_id`) gravados a partir das linhas do bloco, pela chave dos logs."""
+        conditions, params = self.date_conditions()
+        where = ''.join(f' AND {condition}' for condition in conditions)
+        return connection.exec_driver_sql(
+            f'DELETE FROM logs WHERE source_id = ? AND byte_offset >= ? AND byte_offset < ? AND id <= ?{where}',
+            (source_id, block.start_offset, block.end_offset, max_log_id, *params)
+        ).rowcount
+
+    def write_rows(self, connection, block: BlockInfo, log_file_id: int, source_id: int, rows: list[tuple]) -> list[tuple]:
+        """Grava os novos logs do bloco, exceto os com chave já gravada (blocos sobrepostos). Retorna os logs gravados."""
+        rows = new_rows(rows, lambda row: (row[3], row[0]), stored_keys(connection, source_id, (row[3] for row in rows)))
+        if not rows:
+            return rows
+        sql = 'INSERT OR IGNORE INTO logs (pattern_name, log_file_id, log_file_type, server, log_date, json_data, source_id, byte_offset, created_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)'
+        params = [(pattern_name, log_file_id, block.log_type, block.server, log_date, '' if self.storage else data, source_id, byte_offset, block.created_at) for pattern_name, log_date, data, byte_offset in rows]
+        if self.storage is None:
+            connection.exec_driver_sql(sql, params)
+            return rows
+
+        log_ids = insert_log_ids(connection, sql, params)
+        self.storage.insert_events(connection, log_ids, [(block.log_type, pattern_name, data) for pattern_name, _, data, _ in rows])
+        return [row for row, log_id in zip(rows, log_ids) if log_id is not None]
+
+    def delete_replaced(self, connection, max_log_id: int, windows: dict[int, list]) -> int:
+        """Remove os logs antigos sem chave (id até `max_log_id`) de cada sequência de blocos, entre a sua primeira e última data."""
+        deleted = 0
+        for log_type, first, last, server in windows.values():
+            if first is None or last is None:
+                continue
+            date_conditions, date_params = self.date_conditions()
+            conditions = ['source_id IS NULL', 'id <= ?', 'server = ?', 'log_file_type = ?', 'log_date >= ?', 'log_date <= ?', *date_conditions]
+            params = [max_log_id, server, log_type, first, last, *date_params]
+            deleted += connection.exec_driver_sql(f'DELETE FROM logs WHERE {" AND ".join(conditions)}', tuple(params)).rowcount
+        return deleted
+
+    def refresh_rollups(self, db: Session, windows: dict[int, list], max_log_id: int, counts: Counter, steamids: set[tuple]) -> None:
+        """Conta novamente os períodos dos rollups de cada tipo de log entre as datas substituídas: os logs que não foram
+        substituídos pela tabela logs e os novos logs pelas contagens feitas durante a gravação."""
+        spans: dict[str, list[str]] = {}
+        for log_type, first, last, _ in windows.values(): # Os rollups somam os logs de todos os servidores
+            if first is None or last is None:
+                continue
+            first = max(first, self.since) if self.since is not None else first
+            last = min(last, self.until) if self.until is not None else last
+            span = spans.setdefault(log_type, [first, last])
+            span[0], span[1] = min(span[0], first), max(span[1], last)
+        for log_type, (first, last) in spans.items():
+            if first <= last:
+                self.rollups.refresh(db, log_type, datetime.strptime(first, DATE_FORMAT), datetime.strptime(last, DATE_FORMAT), max_log_id)
+        self.rollups.store(db, counts, steamids)
+
+    def run(self) -> Optional[ReparseReport]:
+        started_at = time.monotonic()
+        with database.create_session() as db:
+            connection = db.connection()
+            # Bloqueia a gravação desde o início: os blocos e os logs lidos não mudam até o commit
+            connection.exec_driver_sql('BEGIN IMMEDIATE')
+            try:
+                blocks = self.select_blocks(connection)
+                logfile_ids = {(server, log_type): log_file_id for server, log_type, log_file_id in connection.exec_driver_sql('SELECT server, log_type, id FROM log_files')}
+                missing = {(block.server, block.log_type) for block in blocks} - set(logfile_ids)
+                if missing:
+                    logger.warning(f'Tipos de log sem LogFile ignorados: {", ".join(sorted(log_label(*key) for key in missing))}.')
+                    blocks = [block for block in blocks if (block.server, block.log_type) not in missing]
+
+                if not blocks:
+                    logger.info('Nenhum bloco de linhas originais encontrado para os tipos de log e o intervalo informados.')
+                    db.rollback()
+                    return None
+
+                runs = self.plan_runs(blocks)
+                windows: dict[int, list] = {}
+                for block in blocks:
+                    window = windows.setdefault(runs[block.id], [block.log_type, block.first_date, block.last_date, block.server])
+                    window[1] = min(filter(None, (window[1], block.first_date)), default=None)
+                    window[2] = max(filter(None, (window[2], block.last_date)), default=None)
+
+                max_log_id = connection.exec_driver_sql('SELECT coalesce(max(id), 0) FROM logs').scalar()
+                total_bytes = sum(block.end_offset - block.start_offset for block in blocks)
+                logger.info(f'Processando {len(blocks)} blocos ({total_bytes / 1024 / 1024:.1f} MB de linhas originais) com {self.workers} processos.')
+
+                lines = inserted = deleted = done_bytes = 0
+                source_ids: dict[tuple[str, str], int] = {}
+                patterns: Counter = Counter()
+                rollup_counts: Counter = Counter()
+                rollup_steamids: set[tuple] = set()
+                block_dates: list[tuple] = []
+                reported_at = time.monotonic()
+                blocks_by_id = {block.id: block for block in blocks}
+                pending_blocks = iter(blocks)
+                running: set[Future] = set()
+
+                with ProcessPoolExecutor(self.workers, initializer=_init_worker, initargs=(config.patterns, config.default_pattern, self.storage is not None)) as executor:
+                    try:
+                        while True:
+                            while len(running) < self.workers * 2: # Limita os blocos em memória aguardando gravação
+                                block = next(pending_blocks, None)
+                                if block is None:
+                                    break
+                                data = connection.exec_driver_sql('SELECT data FROM raw_blocks WHERE id = ?', (block.id,)).scalar()
+                                running.add(executor.submit(_parse_block, block.id, block.log_type, data, block.start_offset, self.since, self.until))
+
+                            if not running:
+                                break
+
+                            completed, running = wait(running, return_when=FIRST_COMPLETED)
+                            for future in completed:
+                                block_id, rows, block_lines, first_date, last_date = future.result()
+                                block = blocks_by_id[block_id]
+                                if self.since is not None or self.until is not None:
+                                    # Os logs antigos fora do intervalo continuam na database: mantém as datas anteriores também
+                                    first_date = min(filter(None, (first_date, block.first_date)), default=None)
+                                    last_date = max(filter(None, (last_date, block.last_date)), default=None)
+                                block_dates.append((first_date, last_date, block_id))
+                                source_key = (block.server, block.file_name)
+                                if source_key not in source_ids:
+                                    source_ids[source_key] = get_source_id(connection, block.server, block.log_type, block.file_name)
+                                deleted += self.delete_block(connection, max_log_id, source_ids[source_key], block)
+                                rows = self.write_rows(connection, block, logfile_ids[(block.server, block.log_type)], source_ids[source_key], rows)
+                                if rows:
+                                    window = windows[runs[block_id]]
+                                    dates = [row[1] for row in rows]
+                                    window[1] = min(filter(None, (window[1], min(dates))))
+                                    window[2] = max(filter(None, (window[2], max(dates))))
+                                    patterns.update((block.log_type, row[0]) for row in rows)
+                                    if self.rollups is not None:
+                                        block_counts, block_steamids = self.rollups.count([
+                                            {'log_file_type': block.log_type, 'pattern_name': pattern_name, 'log_date': log_date, 'data' if self.storage else 'json_data': data}
+                                            for pattern_name, log_date, data, _ in rows
+                                        ])
+                                        rollup_counts.update(block_counts)
+                                        rollup_steamids.update(block_steamids)
+
+                                lines += block_lines
+                                inserted += len(rows)
+                                done_bytes += block.end_offset - block.start_offset
+
+                            now = time.monotonic()
+                            if now - reported_at >= 5:
+                                reported_at = now
+                                logger.info(f'Progresso: {done_bytes / max(total_bytes, 1):.1%}, {lines / (now - started_at):.0f} linhas/s, {inserted} logs gerados.')
+
+                    except KeyboardInterrupt:
+                        executor.shutdown(wait=False, cancel_futures=True)
+                        raise
+
+                deleted += self.delete_replaced(connection, max_log_id, windows)
+                # As datas dos blocos passam a ser as dos logs gerados pelos patterns atuais
+                connection.exec_driver_sql('UPDATE raw_blocks SET first_date = ?, last_date = ? WHERE id = ?', block_dates)
+                if self.rollups is not None:
+                    self.refresh_rollups(db, windows, max_log_id, rollup_counts, rollup_steamids)
+
+                if self.dry_run:
+                    db.rollback()
+                else:
+                    db.commit()
+            except KeyboardInterrupt:
+                db.rollback()
+                logger.warning('Combinação CTRL + C pressionada. Nenhum log foi alterado.')
+                return None
+            except BaseException:
+                db.rollback()
+                raise
+
+            report = ReparseReport(len(blocks), lines, deleted, inserted, patterns, time.monotonic() - started_at)
+            logger.info(
+                f'Reparse {"simulado (nada foi gravado)" if self.dry_run else "concluído"}: {report.lines} linhas de {report.blocks} blocos, '
+                f'{report.deleted} logs substituídos por {report.inserted} em {report.elapsed:.1f} segundos ({report.lines / max(report.elapsed, 1e-9):.0f} linhas/s).'
+            )
+            for (log_type, pattern_name), logs in sorted(patterns.items()):
+                logger.info(f'{log_type}/{pattern_name}: {logs} logs.')
+
+            if not self.dry_run and config.sessions_enabled:
+                tracker = create_tracker()
+                if any(tracker.is_session_log_type(window[0]) for window in windows.values()):
+                    tracker.rebuild(db)
+            return report
+
+def main(argv: Optional[list[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description='Processa novamente as linhas guardadas pelo raw_store com os patterns atuais, substituindo os logs.')
+    parser.add_argument('--type', action='append', dest='log_types', help='Processa apenas o tipo de log informado (pode ser repetido).')
+    parser.add_argument('--since', type=parse_datetime, help='Início do intervalo pela data dos logs (AAAA-MM-DD ou "AAAA-MM-DD HH:MM:SS").')
+    parser.add_argument('--until', type=parse_datetime, help='Fim do intervalo, não incluído (AAAA-MM-DD ou "AAAA-MM-DD HH:MM:SS").')
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1, help='Quantidade de processos de leitura.')
+    parser.add_argument('--dry-run', action='store_true', help='Apenas informa os logs que seriam gerados, sem alterar a database.')
+    args = parser.parse_args(argv)
+
+    if args.since is not None and args.until is not None and args.since >= args.until:
+        parser.error('--since deve ser anterior a --until.')
+
+    Reparse(args.log_types, args.since, args.until, args.workers, args.dry_run).run()
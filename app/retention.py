@@ -0,0 +1,172 @@
+# ┓ ┏┓┏┓┳┓┏┓┳┓┳┓┏┓  ┏┓┳┳┓┏┓┳┓┏┓┓
+# ┃ ┣ ┃┃┃┃┣┫┣┫┃┃┃┃  ┣┫┃┃┃┣┫┣┫┣┫┃
+# ┗┛┗┛┗┛┛┗┛┗┛┗┻┛┗┛  ┛┗┛ ┗┛┗┛┗┛┗┗┛
+# Modified: 16/10/2026
+
+import os
+import gzip
+import json
+import time
+import logging
+from datetime import datetime, timedelta, timezone
+from typing import NamedTuple, Optional
+from sqlalchemy import select, delete, and_, not_, tuple_, Integer, Text, DateTime
+from sqlalchemy import table as sql_table, column as sql_column
+from sqlalchemy.orm import Session
+from .database import Log
+
+logger = logging.getLogger('app.retention')
+
+# View com o json_data de todos os logs, inclusive os gravados nas tabelas tipadas (storage=typed)
+LOGS_JSON_VIEW = sql_table(
+    'logs_json',
+    sql_column('id', Integer),
+    sql_column('pattern_name', Text),
+    sql_column('log_file_id', Integer),
+    sql_column('log_file_type', Text),
+    sql_column('log_date', DateTime),
+    sql_column('json_data', Text),
+    sql_column('created_at', DateTime)
+)
+
+class RetentionRule(NamedTuple):
+    log_type: Optional[str] # None para a regra padrão
+    pattern_name: Optional[str] # None para todos os patterns do tipo
+    expiration_time: int # Segundos, 0 ou menor mantém os logs
+
+class RetentionReport(NamedTuple):
+    deleted: int
+    archived: int
+    batches: int
+    elapsed: float
+
+def utc_now() -> datetime:
+    """Data atual em UTC sem fuso, no mesmo formato do CURRENT_TIMESTAMP gravado em created_at."""
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+class RetentionEngine:
+    """Remove os logs expirados em lotes pequenos, liberando a database entre os lotes."""
+
+    def __init__(
+        self,
+        default_expiration_time: int,
+        rules: dict[str, dict[str, int]],
+        interval: float = 60,
+        batch_size: int = 5000,
+        batch_pause: float = 0.05,
+        archive_dir: Optional[str] = None
+    ) -> None:
+        self.interval = interval
+        self.batch_size = max(batch_size, 1)
+        self.batch_pause = batch_pause
+        self.archive_dir = archive_dir or None
+        self.rules = self.build_rules(default_expiration_time, rules)
+        self.last_run: Optional[float] = None
+
+    def build_rules(self, default_expiration_time: int, rules: dict[str, dict[str, int]]) -> list[RetentionRule]:
+        """Converte a configuração {tipo: {pattern ou '': segundos}} em regras, das mais específicas para a padrão."""
+        pattern_rules = []
+        type_rules = []
+        for log_type, patterns in rules.items():
+            for pattern_name, expiration_time in patterns.items():
+                if pattern_name:
+                    pattern_rules.append(RetentionRule(log_type, pattern_name, expiration_time))
+                else:
+                    type_rules.append(RetentionRule(log_type, None, expiration_time))
+        return pattern_rules + type_rules + [RetentionRule(None, None, default_expiration_time)]
+
+    def rule_condition(self, rule: RetentionRule):
+        """Condição SQL dos logs cobertos pela regra, excluindo os que possuem uma regra mais específica."""
+        table = Log.__table__
+        if rule.pattern_name is not None:
+            return and_(table.c.log_file_type == rule.log_type, table.c.pattern_name == rule.pattern_name)
+
+        specific_patterns = [(other.log_type, other.pattern_name) for other in self.rules if other.pattern_name is not None]
+        if rule.log_type is not None:
+            condition = table.c.log_file_type == rule.log_type
+            excluded = [pattern_name for log_type, pattern_name in specific_patterns if log_type == rule.log_type]
+            return and_(condition, table.c.pattern_name.not_in(excluded)) if excluded else condition
+
+        conditions = []
+        typed = [other.log_type for other in self.rules if other.log_type is not None and other.pattern_name is None]
+        if typed:
+            conditions.append(table.c.log_file_type.not_in(typed))
+        if specific_patterns:
+            conditions.append(not_(tuple_(table.c.log_file_type, table.c.pattern_name).in_(specific_patterns)))
+        return and_(*conditions) if conditions else None
+
+    def is_enabled(self) -> bool:
+        return any(rule.expiration_time > 0 for rule in self.rules)
+
+    def is_due(self) -> bool:
+        return self.is_enabled() and (self.last_run is None or time.monotonic() - self.last_run >= self.interval)
+
+    def archive(self, rows: list) -> None:
+        os.makedirs(self.archive_dir, exist_ok=True)
+        path = os.path.join(self.archive_dir, f'logs_{datetime.now().strftime("%Y-%m-%d")}.jsonl.gz')
+        with gzip.open(path, 'at', encoding='utf-8') as f:
+            for row in rows:
+                f.write(json.dumps({
+                    'id': row.id,
+                    'pattern_name': row.pattern_name,
+                    'log_file_id': row.log_file_id,
+                    'log_file_type': row.log_file_type,
+                    'log_date': row.log_date.isoformat(),
+                    'data': json.loads(row.json_data),
+                    'created_at': row.created_at.isoformat()
+                }) + '\n')
+
+    def delete_expired(self, db: Session, rule: RetentionRule) -> tuple[int, int, int]:
+        """Remove os logs expirados da regra em lotes por faixa de id. Retorna (removidos, arquivados, lotes)."""
+        table = Log.__table__
+        cutoff_time = utc_now() - timedelta(seconds=rule.expiration_time)
+        condition = and_(table.c.created_at < cutoff_time, *[c for c in [self.rule_condition(rule)] if c is not None])
+
+        deleted = archived = batches = 0
+        last_id = 0
+        while True:
+            ids = db.execute(select(table.c.id).where(condition, table.c.id > last_id).order_by(table.c.id).limit(self.batch_size)).scalars().all()
+            if not ids:
+                break
+
+            try:
+                if self.archive_dir:
+                    batch_ids = select(table.c.id).where(condition, table.c.id.between(ids[0], ids[-1]))
+                    rows = db.execute(select(LOGS_JSON_VIEW).where(LOGS_JSON_VIEW.c.id.in_(batch_ids)).order_by(LOGS_JSON_VIEW.c.id)).all()
+                    self.archive(rows)
+                    archived += len(rows)
+                result = db.execute(delete(table).where(condition, table.c.id.between(ids[0], ids[-1])))
+                db.commit()
+            except BaseException:
+                db.rollback()
+                raise
+
+            deleted += result.rowcount
+            batches += 1
+            last_id = ids[-1]
+
+            if len(ids) < self.batch_size:
+                break
+            time.sleep(self.batch_pause) # Libera a database para a leitura dos logs entre os lotes
+
+        return deleted, archived, batches
+
+    def run(self, db: Session) -> RetentionReport:
+        started_at = time.monotonic()
+        self.last_run = started_at
+        deleted = archived = batches = 0
+
+        for rule in self.rules:
+            if rule.expiration_time <= 0:
+                continue
+            rule_deleted, rule_archived, rule_batches = self.delete_expired(db, rule)
+            deleted += rule_deleted
+            archived += rule_archived
+            batches += rule_batches
+
+        report = RetentionReport(deleted, archived, batches, time.monotonic() - started_at)
+        if deleted > 0:
+            logger.info(f'Limpeza concluída: {deleted} logs deletados em {report.elapsed:.2f} segundos ({batches} lotes, {archived} arquivados).')
+        else:
+            logger.debug(f'Nenhum log a ser deletado ({report.elapsed * 1000:.1f} ms).')
+        return report
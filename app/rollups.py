@@ -0,0 +1,309 @@
+# ┓ ┏┓┏┓┳┓┏┓┳┓┳┓┏┓  ┏┓┳┳┓┏┓┳┓┏┓┓
+# ┃ ┣ ┃┃┃┃┣┫┣┫┃┃┃┃  ┣┫┃┃┃┣┫┣┫┣┫┃
+# ┗┛┗┛┗┛┛┗┛┗┛┗┻┛┗┛  ┛┗┛ ┗┛┗┛┗┛┗┗┛
+# Modified: 16/10/2026
+
+import re
+import json
+import time
+import logging
+import argparse
+from collections import Counter
+from datetime import datetime, timedelta
+from typing import Iterable, Optional
+from sqlalchemy import select, delete, func
+from sqlalchemy.orm import Session
+from .config import Config
+from .database import Database, Log, LogRollup, LogRollupSteamid
+
+logger = logging.getLogger('app.rollups')
+config = Config()
+database = Database()
+
+GRANULARITIES = ('minute', 'hour', 'day')
+DATE_FORMAT = '%Y-%m-%d %H:%M:%S.%f' # Formato das datas gravado pelo SQLAlchemy
+BUCKET_FORMATS = { # Início do período de log_date no SQLite, no mesmo formato das datas gravadas pelo SQLAlchemy
+    'minute': '%Y-%m-%d %H:%M:00.000000',
+    'hour': '%Y-%m-%d %H:00:00.000000',
+    'day': '%Y-%m-%d 00:00:00.000000'
+}
+BUCKET_STEPS = {
+    'minute': timedelta(minutes=1),
+    'hour': timedelta(hours=1),
+    'day': timedelta(days=1)
+}
+BUCKET_PREFIXES = { # Início do período a partir do minuto "AAAA-MM-DD HH:MM": tamanho do prefixo e complemento
+    'minute': (16, ':00.000000'),
+    'hour': (13, ':00:00.000000'),
+    'day': (10, ' 00:00:00.000000')
+}
+
+def truncate(moment: datetime, granularity: str) -> datetime:
+    """Retorna o início do período da granularidade que contém `moment`."""
+    if granularity == 'minute':
+        return moment.replace(second=0, microsecond=0)
+    if granularity == 'hour':
+        return moment.replace(minute=0, second=0, microsecond=0)
+    return moment.replace(hour=0, minute=0, second=0, microsecond=0)
+
+class RollupTracker:
+    """Mantém a quantidade de logs por período (minuto, hora e dia), tipo de log e pattern na tabela log_rollups.
+
+    As contagens de cada lote são somadas pelo LogWriter na mesma transação dos logs e dos cursores, então os
+    gráficos consultam alguns milhares de linhas já agrupadas em vez de agrupar a tabela logs a cada atualização.
+    Nas granularidades de `steamid_granularities`, os steamids de cada período ficam em log_rollup_steamids e a
+    coluna steamids guarda a quantidade de steamids distintos.
+
+    Cada granularidade possui a sua própria expiração (`retention`, em segundos, 0 mantém para sempre),
+    independente da expiração dos logs. `rebuild` recria os períodos a partir dos logs ainda na database.
+    """
+
+    def __init__(
+        self,
+        granularities: Iterable[str] = GRANULARITIES,
+        steamid_granularities: Iterable[str] = (),
+        steamid_group: str = 'steamid',
+        retention: Optional[dict[str, int]] = None,
+        clean_interval: float = 3600
+    ) -> None:
+        self.granularities = tuple(granularity for granularity in GRANULARITIES if granularity in granularities)
+        self.steamid_granularities = tuple(granularity for granularity in self.granularities if granularity in steamid_granularities)
+        self.steamid_group = steamid_group
+        self.retention = retention or {}
+        self.clean_interval = clean_interval
+        self.last_clean: Optional[float] = None
+        self._steamid_regex = re.compile(f'"{re.escape(steamid_group)}": "([^"\\\\]*)"')
+
+    def extract_steamid(self, row: dict) -> Optional[str]:
+        """Retorna o steamid da linha do LogWriter (grupos em `data` ou serializados em `json_data`)."""
+        data = row.get('data')
+        if data is None:
+            json_data = row.get('json_data') or ''
+            if f'"{self.steamid_group}"' not in json_data: # Evita desserializar os logs sem o grupo
+                return None
+            s_match = self._steamid_regex.search(json_data) # json.dumps grava os grupos sempre no formato "nome": "valor"
+            if s_match:
+                return s_match.group(1) or None
+            try:
+                data = json.loads(json_data)
+            except ValueError:
+                return None
+        steamid = data.get(self.steamid_group)
+        return str(steamid) if steamid else None
+
+    def apply(self, db: Session, rows: list[dict]) -> None:
+        """Soma os logs do lote nos períodos de cada granularidade, sem commit (a transação é a do LogWriter)."""
+        if not rows or not self.granularities:
+            return
+        self.store(db, *self.count(rows))
+
+    def count(self, rows: list[dict]) -> tuple[Counter, set[tuple]]:
+        """Retorna os logs por (granularidade, período, tipo de log, pattern) e os steamids de cada período das linhas."""
+        # Agrupa por minuto primeiro: as horas e os dias são calculados a partir dos poucos minutos distintos do lote
+        minutes: Counter = Counter()
+        minute_steamids: set[tuple] = set()
+        for row in rows:
+            log_date = row['log_date']
+            if isinstance(log_date, str): # Data já formatada como o SQLAlchemy grava (backfill)
+                minute = log_date[:16]
+            else:
+                minute = (log_date.year, log_date.month, log_date.day, log_date.hour, log_date.minute)
+            key = (minute, row['log_file_type'], row['pattern_name'])
+            minutes[key] += 1
+            if self.steamid_granularities:
+                steamid = self.extract_steamid(row)
+                if steamid is not None:
+                    minute_steamids.add((*key, steamid))
+
+        minute_names = {minute: minute if isinstance(minute, str) else '%04d-%02d-%02d %02d:%02d' % minute for minute, _, _ in minutes}
+        counts: Counter = Counter()
+        steamids: set[tuple] = set()
+        for granularity in self.granularities:
+            size, suffix = BUCKET_PREFIXES[granularity]
+            buckets = {minute: name[:size] + suffix for minute, name in minute_names.items()}
+            for (minute, log_file_type, pattern_name), logs in minutes.items():
+                counts[(granularity, buckets[minute], log_file_type, pattern_name)] += logs
+            if granularity in self.steamid_granularities:
+                steamids.update((granularity, buckets[minute], *others) for minute, *others in minute_steamids)
+        return counts, steamids
+
+    def store(self, db: Session, counts: Counter, steamids: set[tuple]) -> None:
+        """Soma as contagens e os steamids (de `count`) nos períodos, sem commit."""
+        if not counts:
+            return
+
+        # Comandos do driver com as datas já formatadas: o lote pode ter milhares de períodos e steamids
+        connection = db.connection()
+        connection.exec_driver_sql(
+            'INSERT INTO log_rollups (granularity, bucket, log_file_type, pattern_name, logs) VALUES (?, ?, ?, ?, ?) '
+            'ON CONFLICT DO UPDATE SET logs = logs + excluded.logs',
+            [(*key, logs) for key, logs in counts.items()]
+        )
+        if steamids:
+            connection.exec_driver_sql(
+                'INSERT OR IGNORE INTO log_rollup_steamids (granularity, bucket, log_file_type, pattern_name, steamid) VALUES (?, ?, ?, ?, ?)',
+                list(steamids)
+            )
+            connection.exec_driver_sql(
+                'UPDATE log_rollups SET steamids = (SELECT COUNT(*) FROM log_rollup_steamids s WHERE s.granularity = log_rollups.granularity '
+                'AND s.bucket = log_rollups.bucket AND s.log_file_type = log_rollups.log_file_type AND s.pattern_name = log_rollups.pattern_name) '
+                'WHERE granularity = ? AND bucket = ? AND log_file_type = ? AND pattern_name = ?',
+                list({key[:4] for key in steamids})
+            )
+
+    def is_clean_due(self) -> bool:
+        if not any(self.retention.get(granularity, 0) > 0 for granularity in self.granularities):
+            return False
+        return self.last_clean is None or time.monotonic() - self.last_clean >= self.clean_interval
+
+    def clean(self, db: Session) -> int:
+        """Remove os períodos expirados de cada granularidade. Retorna a quantidade de períodos removidos."""
+        started_at = time.monotonic()
+        self.last_clean = started_at
+        deleted = 0
+        try:
+            for granularity in self.granularities:
+                expiration_time = self.retention.get(granularity, 0)
+                if expiration_time <= 0:
+                    continue
+                cutoff = truncate(datetime.now() - timedelta(seconds=expiration_time), granularity) # As datas dos logs são locais
+                for table in (LogRollup.__table__, LogRollupSteamid.__table__):
+                    result = db.execute(delete(table).where(table.c.granularity == granularity, table.c.bucket < cutoff))
+                    if table is LogRollup.__table__:
+                        deleted += result.rowcount
+            db.commit()
+        except BaseException:
+            db.rollback()
+            raise
+
+        if deleted > 0:
+            logger.info(f'Limpeza dos rollups concluída: {deleted} períodos deletados em {time.monotonic() - started_at:.2f} segundos.')
+        return deleted
+
+    def refresh(self, db: Session, log_file_type: str, start: datetime, end: datetime, max_log_id: Optional[int] = None) -> None:
+        """Conta novamente os períodos do tipo de log entre `start` e `end` (inclusive) a partir da tabela logs, sem commit.
+
+        Utilizado após substituir os logs de um intervalo (reparse.py): com `max_log_id`, conta apenas os logs que não
+        foram substituídos e as contagens dos novos logs são somadas depois com `store`.
+        """
+        connection = db.connection()
+        for granularity in self.granularities:
+            bounds = (truncate(start, granularity).strftime(DATE_FORMAT), (truncate(end, granularity) + BUCKET_STEPS[granularity]).strftime(DATE_FORMAT))
+            key = (granularity, log_file_type, *bounds)
+            key_condition = 'granularity = ? AND log_file_type = ? AND bucket >= ? AND bucket < ?'
+            source_condition = 'WHERE log_file_type = ? AND log_date >= ? AND log_date < ?'
+            if max_log_id is not None:
+                source_condition += f' AND id <= {int(max_log_id)}'
+            bucket_sql = f"strftime('{BUCKET_FORMATS[granularity]}', log_date)"
+            for table_name in ('log_rollups', 'log_rollup_steamids'):
+                connection.exec_driver_sql(f'DELETE FROM {table_name} WHERE {key_condition}', key)
+
+            connection.exec_driver_sql(
+                f'INSERT INTO log_rollups (granularity, bucket, log_file_type, pattern_name, logs) '
+                f'SELECT ?, {bucket_sql}, log_file_type, pattern_name, COUNT(*) FROM logs {source_condition} GROUP BY 2, 4',
+                key
+            )
+
+            if granularity in self.steamid_granularities:
+                steamid_path = f'$.{self.steamid_group}'
+                connection.exec_driver_sql(
+                    f'INSERT OR IGNORE INTO log_rollup_steamids (granularity, bucket, log_file_type, pattern_name, steamid) '
+                    f'SELECT DISTINCT ?, {bucket_sql}, log_file_type, pattern_name, json_extract(json_data, ?) FROM logs_json '
+                    f'{source_condition} AND json_extract(json_data, ?) IS NOT NULL',
+                    (granularity, steamid_path, *key[1:], steamid_path)
+                )
+                connection.exec_driver_sql(
+                    'UPDATE log_rollups SET steamids = (SELECT COUNT(*) FROM log_rollup_steamids s WHERE s.granularity = log_rollups.granularity '
+                    'AND s.bucket = log_rollups.bucket AND s.log_file_type = log_rollups.log_file_type AND s.pattern_name = log_rollups.pattern_name) '
+                    f'WHERE {key_condition}',
+                    key
+                )
+
+    def rebuild(self, db: Session, since: Optional[datetime] = None) -> int:
+        """Recria os períodos a partir dos logs ainda na database, em uma única transação. Retorna os períodos gravados.
+
+        Os períodos de cada tipo de log e pattern são substituídos apenas desde o seu log mais antigo (ou `since`),
+        então os períodos cujos logs já expiraram são mantidos. O primeiro período pode ter perdido parte dos logs
+        para a limpeza, então mantém a maior contagem entre a atual e a recriada.
+        """
+        started_at = time.monotonic()
+        logs = Log.__table__
+        statement = select(logs.c.log_file_type, logs.c.pattern_name, func.min(logs.c.log_date)).group_by(logs.c.log_file_type, logs.c.pattern_name)
+        if since is not None:
+            statement = statement.where(logs.c.log_date >= since)
+        first_dates = db.execute(statement).all()
+
+        connection = db.connection()
+        rebuilt = 0
+        try:
+            for log_file_type, pattern_name, first_date in first_dates:
+                for granularity in self.granularities:
+                    key = (granularity, log_file_type, pattern_name, truncate(first_date, granularity).strftime(DATE_FORMAT))
+                    key_condition = 'granularity = ? AND log_file_type = ? AND pattern_name = ? AND bucket'
+                    source_condition = 'WHERE log_file_type = ? AND pattern_name = ? AND log_date >= ?'
+                    bucket_sql = f"strftime('{BUCKET_FORMATS[granularity]}', log_date)"
+                    for table_name in ('log_rollups', 'log_rollup_steamids'):
+                        connection.exec_driver_sql(f'DELETE FROM {table_name} WHERE {key_condition} > ?', key)
+
+                    rebuilt += connection.exec_driver_sql(
+                        f'INSERT INTO log_rollups (granularity, bucket, log_file_type, pattern_name, logs) '
+                        f'SELECT ?, {bucket_sql}, log_file_type, pattern_name, COUNT(*) FROM logs {source_condition} '
+                        f'GROUP BY 2 ON CONFLICT DO UPDATE SET logs = max(logs, excluded.logs)',
+                        key
+                    ).rowcount
+
+                    if granularity in self.steamid_granularities:
+                        steamid_path = f'$.{self.steamid_group}'
+                        connection.exec_driver_sql(
+                            f'INSERT OR IGNORE INTO log_rollup_steamids (granularity, bucket, log_file_type, pattern_name, steamid) '
+                            f'SELECT DISTINCT ?, {bucket_sql}, log_file_type, pattern_name, json_extract(json_data, ?) FROM logs_json '
+                            f'{source_condition} AND json_extract(json_data, ?) IS NOT NULL',
+                            (granularity, steamid_path, *key[1:], steamid_path)
+                        )
+                        connection.exec_driver_sql(
+                            'UPDATE log_rollups SET steamids = (SELECT COUNT(*) FROM log_rollup_steamids s WHERE s.granularity = log_rollups.granularity '
+                            'AND s.bucket = log_rollups.bucket AND s.log_file_type = log_rollups.log_file_type AND s.pattern_name = log_rollups.pattern_name) '
+                            f'WHERE {key_condition} >= ?',
+                            key
+                        )
+            db.commit()
+        except BaseException:
+            db.rollback()
+            raise
+
+        logger.info(f'Rollups recriados: {rebuilt} períodos de {len(first_dates)} patterns em {time.monotonic() - started_at:.1f} segundos.')
+        return rebuilt
+
+def create_rollups() -> RollupTracker:
+    """Retorna o RollupTracker configurado na seção [rollups]."""
+    return RollupTracker(
+        config.rollups_granularities,
+        config.rollups_steamid_granularities,
+        config.rollups_steamid_group,
+        config.rollups_retention,
+        config.rollups_clean_interval
+    )
+
+def parse_datetime(value: str) -> datetime:
+    try:
+        return datetime.fromisoformat(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f'Data inválida: "{value}", utilize o formato AAAA-MM-DD ou "AAAA-MM-DD HH:MM:SS".')
+
+def main(argv: Optional[list[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description='Quantidade de logs por minuto, hora e dia (tabela log_rollups).')
+    parser.add_argument('--rebuild', action='store_true', help='Recria os períodos a partir dos logs ainda na database.')
+    parser.add_argument('--since', type=parse_datetime, help='Recria apenas os períodos a partir desta data (AAAA-MM-DD ou "AAAA-MM-DD HH:MM:SS").')
+    args = parser.parse_args(argv)
+
+    tracker = create_rollups()
+    with database.create_session() as db:
+        if args.rebuild:
+            tracker.rebuild(db, args.since)
+
+        table = LogRollup.__table__
+        for granularity, buckets, first_bucket, last_bucket, logs in db.execute(
+            select(table.c.granularity, func.count(), func.min(table.c.bucket), func.max(table.c.bucket), func.sum(table.c.logs))
+            .group_by(table.c.granularity)
+        ):
+            logger.info(f'{granularity}: {buckets} períodos de {first_bucket.isoformat(sep=" ", timespec="minutes")} a {last_bucket.isoformat(sep=" ", timespec="minutes")}, {logs} logs.')
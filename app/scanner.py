@@ -0,0 +1,164 @@
+# ┓ ┏┓┏┓┳┓┏┓┳┓┳┓┏┓  ┏┓┳┳┓┏┓┳┓┏┓┓
+# ┃ ┣ ┃┃┃┃┣┫┣┫┃┃┃┃  ┣┫┃┃┃┣┫┣┫┣┫┃
+# ┗┛┗┛┗┛┛┗┛┗┛┗┻┛┗┛  ┛┗┛ ┗┛┗┛┗┛┗┗┛
+# Modified: 16/10/2026
+
+import os
+import re
+import time
+import hashlib
+import logging
+from datetime import datetime
+from typing import NamedTuple, Optional
+from .config import DEFAULT_SERVER
+from .timestamps import file_date_decoder
+
+logger = logging.getLogger('app.scanner')
+
+FILENAME_REGEX = re.compile(r'^(\d{2}-\d{2}-\d{2}_\d{2}-\d{2}-\d{2})_(.+)\.txt$')
+FINGERPRINT_SIZE = 1024 # Bytes do início do arquivo utilizados na identificação
+
+class LogFileEntry(NamedTuple):
+    """Informações de um arquivo de log no disco, sem vínculo com a database."""
+    server: str
+    log_date: datetime
+    log_type: str
+    file_name: str
+    file_path: str
+    last_modified: datetime
+    creation_time: datetime
+    file_size: int
+    file_dev: int
+    file_ino: int
+
+def log_label(server: str, log_type: str) -> str:
+    """Nome de um tipo de log nas mensagens, com o servidor quando não é o 'default' (ex. pvp/user)."""
+    return log_type if server == DEFAULT_SERVER else f'{server}/{log_type}'
+
+def file_fingerprint(path: str, size: int = FINGERPRINT_SIZE) -> tuple[str, int]:
+    """Retorna o hash dos primeiros `size` bytes do arquivo e quantos bytes foram utilizados."""
+    with open(path, 'rb') as f:
+        head = f.read(size)
+    return hashlib.sha1(head).hexdigest(), len(head)
+
+class LogScanner:
+    """Mantém o arquivo mais recente de cada tipo de log do diretório de um servidor.
+
+    O diretório só é listado novamente quando o seu mtime muda (arquivo criado, removido
+    ou renomeado); nos demais ciclos apenas os arquivos atuais de cada tipo são verificados.
+    """
+
+    def __init__(self, path: str, server: str = DEFAULT_SERVER) -> None:
+        self.path = path
+        self.server = server
+        self._names: dict[str, Optional[tuple[datetime, str]]] = {} # Nome do arquivo -> (data, tipo) ou None se ignorado
+        self._files: dict[str, list[tuple[datetime, str]]] = {} # Tipo de log -> arquivos em ordem cronológica
+        self._latest: dict[str, str] = {} # Tipo de log -> nome do arquivo mais recente
+        self._dir_mtime_ns = None
+        self._file_dates = file_date_decoder()
+
+    def _parse_name(self, file_name: str) -> Optional[tuple[datetime, str]]:
+        if file_name in self._names:
+            return self._names[file_name]
+
+        parsed = None
+        f_match = FILENAME_REGEX.match(file_name)
+        if f_match:
+            try:
+                parsed = (self._file_dates.decode(f_match.group(1)), f_match.group(2))
+            except ValueError:
+                logger.debug(f'Data inválida no nome do arquivo de log "{file_name}", arquivo ignorado.')
+
+        self._names[file_name] = parsed
+        return parsed
+
+    def _rescan(self, dir_mtime_ns: int) -> None:
+        files = {}
+        seen = set()
+
+        with os.scandir(self.path) as entries:
+            for entry in entries:
+                seen.add(entry.name)
+                parsed = self._parse_name(entry.name)
+                if parsed is None or not entry.is_file():
+                    continue
+
+                log_date, log_type = parsed
+                files.setdefault(log_type, []).append((log_date, entry.name))
+
+        for file_name in self._names.keys() - seen:
+            del self._names[file_name]
+
+        for log_files in files.values():
+            log_files.sort()
+        latest = {log_type: log_files[-1][1] for log_type, log_files in files.items()}
+
+        for log_type, file_name in latest.items():
+            if self._latest.get(log_type) != file_name:
+                logger.debug(f'Logfile {log_label(self.server, log_type)} atualizado para o arquivo mais recente "{file_name}".')
+        self._files = files
+        self._latest = latest
+
+        # Sistemas de arquivos com baixa resolução de mtime podem receber outra alteração com o mesmo mtime,
+        # então um diretório alterado recentemente é listado novamente no próximo ciclo.
+        self._dir_mtime_ns = dir_mtime_ns if time.time_ns() - dir_mtime_ns > 2_000_000_000 else None
+        logger.debug(f'Diretório de logs listado: {len(seen)} arquivos, {len(latest)} tipos de log.')
+
+    def _entry(self, log_type: str, file_name: str) -> Optional[LogFileEntry]:
+        file_path = os.path.join(self.path, file_name)
+        try:
+            stat = os.stat(file_path)
+        except FileNotFoundError:
+            self._dir_mtime_ns = None
+            return None
+
+        return LogFileEntry(
+            server=self.server,
+            log_date=self._names[file_name][0],
+            log_type=log_type,
+            file_name=file_name,
+            file_path=file_path,
+            last_modified=datetime.fromtimestamp(stat.st_mtime),
+            creation_time=datetime.fromtimestamp(stat.st_ctime),
+            file_size=stat.st_size,
+            file_dev=stat.st_dev,
+            file_ino=stat.st_ino
+        )
+
+    def scan(self) -> dict[str, LogFileEntry]:
+        """Retorna o arquivo mais recente de cada tipo de log, indexado pelo tipo."""
+        dir_mtime_ns = os.stat(self.path).st_mtime_ns
+        if dir_mtime_ns != self._dir_mtime_ns:
+            self._rescan(dir_mtime_ns)
+
+        result = {}
+        for log_type, file_name in self._latest.items():
+            entry = self._entry(log_type, file_name)
+            if entry is not None:
+                result[log_type] = entry
+        return result
+
+    def get_entry(self, path: str) -> Optional[LogFileEntry]:
+        """Retorna as informações atuais de um arquivo do diretório, se ele ainda existir."""
+        file_name = os.path.basename(path)
+        parsed = self._parse_name(file_name)
+        if parsed is None or os.path.dirname(os.path.normpath(path)) != os.path.normpath(self.path):
+            return None
+        return self._entry(parsed[1], file_name)
+
+    def next_entry(self, log_type: str, after: datetime) -> Optional[LogFileEntry]:
+        """Retorna o primeiro arquivo do tipo de log com data posterior a `after`."""
+        for log_date, file_name in self._files.get(log_type, []):
+            if log_date > after:
+                entry = self._entry(log_type, file_name)
+                if entry is not None:
+                    return entry
+        return None
+
+    def find_by_identity(self, log_type: str, file_dev: int, file_ino: int) -> Optional[LogFileEntry]:
+        """Procura um arquivo do tipo de log pelo dispositivo e inode (ex. arquivo renomeado)."""
+        for _, file_name in reversed(self._files.get(log_type, [])):
+            entry = self._entry(log_type, file_name)
+            if entry is not None and (entry.file_dev, entry.file_ino) == (file_dev, file_ino):
+                return entry
+        return None
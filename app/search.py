@@ -0,0 +1,294 @@
+# ┓ ┏┓┏┓┳┓┏┓┳┓┳┓┏┓  ┏┓┳┳┓┏┓┳┓┏┓┓
+# ┃ ┣ ┃┃┃┃┣┫┣┫┃┃┃┃  ┣┫┃┃┃┣┫┣┫┣┫┃
+# ┗┛┗┛┗┛┛┗┛┗┛┗┻┛┗┛  ┛┗┛ ┗┛┗┛┗┛┗┗┛
+# Modified: 16/10/2026
+
+import time
+import shlex
+import logging
+import argparse
+from datetime import datetime
+from typing import NamedTuple, Callable, Optional
+from sqlalchemy import Connection
+from sqlalchemy.exc import OperationalError
+from .config import Config
+from .database import Database
+from .storage import EventTable, quote_identifier, quote_literal
+
+logger = logging.getLogger('app.search')
+config = Config()
+database = Database()
+
+SEARCH_TABLE = 'logs_fts'
+INSERT_TRIGGER = 'trg_logs_fts_insert'
+DELETE_TRIGGER = 'trg_logs_fts_delete'
+EVENT_TRIGGER_SUFFIX = '_fts'
+DATE_FORMAT = '%Y-%m-%d %H:%M:%S.%f' # Formato de logs.log_date gravado pelo SQLAlchemy
+ORDERS = {
+    'rank': f'{SEARCH_TABLE}.rank, l.id DESC', # Relevância (bm25): calcula a relevância de todos os logs encontrados
+    'recent': f'{SEARCH_TABLE}.rowid DESC' # Mais recentes primeiro: lê apenas a página, mesmo com termos muito comuns
+}
+
+# Texto indexado dos logs em JSON: os valores dos grupos, sem a data (já filtrada pela coluna log_date)
+JSON_TEXT_SQL = "(SELECT group_concat(j.value, ' ') FROM json_each({json_data}) j WHERE j.key <> 'datetime')"
+
+class SearchHit(NamedTuple):
+    id: int
+    log_file_type: str
+    pattern_name: str
+    log_date: datetime
+    rank: float # bm25, menor é mais relevante
+    snippet: str
+    json_data: str
+
+class SearchPage(NamedTuple):
+    hits: list[SearchHit]
+    page: int
+    page_size: int
+    has_more: bool
+
+def build_match(query: str, raw: bool = False) -> str:
+    """Converte a busca em uma expressão MATCH do FTS5: cada termo (ou "frase entre aspas") precisa estar no log.
+
+    Termos terminados em * buscam pelo prefixo. Com `raw`, a busca é usada como está (sintaxe completa do FTS5).
+    """
+    if raw:
+        return query
+    try:
+        terms = shlex.split(query)
+    except ValueError:
+        terms = query.split() # Aspas sem fechamento
+    expressions = []
+    for term in terms:
+        prefix = term.endswith('*')
+        term = term.rstrip('*').strip()
+        if term:
+            expressions.append('"' + term.replace('"', '""') + '"' + ('*' if prefix else ''))
+    return ' '.join(expressions)
+
+class SearchIndex:
+    """Índice de busca textual (FTS5) dos logs, mantido pela própria database com triggers.
+
+    A tabela logs_fts guarda o texto de cada log com o mesmo rowid da tabela logs. Os triggers indexam os logs
+    gravados em JSON (valores dos grupos, sem a data) e, no modo storage=typed, as linhas das tabelas tipadas.
+    A remoção de uma linha de logs remove o texto indexado, então a limpeza em lotes, o backfill e qualquer outro
+    INSERT ou DELETE mantêm o índice sincronizado sem código adicional.
+
+    O índice é criado (e preenchido com os logs existentes) quando é ativado ou quando os tipos de log indexados
+    mudam, e removido quando é desativado.
+    """
+
+    def __init__(self, log_types: Optional[list[str]] = None) -> None:
+        self.log_types = list(log_types) if log_types else None
+
+    def is_indexed(self, log_type: str) -> bool:
+        return self.log_types is None or log_type in self.log_types
+
+    def type_condition(self, column: str) -> str:
+        if self.log_types is None:
+            return ''
+        return f' AND {column} IN ({", ".join(quote_literal(log_type) for log_type in self.log_types)})'
+
+    def logs_triggers_sql(self) -> tuple[str, str]:
+        condition = self.type_condition('NEW.log_file_type')
+        insert_sql = (
+            f'CREATE TRIGGER {INSERT_TRIGGER} AFTER INSERT ON logs '
+            f"WHEN NEW.json_data <> '' AND json_valid(NEW.json_data){condition} "
+            f'BEGIN INSERT INTO {SEARCH_TABLE} (rowid, message) VALUES (NEW.id, {JSON_TEXT_SQL.format(json_data="NEW.json_data")}); END'
+        )
+        delete_sql = (
+            f'CREATE TRIGGER {DELETE_TRIGGER} AFTER DELETE ON logs '
+            f'WHEN 1{self.type_condition("OLD.log_file_type")} '
+            f'BEGIN DELETE FROM {SEARCH_TABLE} WHERE rowid = OLD.id; END'
+        )
+        return insert_sql, delete_sql
+
+    def event_text_sql(self, event_table: EventTable, alias: str) -> str:
+        """Texto indexado de uma linha da tabela tipada: os valores das colunas separados por espaço."""
+        values = [f"COALESCE(CAST({alias}.{quote_identifier(column)} AS TEXT), '')" for column in event_table.columns]
+        return 'trim(' + " || ' ' || ".join(values) + ')' if values else "''"
+
+    def create_event_trigger(self, connection: Connection, event_table: EventTable) -> None:
+        """Cria (ou recria, com as novas colunas) o trigger de indexação de uma tabela tipada, se o índice existir.
+
+        Utilizado como `on_table_change` do TypedStorage.
+        """
+        if not self.is_indexed(event_table.log_type) or not self.exists(connection):
+            return
+        trigger_name = quote_identifier(f'trg_{event_table.table_name}{EVENT_TRIGGER_SUFFIX}')
+        connection.exec_driver_sql(f'DROP TRIGGER IF EXISTS {trigger_name}')
+        connection.exec_driver_sql(
+            f'CREATE TRIGGER {trigger_name} AFTER INSERT ON {quote_identifier(event_table.table_name)} '
+            f'BEGIN INSERT INTO {SEARCH_TABLE} (rowid, message) VALUES (NEW.log_id, {self.event_text_sql(event_table, "NEW")}); END'
+        )
+
+    def load_event_tables(self, connection: Connection) -> list[EventTable]:
+        event_tables = []
+        for table_name, log_type, pattern_name in connection.exec_driver_sql('SELECT table_name, log_type, pattern_name FROM event_tables').all():
+            columns = [column[1] for column in connection.exec_driver_sql(f'PRAGMA table_info({quote_identifier(table_name)})')]
+            event_tables.append(EventTable(table_name, log_type, pattern_name, tuple(column for column in columns if column != 'log_id')))
+        return event_tables
+
+    def exists(self, connection: Connection) -> bool:
+        return connection.exec_driver_sql("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?", (SEARCH_TABLE,)).first() is not None
+
+    def drop(self, connection: Connection) -> None:
+        triggers = connection.exec_driver_sql(
+            "SELECT name FROM sqlite_master WHERE type = 'trigger' AND (name IN (?, ?) OR name LIKE ? ESCAPE '\\')",
+            (INSERT_TRIGGER, DELETE_TRIGGER, 'trg\\_events\\_%' + EVENT_TRIGGER_SUFFIX.replace('_', '\\_'))
+        ).scalars().all()
+        for trigger_name in triggers:
+            connection.exec_driver_sql(f'DROP TRIGGER IF EXISTS {quote_identifier(trigger_name)}')
+        connection.exec_driver_sql(f'DROP TABLE IF EXISTS {SEARCH_TABLE}')
+
+    def rebuild(self, connection: Connection) -> int:
+        """Recria a tabela, os triggers e o texto de todos os logs indexados, em uma única transação. Retorna os logs indexados."""
+        started_at = time.monotonic()
+        try:
+            connection.exec_driver_sql('BEGIN') # O driver do SQLite não inicia transações antes de comandos DDL
+            self.drop(connection)
+            connection.exec_driver_sql(f"CREATE VIRTUAL TABLE {SEARCH_TABLE} USING fts5(message, tokenize = 'unicode61 remove_diacritics 2')")
+            for trigger_sql in self.logs_triggers_sql():
+                connection.exec_driver_sql(trigger_sql)
+
+            connection.exec_driver_sql(
+                f'INSERT INTO {SEARCH_TABLE} (rowid, message) SELECT l.id, {JSON_TEXT_SQL.format(json_data="l.json_data")} FROM logs l '
+                f"WHERE l.json_data <> '' AND json_valid(l.json_data){self.type_condition('l.log_file_type')}"
+            )
+            for event_table in self.load_event_tables(connection):
+                if self.is_indexed(event_table.log_type):
+                    self.create_event_trigger(connection, event_table)
+                    connection.exec_driver_sql(
+                        f'INSERT INTO {SEARCH_TABLE} (rowid, message) SELECT e.log_id, {self.event_text_sql(event_table, "e")} '
+                        f'FROM {quote_identifier(event_table.table_name)} e'
+                    )
+
+            indexed = connection.exec_driver_sql(f'SELECT COUNT(*) FROM {SEARCH_TABLE}').scalar()
+            connection.commit()
+        except BaseException:
+            connection.rollback()
+            raise
+
+        logger.info(f'Índice de busca criado: {indexed} logs indexados em {time.monotonic() - started_at:.1f} segundos.')
+        return indexed
+
+    def setup(self, enabled: bool) -> None:
+        """Cria ou recria o índice quando ativado (se não existir ou se os tipos de log mudaram) e o remove quando desativado."""
+        with database.engine.connect() as connection:
+            exists = self.exists(connection)
+            if not enabled:
+                if exists:
+                    connection.exec_driver_sql('BEGIN')
+                    self.drop(connection)
+                    connection.commit()
+                    logger.info('Índice de busca desativado e removido da database.')
+                return
+
+            current = connection.exec_driver_sql("SELECT sql FROM sqlite_master WHERE type = 'trigger' AND name = ?", (INSERT_TRIGGER,)).scalar()
+            connection.commit()
+            if exists and current == self.logs_triggers_sql()[0]:
+                return
+            self.rebuild(connection)
+
+    def search(
+        self,
+        connection: Connection,
+        query: str,
+        log_types: Optional[list[str]] = None,
+        since: Optional[datetime] = None,
+        until: Optional[datetime] = None,
+        page: int = 1,
+        page_size: int = 20,
+        raw: bool = False,
+        order: str = 'rank'
+    ) -> SearchPage:
+        """Retorna uma página dos logs que contêm os termos, do mais ao menos relevante (bm25) ou dos mais recentes (`order='recent'`).
+
+        Os filtros de tipo e de período são aplicados na tabela logs; o json_data da página vem da view logs_json.
+        """
+        page = max(page, 1)
+        page_size = max(page_size, 1)
+        match = build_match(query, raw)
+        if not match:
+            return SearchPage([], page, page_size, False)
+
+        filters = ''
+        parameters: list = [match]
+        if log_types:
+            filters += f' AND l.log_file_type IN ({", ".join("?" * len(log_types))})'
+            parameters += log_types
+        if since is not None:
+            filters += ' AND l.log_date >= ?'
+            parameters.append(since.strftime(DATE_FORMAT))
+        if until is not None:
+            filters += ' AND l.log_date < ?'
+            parameters.append(until.strftime(DATE_FORMAT))
+
+        rows = connection.exec_driver_sql(
+            f"SELECT l.id, l.log_file_type, l.pattern_name, l.log_date, {SEARCH_TABLE}.rank, snippet({SEARCH_TABLE}, 0, '[', ']', '...', 16) "
+            f'FROM {SEARCH_TABLE} JOIN logs l ON l.id = {SEARCH_TABLE}.rowid '
+            f'WHERE {SEARCH_TABLE} MATCH ?{filters} ORDER BY {ORDERS[order]} LIMIT ? OFFSET ?',
+            (*parameters, page_size + 1, (page - 1) * page_size) # Uma linha a mais indica se existe a próxima página
+        ).all()
+        has_more = len(rows) > page_size
+        rows = rows[:page_size]
+
+        json_data = {}
+        if rows:
+            json_data = dict(connection.exec_driver_sql(
+                f'SELECT id, json_data FROM logs_json WHERE id IN ({", ".join("?" * len(rows))})', tuple(row[0] for row in rows)
+            ).all())
+
+        hits = [
+            SearchHit(log_id, log_file_type, pattern_name, datetime.fromisoformat(log_date), rank, snippet, json_data.get(log_id, '{}'))
+            for log_id, log_file_type, pattern_name, log_date, rank, snippet in rows
+        ]
+        return SearchPage(hits, page, page_size, has_more)
+
+def create_search_index() -> SearchIndex:
+    """Retorna o SearchIndex configurado na seção [search]."""
+    return SearchIndex(config.search_log_types)
+
+def table_change_hook() -> Optional[Callable[[Connection, EventTable], None]]:
+    """Retorna o `on_table_change` do TypedStorage: mantém os triggers do índice nas tabelas tipadas, se a busca estiver ativada."""
+    return create_search_index().create_event_trigger if config.search_enabled else None
+
+def parse_datetime(value: str) -> datetime:
+    try:
+        return datetime.fromisoformat(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f'Data inválida: "{value}", utilize o formato AAAA-MM-DD ou "AAAA-MM-DD HH:MM:SS".')
+
+def main(argv: Optional[list[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description='Busca textual nos logs (índice FTS5 da seção [search]).')
+    parser.add_argument('query', nargs='?', default='', help='Termos buscados. Todos precisam estar no log; "frases entre aspas" e prefixos com * são aceitos.')
+    parser.add_argument('--type', action='append', dest='log_types', help='Busca apenas no tipo de log informado (pode ser repetido).')
+    parser.add_argument('--since', type=parse_datetime, help='Apenas logs a partir desta data (AAAA-MM-DD ou "AAAA-MM-DD HH:MM:SS").')
+    parser.add_argument('--until', type=parse_datetime, help='Apenas logs anteriores a esta data.')
+    parser.add_argument('--page', type=int, default=1, help='Página dos resultados.')
+    parser.add_argument('--page-size', type=int, default=20, help='Resultados por página.')
+    parser.add_argument('--order', choices=tuple(ORDERS), default='rank', help='Ordem dos resultados: relevância (rank) ou mais recentes primeiro (recent).')
+    parser.add_argument('--raw', action='store_true', help='Utiliza a busca como uma expressão MATCH do FTS5, sem conversão.')
+    parser.add_argument('--rebuild', action='store_true', help='Recria o índice a partir dos logs da database.')
+    args = parser.parse_args(argv)
+
+    if not config.search_enabled:
+        parser.error('A busca está desativada. Ative a opção enabled da seção [search] do config.ini.')
+
+    search_index = create_search_index()
+    with database.engine.connect() as connection:
+        if args.rebuild:
+            search_index.rebuild(connection)
+        if not args.query:
+            return
+
+        started_at = time.perf_counter()
+        try:
+            result = search_index.search(connection, args.query, args.log_types, args.since, args.until, args.page, args.page_size, args.raw, args.order)
+        except OperationalError as error:
+            parser.error(f'Busca inválida: {error.orig}') # Ex. sintaxe do FTS5 inválida com --raw
+        elapsed = time.perf_counter() - started_at
+
+    logger.info(f'Página {result.page}: {len(result.hits)} logs em {elapsed * 1000:.1f} ms{" (existem mais páginas)" if result.has_more else ""}.')
+    for hit in result.hits:
+        logger.info(f'#{hit.id} {hit.log_date.isoformat(sep=" ", timespec="seconds")} {hit.log_file_type}/{hit.pattern_name}: {hit.snippet}')
@@ -0,0 +1,323 @@
+# ┓ ┏┓┏┓┳┓┏┓┳┓┳┓┏┓  ┏┓┳┳┓┏┓┳┓┏┓┓
+# ┃ ┣ ┃┃┃┃┣┫┣┫┃┃┃┃  ┣┫┃┃┃┣┫┣┫┣┫┃
+# ┗┛┗┛┗┛┛┗┛┗┛┗┻┛┗┛  ┛┗┛ ┗┛┗┛┗┛┗┗┛
+# Modified: 16/10/2026
+
+import json
+import time
+import logging
+import argparse
+from datetime import datetime
+from typing import NamedTuple, Iterable, Iterator, Optional
+from sqlalchemy import select, insert, update, delete, func, bindparam, or_
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.orm import Session
+from .config import Config, DEFAULT_SERVER
+from .database import Database, Log, PlayerSession, PlayerPlaytime, PlayerSessionReset
+from .retention import LOGS_JSON_VIEW
+
+logger = logging.getLogger('app.sessions')
+config = Config()
+database = Database()
+
+CLOSE_DISCONNECT = 'disconnect' # Log de desconexão do jogador
+CLOSE_RECONNECT = 'reconnect' # Nova conexão do jogador com a sessão anterior aberta
+CLOSE_ROTATION = 'rotation' # Novo arquivo de log do tipo (início do servidor)
+
+REBUILD_BATCH_SIZE = 10000
+
+class SessionEvent(NamedTuple):
+    at: datetime
+    steamid: str
+    connected: bool # False para a desconexão
+    server: str = DEFAULT_SERVER
+
+class ClosedSession(NamedTuple):
+    server: str
+    steamid: str
+    connected_at: datetime
+    disconnected_at: datetime
+    duration: float
+    close_reason: str
+
+def close_session(server: str, steamid: str, connected_at: datetime, at: datetime, reason: str) -> ClosedSession:
+    """Encerra a sessão em `at`, sem duração negativa se o encerramento for anterior à conexão."""
+    disconnected_at = max(at, connected_at)
+    return ClosedSession(server, steamid, connected_at, disconnected_at, (disconnected_at - connected_at).total_seconds(), reason)
+
+class SessionTracker:
+    """Mantém as sessões dos jogadores a partir dos logs de conexão e desconexão.
+
+    Os eventos são aplicados pelo LogWriter na mesma transação dos logs e dos cursores, então as sessões
+    acompanham exatamente os logs gravados. A conexão abre uma sessão, a desconexão do mesmo steamid a
+    encerra e uma nova conexão com a sessão anterior aberta encerra a anterior. A rotação do arquivo de log
+    do tipo encerra todas as sessões abertas e fica registrada em player_session_resets, para que `rebuild`
+    consiga recriar as sessões a partir da tabela logs com o mesmo resultado.
+
+    As sessões são de cada servidor (seção [servers]): o mesmo steamid pode estar online em dois servidores e a
+    rotação de um servidor encerra apenas as sessões dele. As sessões encerradas são somadas em player_playtime, por servidor e
+    steamid, então os jogadores online (view online_players) e o tempo de jogo são consultados sem percorrer o histórico de logs.
+    """
+
+    def __init__(self, log_type: str, connect_pattern: str, disconnect_pattern: str, steamid_group: str = 'steamid') -> None:
+        self.log_type = log_type
+        self.connect_pattern = connect_pattern
+        self.disconnect_pattern = disconnect_pattern
+        self.steamid_group = steamid_group
+
+    def is_session_log_type(self, log_type: str) -> bool:
+        return log_type.lower() == self.log_type.lower()
+
+    def extract_events(self, rows: Iterable[dict]) -> list[SessionEvent]:
+        """Retorna os eventos de sessão das linhas do LogWriter (grupos em `data` ou serializados em `json_data`)."""
+        events = []
+        for row in rows:
+            if row['pattern_name'] not in (self.connect_pattern, self.disconnect_pattern) or not self.is_session_log_type(row['log_file_type']):
+                continue
+
+            data = row.get('data')
+            if data is None:
+                try:
+                    data = json.loads(row['json_data'])
+                except ValueError:
+                    continue
+
+            steamid = data.get(self.steamid_group)
+            if steamid:
+                events.append(SessionEvent(row['log_date'], str(steamid), row['pattern_name'] == self.connect_pattern, row.get('server') or DEFAULT_SERVER))
+        return events
+
+    def _store_closed(self, db: Session, closed: list[ClosedSession]) -> None:
+        """Soma as sessões encerradas no tempo de jogo de cada jogador no servidor da sessão."""
+        table = PlayerPlaytime.__table__
+        statement = sqlite_insert(table)
+        db.execute(
+            statement.on_conflict_do_update(
+                index_elements=[table.c.server, table.c.steamid],
+                set_={
+                    'sessions': table.c.sessions + statement.excluded.sessions,
+                    'playtime': table.c.playtime + statement.excluded.playtime,
+                    'last_seen': func.max(func.coalesce(table.c.last_seen, statement.excluded.last_seen), statement.excluded.last_seen)
+                }
+            ),
+            [{'server': session.server, 'steamid': session.steamid, 'sessions': 1, 'playtime': session.duration, 'last_seen': session.disconnected_at} for session in closed]
+        )
+
+    def _close_online(self, db: Session, closed: list[ClosedSession], session_ids: dict[str, int]) -> None:
+        """Grava as sessões encerradas: as que estavam abertas na database (`session_ids`) são atualizadas, as demais inseridas."""
+        table = PlayerSession.__table__
+        updates = []
+        inserts = []
+        for session in closed:
+            session_id = session_ids.pop(session.steamid, None) # A sessão da database é sempre a primeira encerrada do jogador
+            if session_id is not None:
+                updates.append({'session_id': session_id, 'closed_at': session.disconnected_at, 'closed_duration': session.duration, 'closed_reason': session.close_reason})
+            else:
+                inserts.append(session._asdict())
+
+        if updates:
+            db.execute(
+                update(table)
+                .where(table.c.id == bindparam('session_id'))
+                .values(disconnected_at=bindparam('closed_at'), duration=bindparam('closed_duration'), close_reason=bindparam('closed_reason')),
+                updates
+            )
+        if inserts:
+            db.execute(insert(table), inserts)
+        if closed:
+            self._store_closed(db, closed)
+
+    def apply_event(self, server: str, online: dict[str, datetime], event: SessionEvent, closed: list[ClosedSession]) -> None:
+        """Aplica um evento nas sessões abertas do servidor em memória ({steamid: conexão}), acrescentando as encerradas em `closed`."""
+        connected_at = online.pop(event.steamid, None)
+        if connected_at is not None:
+            closed.append(close_session(server, event.steamid, connected_at, event.at, CLOSE_RECONNECT if event.connected else CLOSE_DISCONNECT))
+        elif not event.connected:
+            logger.debug(f'Desconexão do steamid {event.steamid} sem uma sessão aberta ignorada.')
+
+        if event.connected:
+            online[event.steamid] = event.at
+
+    def apply(self, db: Session, events: list[SessionEvent]) -> None:
+        """Aplica os eventos na ordem dos logs, sem commit (a transação é a do LogWriter).
+
+        Apenas as sessões abertas dos jogadores do lote são lidas, e as alterações são gravadas com um
+        comando por tabela e servidor, em vez de alguns comandos por evento.
+        """
+        by_server: dict[str, list[SessionEvent]] = {}
+        for event in events:
+            by_server.setdefault(event.server, []).append(event)
+
+        table = PlayerSession.__table__
+        for server, server_events in by_server.items():
+            steamids = list({event.steamid for event in server_events})
+            session_ids: dict[str, int] = {}
+            online: dict[str, datetime] = {}
+            for offset in range(0, len(steamids), 500): # Limite de parâmetros por comando do SQLite
+                for session_id, steamid, connected_at in db.execute(
+                    select(table.c.id, table.c.steamid, table.c.connected_at)
+                    .where(table.c.server == server, table.c.steamid.in_(steamids[offset:offset + 500]), table.c.disconnected_at.is_(None))
+                ):
+                    session_ids[steamid] = session_id
+                    online[steamid] = connected_at
+
+            closed: list[ClosedSession] = []
+            for event in server_events:
+                self.apply_event(server, online, event, closed)
+
+            self._close_online(db, closed, session_ids)
+            opened = [{'server': server, 'steamid': steamid, 'connected_at': connected_at} for steamid, connected_at in online.items() if steamid not in session_ids]
+            if opened:
+                db.execute(insert(table), opened)
+
+    def close_all(self, db: Session, at: datetime, server: str = DEFAULT_SERVER, reason: str = CLOSE_ROTATION) -> int:
+        """Encerra todas as sessões abertas do servidor e registra o encerramento, sem commit. Retorna as sessões encerradas."""
+        table = PlayerSession.__table__
+        online = db.execute(select(table.c.id, table.c.steamid, table.c.connected_at).where(table.c.server == server, table.c.disconnected_at.is_(None))).all()
+        self._close_online(
+            db,
+            [close_session(server, steamid, connected_at, at, reason) for _, steamid, connected_at in online],
+            {steamid: session_id for session_id, steamid, _ in online}
+        )
+        self.record_reset(db, at, server, reason)
+
+        if online:
+            logger.info(f'{len(online)} sessões de jogadores do servidor "{server}" encerradas ({reason}).')
+        return len(online)
+
+    def record_reset(self, db: Session, at: datetime, server: str = DEFAULT_SERVER, reason: str = CLOSE_ROTATION) -> None:
+        """Registra um encerramento das sessões abertas do servidor para o `rebuild`, sem commit."""
+        db.execute(insert(PlayerSessionReset.__table__).values(reset_at=at, reason=reason, server=server))
+
+    def query_events(self, db: Session, *conditions) -> Iterator[SessionEvent]:
+        """Percorre os eventos de sessão dos logs na database que atendem `conditions` (colunas de Log), em ordem de data."""
+        view = LOGS_JSON_VIEW.c
+        logs = Log.__table__.c
+        rows = db.execute(
+            select(view.pattern_name, view.log_file_type, view.log_date, view.json_data, logs.server)
+            .join_from(LOGS_JSON_VIEW, Log.__table__, logs.id == view.id)
+            .where(func.lower(view.log_file_type) == self.log_type.lower(), view.pattern_name.in_((self.connect_pattern, self.disconnect_pattern)), *conditions)
+            .order_by(view.log_date, view.id)
+            .execution_options(yield_per=REBUILD_BATCH_SIZE)
+        ).mappings()
+        return (event for row in rows for event in self.extract_events([row]))
+
+    def replay(self, db: Session, server: str, events: Iterable[SessionEvent], closed_at: datetime) -> int:
+        """Aplica os eventos de uma execução já encerrada do servidor (ex. um arquivo importado pelo backfill), sem commit.
+
+        As sessões da execução são montadas apenas com os seus eventos e as que ficaram abertas são encerradas em
+        `closed_at`, somando-se ao tempo de jogo. As sessões abertas na database não são alteradas. Retorna as sessões gravadas.
+        """
+        online: dict[str, datetime] = {}
+        closed: list[ClosedSession] = []
+        for event in events:
+            self.apply_event(server, online, event, closed)
+        closed.extend(close_session(server, steamid, connected_at, closed_at, CLOSE_ROTATION) for steamid, connected_at in online.items())
+
+        self._close_online(db, closed, {})
+        self.record_reset(db, closed_at, server)
+        return len(closed)
+
+    def rebuild(self, db: Session) -> tuple[int, int]:
+        """Recria player_sessions e player_playtime a partir dos logs ainda na database e dos encerramentos registrados.
+
+        Cada servidor é recriado apenas desde o seu log de sessão mais antigo, então as sessões anteriores, cujos logs já
+        expiraram, são mantidas, e as sessões abertas nesse momento continuam abertas para os eventos seguintes. O tempo
+        de jogo do servidor é recalculado a partir das sessões mantidas e somado com as recriadas.
+
+        Os eventos são percorridos em ordem de data com as sessões abertas em memória, e as sessões são gravadas
+        em lotes, tudo em uma única transação. Retorna a quantidade de sessões encerradas e de sessões abertas.
+        """
+        started_at = time.monotonic()
+        logs = Log.__table__.c
+        sessions = PlayerSession.__table__
+        playtime = PlayerPlaytime.__table__
+        first_dates = db.execute(
+            select(logs.server, func.min(logs.log_date))
+            .where(func.lower(logs.log_file_type) == self.log_type.lower(), logs.pattern_name.in_((self.connect_pattern, self.disconnect_pattern)))
+            .group_by(logs.server)
+        ).all()
+
+        closed: list[ClosedSession] = []
+        closed_total = 0
+        opened_total = 0
+
+        def close_online(server: str, online: dict[str, datetime], at: datetime, reason: str) -> None:
+            for steamid, connected_at in online.items():
+                closed.append(close_session(server, steamid, connected_at, at, reason))
+            online.clear()
+
+        def store_closed() -> None:
+            nonlocal closed_total
+            if closed:
+                self._close_online(db, closed, {})
+                closed_total += len(closed)
+                closed.clear()
+
+        try:
+            for server, first_date in first_dates:
+                # As sessões abertas antes do primeiro log continuam abertas e são gravadas novamente com as recriadas
+                online: dict[str, datetime] = dict(db.execute(
+                    select(sessions.c.steamid, sessions.c.connected_at)
+                    .where(sessions.c.server == server, sessions.c.disconnected_at.is_(None), sessions.c.connected_at < first_date)
+                ).all())
+                db.execute(delete(sessions).where(sessions.c.server == server, or_(sessions.c.connected_at >= first_date, sessions.c.disconnected_at.is_(None))))
+                db.execute(delete(playtime).where(playtime.c.server == server))
+                db.execute(insert(playtime).from_select(
+                    ['server', 'steamid', 'sessions', 'playtime', 'last_seen'],
+                    select(sessions.c.server, sessions.c.steamid, func.count(), func.sum(sessions.c.duration), func.max(sessions.c.disconnected_at))
+                    .where(sessions.c.server == server, sessions.c.disconnected_at.is_not(None))
+                    .group_by(sessions.c.server, sessions.c.steamid)
+                ))
+
+                resets = db.execute(
+                    select(PlayerSessionReset.reset_at, PlayerSessionReset.reason)
+                    .where(PlayerSessionReset.server == server, PlayerSessionReset.reset_at >= first_date)
+                    .order_by(PlayerSessionReset.reset_at)
+                ).all()
+                reset_index = 0
+
+                for event in self.query_events(db, logs.server == server, logs.log_date >= first_date):
+                    while reset_index < len(resets) and resets[reset_index].reset_at <= event.at:
+                        close_online(server, online, resets[reset_index].reset_at, resets[reset_index].reason)
+                        reset_index += 1
+
+                    self.apply_event(server, online, event, closed)
+                    if len(closed) >= REBUILD_BATCH_SIZE:
+                        store_closed()
+
+                if reset_index < len(resets):
+                    close_online(server, online, resets[reset_index].reset_at, resets[reset_index].reason) # Encerramento após o último evento
+                store_closed()
+
+                if online:
+                    db.execute(insert(sessions), [{'server': server, 'steamid': steamid, 'connected_at': connected_at} for steamid, connected_at in online.items()])
+                    opened_total += len(online)
+            db.commit()
+        except BaseException:
+            db.rollback()
+            raise
+
+        logger.info(f'Sessões recriadas: {closed_total} encerradas e {opened_total} abertas de {len(first_dates)} servidores em {time.monotonic() - started_at:.1f} segundos.')
+        return closed_total, opened_total
+
+def create_tracker() -> SessionTracker:
+    """Retorna o SessionTracker configurado na seção [sessions]."""
+    return SessionTracker(config.sessions_log_type, config.sessions_connect_pattern, config.sessions_disconnect_pattern, config.sessions_steamid_group)
+
+def main(argv: Optional[list[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description='Sessões dos jogadores a partir dos logs de conexão e desconexão.')
+    parser.add_argument('--rebuild', action='store_true', help='Recria as tabelas player_sessions e player_playtime a partir dos logs ainda na tabela logs.')
+    args = parser.parse_args(argv)
+
+    tracker = create_tracker()
+    with database.create_session() as db:
+        if args.rebuild:
+            tracker.rebuild(db)
+
+        table = PlayerSession.__table__
+        online = db.execute(select(table.c.server, table.c.steamid, table.c.connected_at).where(table.c.disconnected_at.is_(None)).order_by(table.c.connected_at)).all()
+        logger.info(f'{len(online)} jogadores online.')
+        for server, steamid, connected_at in online:
+            where = f' no servidor "{server}"' if server != DEFAULT_SERVER else ''
+            logger.info(f'{steamid}: online{where} desde {connected_at.isoformat(sep=" ", timespec="seconds")}.')
@@ -0,0 +1,70 @@
+# ┓ ┏┓┏┓┳┓┏┓┳┓┳┓┏┓  ┏┓┳┳┓┏┓┳┓┏┓┓
+# ┃ ┣ ┃┃┃┃┣┫┣┫┃┃┃┃  ┣┫┃┃┃┣┫┣┫┣┫┃
+# ┗┛┗┛┗┛┛┗┛┗┛┗┻┛┗┛  ┛┗┛ ┗┛┗┛┗┛┗┗┛
+# Modified: 16/10/2026
+
+from typing import Callable, Hashable, Iterable, Optional
+from sqlalchemy import Connection
+
+# Chave natural dos logs: (source_id, byte_offset, pattern_name), com o índice único ix_logs_source_offset.
+# O LogFile de cada tipo de log passa a acompanhar outro arquivo a cada rotação, então o arquivo de cada
+# linha é identificado pelo servidor e pelo nome (ex. 16-10-26_12-00-00_user.txt), o mesmo no Reader, no
+# backfill.py e no reparse.py. Ler novamente um trecho de um arquivo (ex. após o processo ser encerrado antes de gravar o cursor)
+# gera as mesmas chaves, que são ignoradas na gravação.
+
+def get_source_id(connection: Connection, server: str, log_type: str, file_name: str) -> int:
+    """Retorna o id do arquivo de log, registrando-o na tabela log_sources na primeira gravação. Não finaliza a transação."""
+    source_id = connection.exec_driver_sql('SELECT id FROM log_sources WHERE server = ? AND file_name = ?', (server, file_name)).scalar()
+    if source_id is None:
+        source_id = connection.exec_driver_sql('INSERT INTO log_sources (server, log_type, file_name) VALUES (?, ?, ?)', (server, log_type, file_name)).lastrowid
+    return source_id
+
+def stored_keys(connection: Connection, source_id: int, offsets: Iterable[int]) -> set[tuple[int, str]]:
+    """Chaves (byte_offset, pattern_name) já gravadas do arquivo entre a menor e a maior posição informada."""
+    offsets = list(offsets)
+    if not offsets:
+        return set()
+    return set(map(tuple, connection.exec_driver_sql(
+        'SELECT byte_offset, pattern_name FROM logs WHERE source_id = ? AND byte_offset BETWEEN ? AND ?',
+        (source_id, min(offsets), max(offsets))
+    )))
+
+def new_rows(rows: list, key: Callable[[object], Hashable], stored: set) -> list:
+    """Remove as linhas com chaves já gravadas ou repetidas no próprio lote, mantendo a ordem."""
+    if not stored and len({key(row) for row in rows}) == len(rows):
+        return rows
+    seen = set(stored)
+    kept = []
+    for row in rows:
+        row_key = key(row)
+        if row_key not in seen:
+            seen.add(row_key)
+            kept.append(row)
+    return kept
+
+def drop_stored(connection: Connection, rows: list[dict]) -> list[dict]:
+    """Define o `source_id` das linhas do LogWriter (chaves `server`, `file_name` e `byte_offset`) e retorna as que
+    ainda não foram gravadas. Linhas sem arquivo são gravadas sem chave. Não finaliza a transação."""
+    by_source: dict[tuple[str, str], list[dict]] = {}
+    for row in rows:
+        file_name: Optional[str] = row.get('file_name')
+        if file_name is None:
+            row['source_id'] = None
+            row.setdefault('byte_offset', None)
+        else:
+            by_source.setdefault((row['server'], file_name), []).append(row)
+
+    if not by_source:
+        return rows
+
+    dropped: set[int] = set()
+    for (server, file_name), source_rows in by_source.items():
+        source_id = get_source_id(connection, server, source_rows[0]['log_file_type'], file_name)
+        for row in source_rows:
+            row['source_id'] = source_id
+        kept = new_rows(source_rows, lambda row: (row['byte_offset'], row['pattern_name']), stored_keys(connection, source_id, (row['byte_offset'] for row in source_rows)))
+        if len(kept) < len(source_rows):
+            kept_ids = set(map(id, kept))
+            dropped.update(id(row) for row in source_rows if id(row) not in kept_ids)
+
+    return [row for row in rows if id(row) not in dropped] if dropped else rows
@@ -0,0 +1,222 @@
+# ┓ ┏┓┏┓┳┓┏┓┳┓┳┓┏┓  ┏┓┳┳┓┏┓┳┓┏┓┓
+# ┃ ┣ ┃┃┃┃┣┫┣┫┃┃┃┃  ┣┫┃┃┃┣┫┣┫┣┫┃
+# ┗┛┗┛┗┛┛┗┛┗┛┗┻┛┗┛  ┛┗┛ ┗┛┗┛┗┛┗┗┛
+# Modified: 16/10/2026
+
+import re
+import logging
+from typing import NamedTuple, Callable, Optional
+from sqlalchemy import Connection
+from sqlalchemy.orm import Session
+
+logger = logging.getLogger('app.storage')
+
+STORAGE_MODES = ('json', 'typed')
+COLUMN_TYPES: dict[str, tuple[str, Callable]] = {
+    'text': ('TEXT', str),
+    'int': ('INTEGER', int),
+    'float': ('REAL', float)
+}
+DATETIME_GROUP = 'datetime' # Gravado apenas em logs.log_date
+VIEW_NAME = 'logs_json'
+VIEW_COLUMNS = 'id, pattern_name, log_file_id, log_file_type, log_date, json_data, created_at'
+DATE_FORMAT = '%Y-%m-%d %H:%M:%S.%f' # Formato de logs.log_date gravado pelo SQLAlchemy
+INSERT_LOGS_SQL = (
+    'INSERT OR IGNORE INTO logs (pattern_name, log_file_id, log_file_type, server, log_date, json_data, source_id, byte_offset, created_at) '
+    'VALUES (?, ?, ?, ?, ?, ?, ?, ?, CURRENT_TIMESTAMP)'
+)
+
+# Reconstrói o texto do grupo "datetime" (dd-mm-yy HH:MM:SS.fff) a partir de logs.log_date
+DATETIME_SQL = "strftime('%d-%m-', l.log_date) || substr(strftime('%Y', l.log_date), 3, 2) || strftime(' %H:%M:%f', l.log_date)"
+
+class ColumnType(NamedTuple):
+    type_name: str # Chave de COLUMN_TYPES
+    index: bool
+
+class EventTable(NamedTuple):
+    table_name: str
+    log_type: str
+    pattern_name: str
+    columns: tuple[str, ...] # Grupos nomeados, na ordem das colunas
+
+def quote_identifier(name: str) -> str:
+    return '"' + name.replace('"', '""') + '"'
+
+def quote_literal(value: str) -> str:
+    return "'" + value.replace("'", "''") + "'"
+
+def log_params(row: dict) -> tuple:
+    """Parâmetros de INSERT_LOGS_SQL para uma linha do LogWriter."""
+    return (row['pattern_name'], row['log_file_id'], row['log_file_type'], row['server'], row['log_date'].strftime(DATE_FORMAT), row['json_data'], row['source_id'], row['byte_offset'])
+
+def insert_logs(connection: Connection, rows: list[dict]) -> int:
+    """Grava as linhas do LogWriter na tabela logs, ignorando as chaves já gravadas. Retorna os logs gravados.
+
+    Executado direto no driver do SQLite: converter os parâmetros de cada linha pelo SQLAlchemy custava mais
+    do que o próprio INSERT nos lotes grandes.
+    """
+    return connection.exec_driver_sql(INSERT_LOGS_SQL, [log_params(row) for row in rows]).rowcount
+
+def insert_log_ids(connection: Connection, sql: str, params: list[tuple]) -> list[Optional[int]]:
+    """Executa o INSERT OR IGNORE `sql` na tabela logs para cada linha com RETURNING id (SQLite 3.35+).
+    Retorna o id gravado de cada linha, na mesma ordem, ou None se a sua chave já estava gravada.
+
+    O executemany do sqlite3 descarta as linhas do RETURNING, então cada linha é executada no cursor do driver,
+    que reaproveita o statement preparado.
+    """
+    cursor = connection.connection.cursor()
+    sql = f'{sql} RETURNING id'
+    log_ids = []
+    try:
+        for values in params:
+            returned = cursor.execute(sql, values).fetchone()
+            log_ids.append(returned[0] if returned else None)
+    finally:
+        cursor.close()
+
+    ignored = log_ids.count(None)
+    if ignored:
+        logger.debug(f'{ignored} logs com chave já gravada foram ignorados no lote, sem gravar os seus eventos.')
+    return log_ids
+
+class TypedStorage:
+    """Grava os grupos nomeados de cada pattern em uma tabela própria com colunas tipadas.
+
+    A linha em `logs` continua existindo (data, tipo, pattern e posição para a limpeza), com `json_data`
+    vazio; os grupos ficam em `events_<tipo>__<pattern>`, ligados pelo `log_id`. As tabelas são criadas
+    quando o pattern grava o primeiro log e ganham novas colunas se o regex passar a ter novos grupos.
+    A view `logs_json` remonta o `json_data` de todos os logs para as consultas existentes.
+    """
+
+    def __init__(
+        self,
+        column_types: dict[str, dict[str, dict[str, tuple[str, bool]]]],
+        on_table_change: Optional[Callable[[Connection, EventTable], None]] = None
+    ) -> None:
+        self.on_table_change = on_table_change # Chamado quando uma tabela é criada ou ganha colunas (ex. índice de busca)
+        self.column_types = {
+            log_type: {pattern_name: {group: ColumnType(*column_type) for group, column_type in groups.items()} for pattern_name, groups in patterns.items()}
+            for log_type, patterns in column_types.items()
+        }
+        self._tables: dict[tuple[str, str], EventTable] = {}
+
+    def get_column_types(self, log_type: str, pattern_name: str) -> dict[str, ColumnType]:
+        return self.column_types.get(log_type, {}).get(pattern_name, {})
+
+    def _table_name(self, connection: Connection, log_type: str, pattern_name: str) -> str:
+        slug = lambda value: re.sub(r'\W+', '_', value).strip('_').lower() or 'default'
+        base_name = f'events_{slug(log_type)}__{slug(pattern_name)}'
+        table_name = base_name
+        suffix = 1
+        while connection.exec_driver_sql('SELECT 1 FROM event_tables WHERE table_name = ?', (table_name,)).first():
+            suffix += 1
+            table_name = f'{base_name}_{suffix}'
+        return table_name
+
+    def _load_table(self, connection: Connection, log_type: str, pattern_name: str) -> Optional[EventTable]:
+        row = connection.exec_driver_sql(
+            'SELECT table_name FROM event_tables WHERE log_type = ? AND pattern_name = ?', (log_type, pattern_name)
+        ).first()
+        if row is None:
+            return None
+        columns = [column[1] for column in connection.exec_driver_sql(f'PRAGMA table_info({quote_identifier(row[0])})')]
+        return EventTable(row[0], log_type, pattern_name, tuple(column for column in columns if column != 'log_id'))
+
+    def ensure_table(self, connection: Connection, log_type: str, pattern_name: str, groups: list[str]) -> EventTable:
+        """Retorna a tabela do pattern, criando-a ou adicionando as colunas que faltam."""
+        key = (log_type, pattern_name)
+        event_table = self._tables.get(key) or self._load_table(connection, log_type, pattern_name)
+        groups = [group for group in groups if group not in (DATETIME_GROUP, 'log_id')]
+        column_types = self.get_column_types(log_type, pattern_name)
+        created = event_table is None
+
+        if created:
+            table_name = self._table_name(connection, log_type, pattern_name)
+            columns_sql = ''.join(f', {quote_identifier(group)} {COLUMN_TYPES[column_types.get(group, ColumnType("text", False)).type_name][0]}' for group in groups)
+            connection.exec_driver_sql(f'CREATE TABLE {quote_identifier(table_name)} (log_id INTEGER PRIMARY KEY{columns_sql})')
+            connection.exec_driver_sql(
+                'INSERT INTO event_tables (table_name, log_type, pattern_name) VALUES (?, ?, ?)', (table_name, log_type, pattern_name)
+            )
+            # Os eventos acompanham a remoção das linhas de logs (limpeza ou qualquer outro DELETE)
+            connection.exec_driver_sql(
+                f'CREATE TRIGGER {quote_identifier("trg_" + table_name + "_delete")} AFTER DELETE ON logs '
+                f'WHEN OLD.log_file_type = {quote_literal(log_type)} AND OLD.pattern_name = {quote_literal(pattern_name)} '
+                f'BEGIN DELETE FROM {quote_identifier(table_name)} WHERE log_id = OLD.id; END'
+            )
+            event_table = EventTable(table_name, log_type, pattern_name, tuple(groups))
+            new_columns = groups
+            logger.info(f'Tabela {table_name} criada para o pattern "{pattern_name}" do log {log_type}.')
+        else:
+            new_columns = [group for group in groups if group not in event_table.columns]
+            for group in new_columns:
+                column_type = COLUMN_TYPES[column_types.get(group, ColumnType('text', False)).type_name][0]
+                connection.exec_driver_sql(f'ALTER TABLE {quote_identifier(event_table.table_name)} ADD COLUMN {quote_identifier(group)} {column_type}')
+            if new_columns:
+                event_table = event_table._replace(columns=event_table.columns + tuple(new_columns))
+                logger.info(f'Colunas {", ".join(new_columns)} adicionadas à tabela {event_table.table_name}.')
+
+        for group in new_columns:
+            if group in column_types and column_types[group].index:
+                index_name = quote_identifier(f'ix_{event_table.table_name}_{group}')
+                connection.exec_driver_sql(f'CREATE INDEX IF NOT EXISTS {index_name} ON {quote_identifier(event_table.table_name)} ({quote_identifier(group)})')
+
+        if created or new_columns:
+            self.refresh_view(connection)
+            if self.on_table_change is not None:
+                self.on_table_change(connection, event_table)
+        self._tables[key] = event_table
+        return event_table
+
+    def refresh_view(self, connection: Connection) -> None:
+        """Recria a view logs_json com o json_data dos logs gravados em JSON e dos gravados nas tabelas tipadas."""
+        selects = [f'SELECT {VIEW_COLUMNS} FROM logs WHERE json_data <> \'\'']
+        for table_name, log_type, pattern_name in connection.exec_driver_sql('SELECT table_name, log_type, pattern_name FROM event_tables ORDER BY table_name').all():
+            event_table = self._load_table(connection, log_type, pattern_name)
+            pairs = [f"'{DATETIME_GROUP}', {DATETIME_SQL}"] + [f'{quote_literal(column)}, CAST(e.{quote_identifier(column)} AS TEXT)' for column in event_table.columns]
+            selects.append(
+                f'SELECT l.id, l.pattern_name, l.log_file_id, l.log_file_type, l.log_date, json_object({", ".join(pairs)}) AS json_data, l.created_at '
+                f'FROM logs l JOIN {quote_identifier(table_name)} e ON e.log_id = l.id'
+            )
+        connection.exec_driver_sql(f'DROP VIEW IF EXISTS {VIEW_NAME}')
+        connection.exec_driver_sql(f'CREATE VIEW {VIEW_NAME} AS ' + ' UNION ALL '.join(selects))
+
+    def convert(self, log_type: str, pattern_name: str, event_table: EventTable, data: dict) -> tuple:
+        column_types = self.get_column_types(log_type, pattern_name)
+        values = []
+        for column in event_table.columns:
+            value = data.get(column)
+            if value is not None and column in column_types:
+                try:
+                    value = COLUMN_TYPES[column_types[column].type_name][1](value)
+                except ValueError:
+                    pass # Mantém o texto original, o SQLite aceita texto em colunas tipadas
+            values.append(value)
+        return tuple(values)
+
+    def insert_events(self, connection: Connection, log_ids: list[Optional[int]], events: list[tuple[str, str, dict]]) -> None:
+        """Grava os grupos (tipo, pattern, grupos) de cada log com o id correspondente em `log_ids` (insert_log_ids).
+        Os eventos dos logs ignorados (id None) não são gravados."""
+        grouped: dict[tuple[str, str], list[tuple[int, dict]]] = {}
+        for log_id, (log_type, pattern_name, data) in zip(log_ids, events):
+            if log_id is not None:
+                grouped.setdefault((log_type, pattern_name), []).append((log_id, data))
+
+        try:
+            for (log_type, pattern_name), items in grouped.items():
+                event_table = self.ensure_table(connection, log_type, pattern_name, list(items[0][1]))
+                columns = ''.join(f', {quote_identifier(column)}' for column in event_table.columns)
+                placeholders = ', ?' * len(event_table.columns)
+                connection.exec_driver_sql(
+                    f'INSERT INTO {quote_identifier(event_table.table_name)} (log_id{columns}) VALUES (?{placeholders})',
+                    [(log_id,) + self.convert(log_type, pattern_name, event_table, data) for log_id, data in items]
+                )
+        except BaseException:
+            self._tables.clear() # A criação das tabelas pode ser desfeita pelo rollback
+            raise
+
+    def insert(self, db: Session, rows: list[dict]) -> None:
+        """Grava as linhas do LogWriter, cada uma com os grupos em `data`, em logs e nas tabelas tipadas.
+        As linhas já gravadas devem ter sido removidas antes (sources.drop_stored)."""
+        connection = db.connection()
+        log_ids = insert_log_ids(connection, INSERT_LOGS_SQL, [log_params(row) for row in rows])
+        self.insert_events(connection, log_ids, [(row['log_file_type'], row['pattern_name'], row['data']) for row in rows])
@@ -0,0 +1,70 @@
+# ┓ ┏┓┏┓┳┓┏┓┳┓┳┓┏┓  ┏┓┳┳┓┏┓┳┓┏┓┓
+# ┃ ┣ ┃┃┃┃┣┫┣┫┃┃┃┃  ┣┫┃┃┃┣┫┣┫┣┫┃
+# ┗┛┗┛┗┛┛┗┛┗┛┗┻┛┗┛  ┛┗┛ ┗┛┗┛┗┛┗┗┛
+# Modified: 16/10/2026
+
+from datetime import datetime
+from typing import Optional
+
+LOG_DATE_FORMAT = '%d-%m-%y %H:%M:%S.%f' # Ex. 16-10-26 23:08:42.123, dentro das linhas de log
+FILE_DATE_FORMAT = '%d-%m-%y_%H-%M-%S' # Ex. 16-10-26_23-08-42, no nome dos arquivos de log
+
+class TimestampDecoder:
+    """Converte as datas de layout fixo do Project Zomboid sem passar pelo strptime.
+
+    Os campos são lidos pela posição (dd-mm-yy?HH?MM?SS[.fff]) e a parte da data é reaproveitada
+    enquanto não muda, já que as linhas chegam em ordem. Qualquer texto fora do layout esperado
+    é convertido pelo strptime com o formato original, mantendo o mesmo resultado e os mesmos erros.
+    """
+
+    def __init__(self, fallback_format: str, date_time_separator: str, time_separator: str, fraction: bool) -> None:
+        self.fallback_format = fallback_format
+        self.date_time_separator = date_time_separator
+        self.time_separator = time_separator
+        self.fraction = fraction
+        # Texto e campos da última data, trocados juntos: o decoder é compartilhado pelas threads de leitura do modo async
+        self._date: tuple[Optional[str], tuple[int, int, int]] = (None, (0, 0, 0))
+
+    def _decode_date(self, date_text: str) -> tuple[int, int, int]:
+        if date_text[2] != '-' or date_text[5] != '-' or not (date_text[:2] + date_text[3:5] + date_text[6:8]).isdigit():
+            raise ValueError(date_text)
+        year = int(date_text[6:8])
+        year += 2000 if year < 69 else 1900 # Mesma regra do %y
+        return year, int(date_text[3:5]), int(date_text[:2])
+
+    def decode(self, text: str) -> datetime:
+        try:
+            date_text = text[:8]
+            cached_text, date = self._date
+            if date_text != cached_text:
+                date = self._decode_date(date_text)
+                self._date = (date_text, date)
+
+            if text[8] != self.date_time_separator or text[11] != self.time_separator or text[14] != self.time_separator:
+                raise ValueError(text)
+
+            microsecond = 0
+            if self.fraction:
+                fraction = text[18:]
+                if text[17] != '.' or not 0 < len(fraction) <= 6 or not fraction.isdigit():
+                    raise ValueError(text)
+                microsecond = int(fraction) * 10 ** (6 - len(fraction))
+            elif len(text) != 17:
+                raise ValueError(text)
+
+            time_text = text[9:11] + text[12:14] + text[15:17]
+            if not time_text.isdigit():
+                raise ValueError(text)
+
+            year, month, day = date
+            return datetime(year, month, day, int(time_text[:2]), int(time_text[2:4]), int(time_text[4:]), microsecond)
+        except (ValueError, IndexError):
+            return datetime.strptime(text, self.fallback_format)
+
+def log_date_decoder() -> TimestampDecoder:
+    """Decoder das datas dentro das linhas de log, capturadas pelo grupo "datetime" dos patterns."""
+    return TimestampDecoder(LOG_DATE_FORMAT, ' ', ':', fraction=True)
+
+def file_date_decoder() -> TimestampDecoder:
+    """Decoder das datas no nome dos arquivos de log."""
+    return TimestampDecoder(FILE_DATE_FORMAT, '_', '-', fraction=False)
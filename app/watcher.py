@@ -0,0 +1,146 @@
+# ┓ ┏┓┏┓┳┓┏┓┳┓┳┓┏┓  ┏┓┳┳┓┏┓┳┓┏┓┓
+# ┃ ┣ ┃┃┃┃┣┫┣┫┃┃┃┃  ┣┫┃┃┃┣┫┣┫┣┫┃
+# ┗┛┗┛┗┛┛┗┛┗┛┗┻┛┗┛  ┛┗┛ ┗┛┗┛┗┛┗┗┛
+# Modified: 16/10/2026
+
+import os
+import sys
+import time
+import ctypes
+import ctypes.util
+import select
+import struct
+import logging
+import threading
+from typing import Iterable, Literal, Optional, Union
+
+logger = logging.getLogger('app.watcher')
+
+WatcherBackend = Literal['auto', 'inotify', 'polling']
+
+# Constantes de <sys/inotify.h>
+IN_MODIFY = 0x00000002
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_Q_OVERFLOW = 0x00004000
+IN_NONBLOCK = 0o4000
+IN_CLOEXEC = 0o2000000
+EVENT_HEADER = struct.Struct('iIII') # struct inotify_event: wd, mask, cookie, len (seguido do nome)
+
+class PollingWatcher:
+    """Aguarda um intervalo fixo entre os ciclos de leitura."""
+
+    name = 'polling'
+
+    def __init__(self) -> None:
+        self.event_time: Optional[float] = None
+
+    def wait(self, timeout: float) -> bool:
+        time.sleep(timeout)
+        return False
+
+    def changes(self) -> Optional[set[str]]:
+        """Sem eventos, qualquer diretório pode ter mudado (None)."""
+        return None
+
+    def close(self) -> None:
+        pass
+
+class InotifyWatcher:
+    """Acorda o looping assim que algum arquivo dos diretórios é criado ou escrito (Linux, via ctypes).
+
+    Os diretórios com eventos desde a última consulta ficam em `changes`, para que o looping verifique
+    apenas os servidores com arquivos alterados.
+    """
+
+    name = 'inotify'
+
+    def __init__(self, paths: Iterable[str]) -> None:
+        if not sys.platform.startswith('linux'):
+            raise OSError('inotify está disponível apenas no Linux.')
+
+        libc = ctypes.CDLL(ctypes.util.find_library('c') or 'libc.so.6', use_errno=True)
+        if not hasattr(libc, 'inotify_init1'):
+            raise OSError('A libc não possui suporte a inotify.')
+
+        self.event_time: Optional[float] = None
+        self._paths: dict[int, str] = {} # Watch descriptor -> diretório
+        self._changed: set[str] = set()
+        self._overflow = False # Eventos perdidos: todos os diretórios são considerados alterados
+        self._lock = threading.Lock()
+        self._fd = libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if self._fd < 0:
+            raise OSError(ctypes.get_errno(), os.strerror(ctypes.get_errno()))
+
+        mask = IN_MODIFY | IN_CLOSE_WRITE | IN_MOVED_TO | IN_CREATE | IN_DELETE
+        for path in paths:
+            wd = libc.inotify_add_watch(self._fd, os.fsencode(path), mask)
+            if wd < 0:
+                errno = ctypes.get_errno()
+                os.close(self._fd)
+                raise OSError(errno, os.strerror(errno))
+            self._paths[wd] = path
+
+    def _read_events(self) -> bool:
+        """Lê os eventos pendentes, registrando os diretórios alterados. Retorna True se algum evento foi lido."""
+        received = False
+        with self._lock:
+            try:
+                while True:
+                    data = os.read(self._fd, 64 * 1024)
+                    if not data:
+                        break
+                    if not received and self.event_time is None:
+                        self.event_time = time.monotonic() # Início da latência: leitura do primeiro evento pendente
+                    received = True
+                    offset = 0
+                    while offset + EVENT_HEADER.size <= len(data):
+                        wd, mask, _, name_size = EVENT_HEADER.unpack_from(data, offset)
+                        offset += EVENT_HEADER.size + name_size
+                        if mask & IN_Q_OVERFLOW:
+                            self._overflow = True
+                        elif wd in self._paths:
+                            self._changed.add(self._paths[wd])
+            except BlockingIOError:
+                pass
+        return received
+
+    def wait(self, timeout: float) -> bool:
+        """Aguarda bloqueado no descritor do inotify até um evento ou, no máximo, `timeout` segundos.
+        Retorna True se algum evento ocorreu."""
+        readable, _, _ = select.select([self._fd], [], [], max(timeout, 0))
+        return bool(readable) and self._read_events()
+
+    def changes(self) -> Optional[set[str]]:
+        """Retorna e limpa os diretórios com eventos desde a última consulta, incluindo os eventos ainda não lidos
+        (ex. looping iniciado sem aguardar). Retorna None se eventos foram perdidos (fila do inotify cheia)."""
+        self._read_events()
+        with self._lock:
+            changed, overflow = self._changed, self._overflow
+            self._changed, self._overflow = set(), False
+        return None if overflow else changed
+
+    def close(self) -> None:
+        try:
+            os.close(self._fd)
+        except OSError:
+            pass
+
+def create_watcher(paths: Union[str, Iterable[str]], backend: WatcherBackend = 'auto') -> Union[PollingWatcher, InotifyWatcher]:
+    paths = [paths] if isinstance(paths, str) else list(paths)
+    if backend == 'polling':
+        return PollingWatcher()
+
+    try:
+        watcher = InotifyWatcher(paths)
+        for path in paths:
+            logger.info(f'Monitorando o diretório "{path}" por eventos do sistema (inotify).')
+        return watcher
+    except Exception as error:
+        if backend == 'inotify':
+            logger.warning(f'Não foi possível utilizar inotify, utilizando leitura por intervalo: {error}')
+        else:
+            logger.debug(f'inotify indisponível, utilizando leitura por intervalo: {error}')
+        return PollingWatcher()
@@ -0,0 +1,136 @@
+# ┓ ┏┓┏┓┳┓┏┓┳┓┳┓┏┓  ┏┓┳┳┓┏┓┳┓┏┓┓
+# ┃ ┣ ┃┃┃┃┣┫┣┫┃┃┃┃  ┣┫┃┃┃┣┫┣┫┣┫┃
+# ┗┛┗┛┗┛┛┗┛┗┛┗┻┛┗┛  ┛┗┛ ┗┛┗┛┗┛┗┗┛
+# Modified: 16/10/2026
+
+import time
+import logging
+from typing import Optional
+from sqlalchemy import update
+from sqlalchemy.orm import Session
+from .database import LogFile
+from .storage import TypedStorage, insert_logs
+from .sessions import SessionTracker
+from .rollups import RollupTracker
+from .rawstore import RawStore, RawChunk
+from .sources import drop_stored
+from .metrics import Metrics
+
+logger = logging.getLogger('app.writer')
+metrics = Metrics()
+
+class LogWriter:
+    """Acumula as linhas processadas e grava tudo em uma única transação.
+
+    Os registros de `logs` e a nova posição do cursor de cada `LogFile` são
+    gravados juntos, então o cursor só avança quando as linhas já estão salvas.
+    Cada linha possui a chave do log (arquivo, posição e pattern): as linhas já
+    gravadas de um trecho lido novamente são ignoradas, inclusive nos rollups e sessões.
+    Com um `storage`, os grupos de cada linha (chave `data`) vão para as tabelas tipadas.
+    Com um `sessions`, as sessões dos jogadores são atualizadas na mesma transação.
+    Com um `rollups`, as contagens de logs por período também.
+    Com um `raw_store`, as linhas originais de cada trecho (`raw`) também.
+    """
+
+    def __init__(
+        self,
+        batch_size: int = 0,
+        batch_interval: float = 0,
+        storage: Optional[TypedStorage] = None,
+        sessions: Optional[SessionTracker] = None,
+        rollups: Optional[RollupTracker] = None,
+        raw_store: Optional[RawStore] = None
+    ) -> None:
+        self.batch_size = batch_size
+        self.batch_interval = batch_interval
+        self.storage = storage
+        self.sessions = sessions
+        self.rollups = rollups
+        self.raw_store = raw_store
+        self.rows: list[dict] = []
+        self.raw_chunks: list[RawChunk] = []
+        self.cursors: dict[int, int] = {}
+        self._first_added_at = None
+
+    def __len__(self) -> int:
+        return len(self.rows)
+
+    def add(self, log_file_id: int, cursor_position: int, rows: list[dict], raw: Optional[RawChunk] = None) -> None:
+        if self._first_added_at is None:
+            self._first_added_at = time.monotonic()
+        self.rows.extend(rows)
+        if raw is not None:
+            self.raw_chunks.append(raw)
+        self.cursors[log_file_id] = cursor_position
+
+    def get_cursor(self, log_file_id: int, default: int) -> int:
+        """Retorna a posição do cursor considerando as linhas que ainda estão no buffer."""
+        return self.cursors.get(log_file_id, default)
+
+    def discard(self, log_file_id: int = None) -> None:
+        """Descarta o buffer (inteiro ou de um único LogFile). O cursor na database não é alterado."""
+        if log_file_id is None:
+            self.rows.clear()
+            self.raw_chunks.clear()
+            self.cursors.clear()
+            self._first_added_at = None
+        elif log_file_id in self.cursors:
+            self.rows = [row for row in self.rows if row['log_file_id'] != log_file_id]
+            self.raw_chunks = [chunk for chunk in self.raw_chunks if chunk.log_file_id != log_file_id]
+            del self.cursors[log_file_id]
+
+    def is_full(self) -> bool:
+        return self.batch_size > 0 and len(self.rows) >= self.batch_size
+
+    def is_due(self) -> bool:
+        if self._first_added_at is None:
+            return False
+        return self.is_full() or time.monotonic() - self._first_added_at >= self.batch_interval
+
+    def time_until_due(self) -> float:
+        """Segundos até o buffer precisar ser gravado (0 se já deve ser gravado, infinito se vazio)."""
+        if self._first_added_at is None:
+            return float('inf')
+        return max(0.0, self._first_added_at + self.batch_interval - time.monotonic())
+
+    def flush(self, db: Session) -> int:
+        """Grava as linhas e os cursores pendentes. Em caso de erro o buffer é mantido para uma nova tentativa."""
+        if not self.cursors:
+            return 0
+
+        started = time.perf_counter()
+        try:
+            # Linhas de um trecho lido novamente (ex. o processo foi encerrado antes do commit do cursor) já gravadas
+            rows = drop_stored(db.connection(), self.rows) if self.rows else self.rows
+            if rows and self.storage is not None:
+                self.storage.insert(db, rows)
+            elif rows:
+                insert_logs(db.connection(), rows)
+            if rows and self.sessions is not None:
+                self.sessions.apply(db, self.sessions.extract_events(rows))
+            if rows and self.rollups is not None:
+                self.rollups.apply(db, rows)
+            if self.raw_chunks and self.raw_store is not None:
+                self.raw_store.append(db, self.raw_chunks)
+            for log_file_id, cursor_position in self.cursors.items():
+                db.execute(
+                    update(LogFile.__table__)
+                    .where(LogFile.__table__.c.id == log_file_id)
+                    .values(cursor_position=cursor_position)
+                )
+            db.commit()
+        except BaseException:
+            db.rollback()
+            if self.raw_store is not None:
+                self.raw_store.reset() # Os compressores já receberam as linhas que não foram gravadas
+            raise
+
+        rows_count = len(rows)
+        if rows_count < len(self.rows):
+            logger.info(f'{len(self.rows) - rows_count} logs de trechos lidos novamente já estavam gravados e foram ignorados.')
+            metrics.inc('pzla_logs_duplicate_total', len(self.rows) - rows_count)
+        logger.debug(f'{rows_count} logs gravados na database.')
+        metrics.observe_stage('read_logs_commit', time.perf_counter() - started)
+        metrics.inc('pzla_logs_written_total', rows_count)
+        self.discard()
+        return rows_count
@@ -0,0 +1,205 @@
+# ┓ ┏┓┏┓┳┓┏┓┳┓┳┓┏┓  ┏┓┳┳┓┏┓┳┓┏┓┓
+# ┃ ┣ ┃┃┃┃┣┫┣┫┃┃┃┃  ┣┫┃┃┃┣┫┣┫┣┫┃
+# ┗┛┗┛┗┛┛┗┛┗┛┗┻┛┗┛  ┛┗┛ ┗┛┗┛┗┛┗┗┛
+# Modified: 16/10/2026
+
+# Injeção de falhas na ingestão: a cada rodada novas linhas são escritas nos arquivos (com rotações) e o main.py
+# ou o backfill.py é executado em um processo próprio e encerrado (SIGKILL) em um instante aleatório, inclusive
+# durante a inicialização e a gravação dos lotes. Em algumas rodadas o cursor de um LogFile também volta para uma
+# linha anterior, simulando um cursor perdido (ex. database restaurada ou synchronous=OFF), e os trechos já gravados
+# são lidos novamente. No final a ingestão roda até o fim e o resultado é conferido com os arquivos: cada linha com
+# match precisa estar gravada exatamente uma vez (arquivo, posição e pattern), assim como as contagens dos rollups,
+# os grupos das tabelas tipadas e as linhas originais do raw_store.
+#
+# Uso: python -m benchmarks.bench_crash [--rounds 25] [--lines-per-round 20000] [--engine mixed] [--storage json] [--seed 0]
+
+import os
+import sys
+import time
+import random
+import sqlite3
+import argparse
+import tempfile
+import subprocess
+from collections import Counter
+from .common import ROOT_DIR, setup_environment, import_app, report
+from .generator import LogGenerator
+
+FAULTS = ('kill', 'replay', 'backfill')
+FINISH_TIMEOUT = 600
+
+def overrides(args: argparse.Namespace, engine: str) -> dict:
+    return {
+        'app': {'expiration_time': 0, 'reading_frequency': 0.05, 'engine': engine, 'storage': args.storage, 'write_batch_size': args.batch_size},
+        'rollups': {'enabled': 'true', 'minute_retention': 0, 'hour_retention': 0, 'day_retention': 0},
+        'raw_store': {'enabled': 'true', 'block_size': 65536}
+    }
+
+def start(script: str, *script_args: str) -> subprocess.Popen:
+    return subprocess.Popen([sys.executable, os.path.join(ROOT_DIR, script), *script_args], cwd=ROOT_DIR, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+
+def kill_after(process: subprocess.Popen, seconds: float) -> bool:
+    """Encerra o processo sem aviso após `seconds`. Retorna se o processo ainda estava em execução."""
+    try:
+        process.wait(seconds)
+        return False
+    except subprocess.TimeoutExpired:
+        process.kill()
+        process.wait()
+        return True
+
+def rewind_cursor(database_path: str, rng: random.Random) -> bool:
+    """Volta o cursor de um LogFile aleatório para o início de uma linha anterior do mesmo arquivo."""
+    connection = sqlite3.connect(database_path, timeout=30)
+    try:
+        logfiles = connection.execute('SELECT id, file_path, cursor_position FROM log_files WHERE cursor_position > 0').fetchall()
+        if not logfiles:
+            return False
+        log_file_id, file_path, cursor = rng.choice(logfiles)
+        with open(file_path, 'rb') as f:
+            data = f.read(cursor)
+        starts = [0] + [index + 1 for index, byte in enumerate(data[:-1]) if byte == 0x0A]
+        connection.execute('UPDATE log_files SET cursor_position = ? WHERE id = ?', (rng.choice(starts), log_file_id))
+        connection.commit()
+        return True
+    finally:
+        connection.close()
+
+def is_caught_up(database_path: str, generator: LogGenerator) -> bool:
+    """Verifica se cada LogFile acompanha o arquivo atual do seu tipo e já gravou todas as linhas dele."""
+    connection = sqlite3.connect(database_path, timeout=30)
+    try:
+        cursors = dict(connection.execute('SELECT file_path, cursor_position FROM log_files').fetchall())
+    except sqlite3.OperationalError:
+        return False # Database ainda sem as tabelas
+    finally:
+        connection.close()
+    return all(cursors.get(paths[-1]) == generator.sizes[paths[-1]] for paths in generator.files.values() if paths)
+
+def expected_logs(generator: LogGenerator) -> Counter:
+    """Aplica os patterns em todas as linhas escritas. Retorna a quantidade de matches por (tipo, arquivo, posição, pattern)."""
+    from app.config import Config
+    from app.patterns import PatternRegistry
+
+    config = Config()
+    registry = PatternRegistry(config.patterns, config.default_pattern)
+    keys: Counter = Counter()
+    for log_type, paths in generator.files.items():
+        for path in paths:
+            with open(path, 'rb') as f:
+                data = f.read()
+            offset = 0
+            for line in data.split(b'\n')[:-1]:
+                for pattern_name, _ in registry.match(log_type, line.decode('utf-8', errors='ignore').strip()):
+                    keys[(log_type, os.path.basename(path), offset, pattern_name)] += 1
+                offset += len(line) + 1
+    return keys
+
+def raw_blocks_complete(connection: sqlite3.Connection, generator: LogGenerator) -> bool:
+    """Verifica se os blocos do raw_store cobrem todos os bytes de cada arquivo (blocos sobrepostos são aceitos)."""
+    blocks: dict[str, list[tuple[int, int]]] = {}
+    for file_name, start_offset, end_offset in connection.execute('SELECT file_name, start_offset, end_offset FROM raw_blocks ORDER BY file_name, start_offset'):
+        blocks.setdefault(file_name, []).append((start_offset, end_offset))
+    for paths in generator.files.values():
+        for path in paths:
+            covered = 0
+            for start_offset, end_offset in blocks.get(os.path.basename(path), []):
+                if start_offset > covered:
+                    return False
+                covered = max(covered, end_offset)
+            if covered != generator.sizes[path]:
+                return False
+    return True
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description='Injeção de falhas na ingestão: confere se cada log é gravado exatamente uma vez.')
+    parser.add_argument('--rounds', type=int, default=25, help='Rodadas com uma falha cada.')
+    parser.add_argument('--lines-per-round', type=int, default=20_000, help='Linhas escritas nos arquivos antes de cada rodada.')
+    parser.add_argument('--rotate-probability', type=float, default=0.3, help='Chance de rotacionar os arquivos em cada rodada.')
+    parser.add_argument('--max-kill-seconds', type=float, default=3.0, help='Tempo máximo até o SIGKILL em cada rodada.')
+    parser.add_argument('--batch-size', type=int, default=50_000, help='write_batch_size utilizado (lotes grandes ficam mais tempo na gravação).')
+    parser.add_argument('--engine', choices=('sync', 'async', 'mixed'), default='mixed', help='Modo de leitura (mixed alterna a cada rodada).')
+    parser.add_argument('--storage', choices=('json', 'typed'), default='json', help='Modo de armazenamento dos grupos.')
+    parser.add_argument('--seed', type=int, default=0, help='Semente das falhas e das linhas geradas.')
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    faults: Counter = Counter()
+    results = {'rounds': args.rounds, 'engine': args.engine, 'storage': args.storage}
+
+    with tempfile.TemporaryDirectory() as workdir:
+        engine = 'sync' if args.engine == 'mixed' else args.engine
+        logs_dir = setup_environment(workdir, overrides(args, engine))
+        import_app()
+        from app.config import Config
+        database_path = Config().path_database
+
+        generator = LogGenerator(logs_dir, seed=args.seed)
+        generator.rotate()
+        started = time.monotonic()
+        for round_index in range(args.rounds):
+            if args.engine == 'mixed':
+                setup_environment(workdir, overrides(args, ('sync', 'async')[round_index % 2]))
+            if round_index > 0 and rng.random() < args.rotate_probability:
+                generator.rotate()
+            generator.write(args.lines_per_round, 200)
+
+            fault = rng.choice(FAULTS) if round_index > 0 else 'kill'
+            if fault == 'backfill':
+                process = start('backfill.py', '--workers', '2', '--chunk-size', '1')
+            else:
+                process = start('main.py')
+            if kill_after(process, rng.uniform(0.1, args.max_kill_seconds)):
+                faults[f'{fault}_killed'] += 1
+            if fault == 'replay' and rewind_cursor(database_path, rng):
+                faults['cursors_rewound'] += 1
+            faults[fault] += 1
+
+        # Sem falhas: o backfill importa os arquivos não acompanhados pelos LogFiles e o main.py lê o restante
+        subprocess.run([sys.executable, os.path.join(ROOT_DIR, 'backfill.py'), '--workers', '2'], cwd=ROOT_DIR, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, check=True)
+        process = start('main.py')
+        try:
+            deadline = time.monotonic() + FINISH_TIMEOUT
+            while not is_caught_up(database_path, generator):
+                if time.monotonic() > deadline or process.poll() is not None:
+                    raise SystemExit('A ingestão não terminou de ler os arquivos.')
+                time.sleep(0.5)
+        finally:
+            kill_after(process, 0)
+        results['seconds'] = round(time.monotonic() - started, 1)
+        results.update(faults)
+
+        expected = expected_logs(generator)
+        connection = sqlite3.connect(database_path)
+        stored = Counter({
+            (log_type, file_name, byte_offset, pattern_name): count
+            for log_type, file_name, byte_offset, pattern_name, count in connection.execute(
+                'SELECT l.log_file_type, s.file_name, l.byte_offset, l.pattern_name, count(*) FROM logs l '
+                'JOIN log_sources s ON s.id = l.source_id GROUP BY 1, 2, 3, 4'
+            )
+        })
+        logs = connection.execute('SELECT count(*) FROM logs').fetchone()[0]
+        rollups = Counter({(log_type, pattern_name): count for log_type, pattern_name, count in connection.execute("SELECT log_file_type, pattern_name, sum(logs) FROM log_rollups WHERE granularity = 'day' GROUP BY 1, 2")})
+        expected_rollups = Counter()
+        for (log_type, _, _, pattern_name), count in expected.items():
+            expected_rollups[(log_type, pattern_name)] += count
+
+        results['lines'] = generator.index
+        results['expected_logs'] = sum(expected.values())
+        results['logs'] = logs
+        results['duplicated'] = sum(count - 1 for count in stored.values() if count > 1)
+        results['missing'] = len(expected.keys() - stored.keys())
+        results['unexpected'] = len(stored.keys() - expected.keys()) + logs - sum(stored.values())
+        results['rollups_equal'] = rollups == expected_rollups
+        results['logs_json_equal'] = connection.execute('SELECT count(*) FROM logs_json').fetchone()[0] == logs
+        results['raw_blocks_complete'] = raw_blocks_complete(connection, generator)
+        connection.close()
+
+    results['exactly_once'] = results['duplicated'] == results['missing'] == results['unexpected'] == 0 and \
+        results['rollups_equal'] and results['logs_json_equal'] and results['raw_blocks_complete']
+    report('crash', results)
+    if not results['exactly_once']:
+        raise SystemExit('A ingestão não gravou cada log exatamente uma vez.')
+
+if __name__ == '__main__':
+    main()
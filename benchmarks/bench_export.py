@@ -0,0 +1,75 @@
+# ┓ ┏┓┏┓┳┓┏┓┳┓┳┓┏┓  ┏┓┳┳┓┏┓┳┓┏┓┓
+# ┃ ┣ ┃┃┃┃┣┫┣┫┃┃┃┃  ┣┫┃┃┃┣┫┣┫┣┫┃
+# ┗┛┗┛┗┛┛┗┛┗┛┗┻┛┗┛  ┛┗┛ ┗┛┗┛┗┛┗┗┛
+# Modified: 16/10/2026
+
+# Mede a vazão do export.py com tamanhos crescentes da tabela logs (a vazão deve se manter estável),
+# a duração de uma exportação incremental com poucos logs novos sobre a tabela cheia e o pico de RSS.
+#
+# Uso: python -m benchmarks.bench_export [--sizes 1000,100000,1000000] [--format jsonl] [--compression gzip] [--split type]
+
+import os
+import time
+import sqlite3
+import argparse
+import tempfile
+from datetime import datetime, timedelta
+from .common import setup_environment, import_app, peak_rss_mb, report
+
+LOG_TYPES = ('user', 'chat', 'admin', 'DebugLog-server')
+DATE_FORMAT = '%Y-%m-%d %H:%M:%S.%f'
+
+def populate(connection: sqlite3.Connection, first_index: int, rows: int, start: datetime) -> None:
+    def generate():
+        for index in range(first_index, first_index + rows):
+            moment = (start + timedelta(seconds=index // 10)).strftime(DATE_FORMAT)
+            json_data = f'{{"datetime": "{moment}", "message": "mensagem de teste {index} com algum texto"}}'
+            yield ('default', 1, LOG_TYPES[index % len(LOG_TYPES)], moment, json_data, moment)
+
+    connection.executemany(
+        'INSERT INTO logs (pattern_name, log_file_id, log_file_type, log_date, json_data, created_at) VALUES (?, ?, ?, ?, ?, ?)',
+        generate()
+    )
+    connection.commit()
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description='Benchmark do export.py.')
+    parser.add_argument('--sizes', default='1000,100000,1000000', help='Tamanhos da tabela logs exportados por completo, separados por vírgula.')
+    parser.add_argument('--new-rows', type=int, default=1000, help='Logs novos na exportação incremental após o maior tamanho.')
+    parser.add_argument('--format', choices=('jsonl', 'csv'), default='jsonl', help='Formato dos arquivos.')
+    parser.add_argument('--compression', choices=('gzip', 'zstd', 'none'), default='gzip', help='Compressão dos arquivos.')
+    parser.add_argument('--split', action='append', choices=('type', 'day'), default=[], help='Divisão dos arquivos (pode ser repetido).')
+    args = parser.parse_args()
+    sizes = sorted(int(size) for size in args.sizes.split(','))
+
+    results = {'format': args.format, 'compression': args.compression, 'split': ','.join(args.split) or 'none'}
+    with tempfile.TemporaryDirectory() as workdir:
+        setup_environment(workdir)
+        import_app()
+        from app.export import Exporter
+
+        connection = sqlite3.connect(os.path.join(workdir, 'database.db'))
+        start = datetime(2026, 1, 1)
+        populated = 0
+
+        for size in sizes:
+            populate(connection, populated, size - populated, start)
+            populated = size
+            started = time.perf_counter()
+            rows = Exporter(os.path.join(workdir, f'export_{size}'), 'full', args.format, args.compression, tuple(args.split), full=True).run().rows
+            elapsed = time.perf_counter() - started
+            results[f'full_{size}_rows_per_second'] = round(rows / elapsed, 1)
+
+        # Exportação incremental: só os logs novos, com a marca da exportação completa do maior tamanho
+        populate(connection, populated, args.new_rows, start)
+        started = time.perf_counter()
+        rows = Exporter(os.path.join(workdir, f'export_{sizes[-1]}'), 'full', args.format, args.compression, tuple(args.split)).run().rows
+        results['incremental_rows'] = rows
+        results['incremental_ms'] = round((time.perf_counter() - started) * 1000, 1)
+        connection.close()
+
+    results['peak_rss_mb'] = peak_rss_mb()
+    report('export', results)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,105 @@
+# ┓ ┏┓┏┓┳┓┏┓┳┓┳┓┏┓  ┏┓┳┳┓┏┓┳┓┏┓┓
+# ┃ ┣ ┃┃┃┃┣┫┣┫┃┃┃┃  ┣┫┃┃┃┣┫┣┫┣┫┃
+# ┗┛┗┛┗┛┛┗┛┗┛┗┻┛┗┛  ┛┗┛ ┗┛┗┛┗┛┗┗┛
+# Modified: 16/10/2026
+
+# Mede a limpeza dos logs expirados e as consultas dos dashboards com e sem os índices
+# criados pela migração "0003_indexes.sql".
+#
+# Uso: python -m benchmarks.bench_indexes [--rows 10000000]
+
+import os
+import time
+import sqlite3
+import argparse
+import tempfile
+import statistics
+from datetime import datetime, timedelta
+from .common import ROOT_DIR, setup_environment, import_app, report
+
+LOG_TYPES = [('user', ('fully connected', 'disconnected player')), ('chat', ('default',)), ('admin', ('default',)), ('DebugLog-server', ('default',))]
+DATE_FORMAT = '%Y-%m-%d %H:%M:%S.%f'
+
+def populate(connection: sqlite3.Connection, rows: int, start: datetime) -> None:
+    def generate():
+        for index in range(rows):
+            log_type, pattern_names = LOG_TYPES[index % len(LOG_TYPES)]
+            moment = (start + timedelta(seconds=index // 10)).strftime(DATE_FORMAT)
+            yield (pattern_names[index % len(pattern_names)], 1, log_type, moment, '{}', moment)
+
+    connection.executemany(
+        'INSERT INTO logs (pattern_name, log_file_id, log_file_type, log_date, json_data, created_at) VALUES (?, ?, ?, ?, ?, ?)',
+        generate()
+    )
+    connection.commit()
+
+def measure(connection: sqlite3.Connection, sql: str, params: tuple, repeat: int = 5, rollback: bool = False) -> float:
+    """Retorna a mediana do tempo de execução em milissegundos."""
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        connection.execute(sql, params).fetchall()
+        timings.append((time.perf_counter() - start) * 1000)
+        if rollback:
+            connection.rollback()
+    return round(statistics.median(timings), 3)
+
+def run_queries(connection: sqlite3.Connection, start: datetime, end: datetime) -> dict:
+    day_start = (end - timedelta(days=1)).strftime(DATE_FORMAT)
+    return {
+        'cleanup_nothing_expired': measure(connection, 'DELETE FROM logs WHERE created_at < ?', (start.strftime(DATE_FORMAT),), rollback=True),
+        'cleanup_oldest_hour': measure(connection, 'DELETE FROM logs WHERE created_at < ?', ((start + timedelta(hours=1)).strftime(DATE_FORMAT),), rollback=True),
+        'query_type_pattern_day': measure(
+            connection,
+            'SELECT COUNT(*) FROM logs WHERE log_file_type = ? AND pattern_name = ? AND log_date BETWEEN ? AND ?',
+            ('user', 'fully connected', day_start, end.strftime(DATE_FORMAT))
+        ),
+        'query_type_latest': measure(
+            connection,
+            'SELECT * FROM logs WHERE log_file_type = ? AND pattern_name = ? ORDER BY log_date DESC LIMIT 100',
+            ('user', 'disconnected player')
+        )
+    }
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description='Benchmark dos índices da tabela logs.')
+    parser.add_argument('--rows', type=int, default=10_000_000, help='Quantidade de logs gerados.')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as workdir:
+        setup_environment(workdir)
+        app = import_app()
+        app.database.Database().engine.dispose()
+
+        connection = sqlite3.connect(os.path.join(workdir, 'database.db'))
+        with open(os.path.join(ROOT_DIR, 'app', 'migrations', '0003_indexes.sql'), encoding='utf-8') as f:
+            index_commands = [command for command in app.database.split_sql_script(f.read()) if 'ON logs' in command]
+
+        connection.execute('DROP INDEX ix_logs_created_at')
+        connection.execute('DROP INDEX ix_logs_type_pattern_date')
+
+        start = datetime(2026, 1, 1)
+        populate_started_at = time.perf_counter()
+        populate(connection, args.rows, start)
+        populate_seconds = time.perf_counter() - populate_started_at
+        end = start + timedelta(seconds=args.rows // 10)
+
+        without_indexes = run_queries(connection, start, end)
+
+        index_started_at = time.perf_counter()
+        for command in index_commands:
+            connection.execute(command)
+        connection.commit()
+        index_seconds = time.perf_counter() - index_started_at
+
+        with_indexes = run_queries(connection, start, end)
+        connection.close()
+
+    results = {'rows': args.rows, 'populate_seconds': round(populate_seconds, 1), 'create_indexes_seconds': round(index_seconds, 1)}
+    for key in without_indexes:
+        results[f'{key}_without_indexes_ms'] = without_indexes[key]
+        results[f'{key}_with_indexes_ms'] = with_indexes[key]
+    report('indexes', results)
+
+if __name__ == '__main__':
+    main()
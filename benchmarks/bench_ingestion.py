@@ -0,0 +1,366 @@
+# ┓ ┏┓┏┓┳┓┏┓┳┓┳┓┏┓  ┏┓┳┳┓┏┓┳┓┏┓┓
+# ┃ ┣ ┃┃┃┃┣┫┣┫┃┃┃┃  ┣┫┃┃┃┣┫┣┫┣┫┃
+# ┗┛┗┛┗┛┛┗┛┗┛┗┻┛┗┛  ┛┗┛ ┗┛┗┛┗┛┗┗┛
+# Modified: 16/10/2026
+
+# Cenários de ingestão com o Reader real sobre um diretório Logs/ sintético e uma database temporária:
+# - backfill: partida a frio com os arquivos já escritos (e arquivos rotacionados antigos no diretório);
+# - tailing: linhas acrescentadas em tempo real na taxa configurada;
+# - rotation: como o tailing, criando novos arquivos de log periodicamente;
+# - retention: tailing enquanto a limpeza remove um volume grande de logs expirados.
+#
+# O cenário soak (fora do --scenario all) ingere --soak-lines linhas em blocos, com rotações e limpeza contínuas,
+# e falha se o RSS do processo crescer mais que --max-rss-growth-mb depois do aquecimento.
+#
+# Cada cenário roda em um processo próprio (o app carrega a configuração na importação) e informa a vazão,
+# a latência p50/p99 entre a escrita da linha no arquivo e o commit do cursor que a inclui, e o pico de RSS.
+# Com --output o resultado é salvo em JSON, e com --compare é comparado com um resultado anterior.
+#
+# Uso: python -m benchmarks.bench_ingestion [--scenario all] [--output atual.json] [--compare anterior.json]
+#      python -m benchmarks.bench_ingestion --scenario soak [--soak-lines 50000000]
+
+import gc
+import os
+import sys
+import json
+import time
+import sqlite3
+import argparse
+import tempfile
+import subprocess
+from datetime import timedelta
+from .common import setup_environment, import_app, peak_rss_mb, git_revision, report
+from .generator import LogGenerator, LiveWriter
+
+SCENARIOS = ('backfill', 'tailing', 'rotation', 'retention')
+SOAK_BLOCK_LINES = 200_000
+
+class CommitTracker:
+    """Mede a latência de cada linha registrada pelo LogGenerator até o commit do cursor que a inclui.
+
+    As linhas de uma mesma escrita compartilham o instante, então as latências são guardadas
+    como pares (latência, quantidade) em vez de um valor por linha.
+    """
+
+    def __init__(self, generator: LogGenerator, not_before: float = 0) -> None:
+        self.generator = generator
+        self.not_before = not_before
+        self.samples: list[tuple[float, int]] = []
+        self.committed = 0
+
+    def pending(self) -> int:
+        with self.generator.lock:
+            return sum(len(ends) - next_index for batches in self.generator.written.values() for _, ends, next_index in batches)
+
+    def update(self, db) -> None:
+        from sqlalchemy import select
+        from app.database import LogFile
+
+        cursors = {log_type: (file_path, cursor) for log_type, file_path, cursor in db.execute(select(LogFile.log_type, LogFile.file_path, LogFile.cursor_position))}
+        now = time.monotonic()
+        with self.generator.lock:
+            for log_type, paths in self.generator.files.items():
+                if log_type not in cursors or cursors[log_type][0] not in paths:
+                    continue
+                current_path, cursor = cursors[log_type]
+                current_index = paths.index(current_path)
+                for index, path in enumerate(paths[:current_index + 1]):
+                    batches = self.generator.written.get(path)
+                    while batches:
+                        batch = batches[0]
+                        written_at, ends, next_index = batch
+                        # Um arquivo anterior ao acompanhado pelo LogFile já foi lido por inteiro
+                        last_index = len(ends) if index < current_index else next_index
+                        while last_index < len(ends) and ends[last_index] <= cursor:
+                            last_index += 1
+                        if last_index > next_index:
+                            self.samples.append((now - max(written_at, self.not_before), last_index - next_index))
+                            self.committed += last_index - next_index
+                            batch[2] = last_index
+                        if last_index < len(ends):
+                            break
+                        batches.popleft()
+
+    def percentile(self, q: float) -> float:
+        """Retorna o percentil `q` (0 a 1) das latências em milissegundos."""
+        total = sum(count for _, count in self.samples)
+        if total == 0:
+            return 0.0
+        accumulated = 0
+        for latency, count in sorted(self.samples):
+            accumulated += count
+            if accumulated >= q * total:
+                return round(latency * 1000, 1)
+        return round(max(self.samples)[0] * 1000, 1)
+
+def run_cycle(reader, db) -> None:
+    """Executa as etapas de um looping principal."""
+    servers = reader.servers_to_sync()
+    reader.update_cached_logsfiles(servers)
+    reader.update_database_logfiles(db, servers)
+    reader.read_logs(db)
+    reader.report_latency()
+    reader.clean_logs(db)
+    reader.run_maintenance()
+    reader.release_session(db)
+
+def wait_cycle(reader, limit: float = float('inf')) -> None:
+    """Aguarda o watcher antes do próximo looping se não houver logs pendentes, como o looping principal, por no máximo `limit` segundos."""
+    if not reader.has_backlog:
+        reader.watcher.wait(min(reader.watch_timeout(), reader.writer.time_until_due(), limit))
+
+def ingest(app, tracker: CommitTracker, live: LiveWriter = None, timeout: float = 600, on_cycle=None) -> dict:
+    """Executa os loopings até todas as linhas registradas serem gravadas (e o LiveWriter terminar)."""
+    from app.config import Config
+    from app.database import Database, Log
+    from app.watcher import create_watcher
+
+    config = Config()
+    reader = app.reader
+    reader.watcher = create_watcher(config.path_zomboid_logs, config.app_watcher)
+    cycles = 0
+
+    with Database().create_session() as db:
+        start = time.monotonic()
+        if live is not None:
+            live.start()
+        try:
+            while time.monotonic() - start < timeout:
+                run_cycle(reader, db)
+                tracker.update(db)
+                cycles += 1
+                if on_cycle is not None:
+                    on_cycle(reader, db)
+                if (live is None or not live.is_alive()) and tracker.pending() == 0:
+                    break
+                # O fim do LiveWriter não gera eventos do inotify, então a espera é limitada enquanto ele executa
+                wait_cycle(reader, config.app_reading_frequency if live is not None and live.is_alive() else float('inf'))
+        finally:
+            reader.writer.flush(db)
+            reader.watcher.close()
+            reader.close_file_readers()
+        elapsed = time.monotonic() - start
+        rows = db.query(Log).count()
+
+    return {
+        'lines': tracker.committed,
+        'rows': rows,
+        'cycles': cycles,
+        'seconds': round(elapsed, 3),
+        'lines_per_second': round(tracker.committed / elapsed, 1),
+        'latency_p50_ms': tracker.percentile(0.5),
+        'latency_p99_ms': tracker.percentile(0.99),
+        'pending_lines': tracker.pending()
+    }
+
+def scenario_backfill(app, logs_dir: str, args: argparse.Namespace) -> dict:
+    generator = LogGenerator(logs_dir, args.match_ratio)
+    generator.generate(args.lines, args.rotated, args.lines_per_second, track=True)
+    return ingest(app, CommitTracker(generator, not_before=time.monotonic()))
+
+def scenario_tailing(app, logs_dir: str, args: argparse.Namespace, rotate_every: float = 0) -> dict:
+    generator = LogGenerator(logs_dir, args.match_ratio)
+    generator.rotate()
+    live = LiveWriter(generator, args.lines_per_second, args.duration, rotate_every)
+    results = ingest(app, CommitTracker(generator), live)
+    if rotate_every > 0:
+        results['rotations'] = live.rotations
+    return results
+
+def scenario_retention(app, logs_dir: str, args: argparse.Namespace) -> dict:
+    from app.config import Config
+    from app.retention import utc_now
+
+    # Logs expirados gravados diretamente, como se tivessem sido lidos há dois dias
+    created_at = (utc_now() - timedelta(days=2)).strftime('%Y-%m-%d %H:%M:%S')
+    connection = sqlite3.connect(Config().path_database)
+    connection.executemany(
+        'INSERT INTO logs (pattern_name, log_file_id, log_file_type, log_date, json_data, created_at) VALUES (?, 0, ?, ?, ?, ?)',
+        (('default', 'chat', created_at, '{"message": "expirado"}', created_at) for _ in range(args.expired_rows))
+    )
+    connection.commit()
+    connection.close()
+
+    deleted = {'rows': 0, 'seconds': 0.0, 'last': None}
+    def on_cycle(reader, db) -> None:
+        if reader.last_retention is not None and reader.last_retention is not deleted['last']:
+            deleted['last'] = reader.last_retention
+            deleted['rows'] += reader.last_retention.deleted
+            deleted['seconds'] += reader.last_retention.elapsed
+
+    generator = LogGenerator(logs_dir, args.match_ratio)
+    generator.rotate()
+    results = ingest(app, CommitTracker(generator), LiveWriter(generator, args.lines_per_second, args.duration), on_cycle=on_cycle)
+    results['expired_rows'] = args.expired_rows
+    results['deleted_rows'] = deleted['rows']
+    results['deleted_per_second'] = round(deleted['rows'] / deleted['seconds'], 1) if deleted['seconds'] > 0 else 0
+    return results
+
+def scenario_soak(app, logs_dir: str, args: argparse.Namespace) -> dict:
+    """Escreve blocos de linhas e executa os loopings até cada bloco ser gravado, medindo o RSS atual após cada bloco.
+
+    Os arquivos são rotacionados a cada --soak-rotate-lines linhas e os arquivos já lidos são apagados, e a limpeza
+    remove os logs expirados, então o disco e a database não crescem durante o teste. O crescimento do RSS é a
+    diferença entre a média dos últimos 10% das medições e a dos primeiros 10% após o aquecimento (20% iniciais).
+    A quantidade de objetos Python rastreados pelo gc é medida junto, separando o crescimento do processo do
+    cache de páginas do SQLite.
+    """
+    from sqlalchemy import select
+    from app.config import Config
+    from app.database import Database, LogFile
+    from app.metrics import current_rss_bytes
+    from app.watcher import create_watcher
+
+    config = Config()
+    reader = app.reader
+    reader.watcher = create_watcher(config.path_zomboid_logs, config.app_watcher)
+    generator = LogGenerator(logs_dir, args.match_ratio)
+    generator.rotate()
+    samples: list[float] = []
+    objects: list[int] = []
+    written = cycles = 0
+    next_rotation = args.soak_rotate_lines
+
+    with Database().create_session() as db:
+        start = time.monotonic()
+        try:
+            while written < args.soak_lines:
+                if written >= next_rotation:
+                    next_rotation += args.soak_rotate_lines
+                    generator.rotate()
+                block = min(SOAK_BLOCK_LINES, args.soak_lines - written)
+                generator.write(block, args.lines_per_second)
+                written += block
+
+                current = {paths[-1]: generator.sizes[paths[-1]] for paths in generator.files.values()}
+                while True:
+                    run_cycle(reader, db)
+                    cycles += 1
+                    cursors = dict(db.execute(select(LogFile.file_path, LogFile.cursor_position)).all())
+                    if all(cursors.get(path) == size for path, size in current.items()):
+                        break
+                    wait_cycle(reader)
+
+                for paths in generator.files.values(): # Arquivos anteriores ao atual já foram lidos por inteiro
+                    while len(paths) > 1:
+                        old_path = paths.pop(0)
+                        os.remove(old_path)
+                        del generator.sizes[old_path]
+
+                samples.append(current_rss_bytes() / 1024 / 1024)
+                objects.append(len(gc.get_objects()))
+        finally:
+            reader.writer.flush(db)
+            reader.watcher.close()
+            reader.close_file_readers()
+        elapsed = time.monotonic() - start
+
+    warmup = len(samples) // 5
+    measured = samples[warmup:] or samples
+    measured_objects = objects[warmup:] or objects
+    window = max(len(measured) // 10, 1)
+    growth = sum(measured[-window:]) / window - sum(measured[:window]) / window
+    return {
+        'lines': written,
+        'cycles': cycles,
+        'seconds': round(elapsed, 3),
+        'lines_per_second': round(written / elapsed, 1),
+        'rss_start_mb': round(measured[0], 1),
+        'rss_end_mb': round(measured[-1], 1),
+        'rss_max_mb': round(max(measured), 1),
+        'rss_growth_mb': round(growth, 1),
+        'objects_start': measured_objects[0],
+        'objects_end': measured_objects[-1],
+        'rss_flat': growth <= args.max_rss_growth_mb
+    }
+
+def run_scenario(args: argparse.Namespace) -> dict:
+    overrides = {'app': {'expiration_time': 0}}
+    if args.scenario == 'retention':
+        overrides = {'app': {'expiration_time': 86400}, 'retention': {'interval': 1}}
+    elif args.scenario == 'soak':
+        # Logs expirados após 10 segundos, sem pausa entre os lotes da limpeza. Sem mmap e com um cache de páginas
+        # pequeno, que enche durante o aquecimento: com os 64 MB padrão o cache continua enchendo por milhões de
+        # linhas (as tabelas de sessões crescem) e o RSS sobe até o limite configurado sem ser um vazamento.
+        overrides = {
+            'app': {'expiration_time': 10, 'reading_frequency': 0.05},
+            'retention': {'interval': 1, 'batch_size': 50000, 'batch_pause': 0},
+            'database': {'mmap_size': 0, 'cache_size': -8192}
+        }
+
+    with tempfile.TemporaryDirectory() as workdir:
+        logs_dir = setup_environment(workdir, overrides)
+        app = import_app()
+
+        if args.scenario == 'backfill':
+            results = scenario_backfill(app, logs_dir, args)
+        elif args.scenario == 'tailing':
+            results = scenario_tailing(app, logs_dir, args)
+        elif args.scenario == 'rotation':
+            results = scenario_tailing(app, logs_dir, args, rotate_every=args.rotate_every)
+        elif args.scenario == 'soak':
+            results = scenario_soak(app, logs_dir, args)
+        else:
+            results = scenario_retention(app, logs_dir, args)
+
+    results['peak_rss_mb'] = peak_rss_mb()
+    return results
+
+def compare(previous: dict, current: dict) -> None:
+    """Imprime a variação de cada valor numérico em relação a um resultado anterior."""
+    print(f'--- comparação com {previous.get("revision") or "o resultado anterior"}')
+    for key, value in current.items():
+        old = previous.get(key)
+        if isinstance(value, (int, float)) and isinstance(old, (int, float)) and not isinstance(value, bool) and old:
+            print(f'{key:<40} {old:>12} -> {value:<12} ({(value - old) / old * 100:+.1f}%)')
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description='Benchmark dos cenários de ingestão dos logs.')
+    parser.add_argument('--scenario', choices=SCENARIOS + ('soak', 'all'), default='all', help='Cenário executado.')
+    parser.add_argument('--lines', type=int, default=200_000, help='Linhas dos arquivos atuais no backfill.')
+    parser.add_argument('--rotated', type=int, default=2, help='Arquivos rotacionados por tipo de log no backfill.')
+    parser.add_argument('--duration', type=float, default=20, help='Segundos de escrita em tempo real nos cenários com tailing.')
+    parser.add_argument('--lines-per-second', type=float, default=2000, help='Linhas escritas por segundo nos cenários com tailing.')
+    parser.add_argument('--match-ratio', type=float, default=0.9, help='Fração das linhas que combinam com os patterns.')
+    parser.add_argument('--rotate-every', type=float, default=5, help='Segundos entre as rotações no cenário rotation.')
+    parser.add_argument('--expired-rows', type=int, default=500_000, help='Logs expirados removidos no cenário retention.')
+    parser.add_argument('--soak-lines', type=int, default=50_000_000, help='Linhas ingeridas no cenário soak.')
+    parser.add_argument('--soak-rotate-lines', type=int, default=1_000_000, help='Linhas entre as rotações no cenário soak.')
+    parser.add_argument('--max-rss-growth-mb', type=float, default=16, help='Crescimento máximo do RSS aceito no cenário soak.')
+    parser.add_argument('--output', help='Arquivo onde o resultado JSON é salvo.')
+    parser.add_argument('--compare', help='Resultado JSON anterior para comparação.')
+    args = parser.parse_args()
+
+    if args.scenario != 'all':
+        results = {'scenario': args.scenario, **run_scenario(args)}
+    else:
+        # Um processo por cenário: configuração, singletons e pico de memória independentes
+        results = {}
+        forwarded = []
+        for option in ('lines', 'rotated', 'duration', 'lines_per_second', 'match_ratio', 'rotate_every', 'expired_rows'):
+            forwarded += [f'--{option.replace("_", "-")}', str(getattr(args, option))]
+        for scenario in SCENARIOS:
+            completed = subprocess.run([sys.executable, '-m', 'benchmarks.bench_ingestion', '--scenario', scenario, *forwarded], capture_output=True, text=True)
+            lines = [line for line in completed.stdout.splitlines() if line.startswith('{')]
+            if completed.returncode != 0 or not lines:
+                print(completed.stdout + completed.stderr, file=sys.stderr)
+                raise SystemExit(f'O cenário {scenario} falhou.')
+            scenario_results = json.loads(lines[-1])
+            for key, value in scenario_results.items():
+                if key not in ('benchmark', 'timestamp', 'revision', 'scenario'):
+                    results[f'{scenario}_{key}'] = value
+
+    report('ingestion', results)
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump({'revision': git_revision(), **results}, f, indent=2)
+    if args.compare:
+        with open(args.compare, encoding='utf-8') as f:
+            previous = json.load(f)
+        compare(previous, results)
+    if results.get('rss_flat') is False:
+        raise SystemExit(f'O RSS cresceu {results["rss_growth_mb"]} MB durante o cenário soak (limite: {args.max_rss_growth_mb} MB).')
+
+if __name__ == '__main__':
+    main()
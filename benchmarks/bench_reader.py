@@ -0,0 +1,149 @@
+# ┓ ┏┓┏┓┳┓┏┓┳┓┳┓┏┓  ┏┓┳┳┓┏┓┳┓┏┓┓
+# ┃ ┣ ┃┃┃┃┣┫┣┫┃┃┃┃  ┣┫┃┃┃┣┫┣┫┣┫┃
+# ┗┛┗┛┗┛┛┗┛┗┛┗┻┛┗┛  ┛┗┛ ┗┛┗┛┗┛┗┗┛
+# Modified: 16/10/2026
+
+# Compara a leitura das linhas de um user.txt sintético (sem gravar na database):
+# - per_line: abre, posiciona, lê uma linha e fecha o arquivo para cada linha, decodificando todas;
+# - chunk_reopen: abre o arquivo a cada ciclo, lê o trecho do ciclo e decodifica linha a linha;
+# - file_reader: LogFileReader aberto entre os ciclos, decodificando o trecho inteiro de uma vez.
+#
+# As chamadas de sistema de leitura vêm de /proc/self/io (Linux). Uma parte das linhas não combina
+# com nenhum pattern (--noise), como acontece com as mensagens não configuradas dos logs reais.
+#
+# Com --no-match os patterns não são aplicados, medindo apenas a leitura e a decodificação.
+#
+# Uso: python -m benchmarks.bench_reader [--lines 200000] [--noise 0.5] [--no-match]
+
+import os
+import time
+import argparse
+import tempfile
+from datetime import datetime, timedelta
+from .common import setup_environment, import_app, user_line, format_stamp, report
+
+MAX_LINES = 5000
+MAX_BYTES = 1024 * 1024
+
+def read_syscalls() -> int:
+    try:
+        with open('/proc/self/io') as f:
+            for line in f:
+                if line.startswith('syscr:'):
+                    return int(line.split()[1])
+    except OSError:
+        pass
+    return -1
+
+def write_log(logs_dir: str, lines: int, noise: float) -> str:
+    start = datetime(2026, 10, 16, 12, 0, 0)
+    path = os.path.join(logs_dir, '16-10-26_12-00-00_user.txt')
+    noise_every = round(1 / noise) if noise > 0 else 0
+    with open(path, 'w', encoding='utf-8', newline='\n') as f:
+        for index in range(lines):
+            moment = start + timedelta(milliseconds=index * 10)
+            if noise_every and index % noise_every == 0:
+                f.write(f'[{format_stamp(moment)}] {76561198000000000 + index % 1000} "Player {index % 1000}" attempting to join.\n')
+            else:
+                f.write(user_line(moment, index))
+    return path
+
+def run_per_line(registry, path: str) -> dict:
+    position = 0
+    size = os.path.getsize(path)
+    decoded = matched = 0
+    while position < size:
+        with open(path, 'rb') as f:
+            f.seek(position)
+            line_bytes = f.readline()
+        position += len(line_bytes)
+        line = line_bytes.decode('utf-8', errors='ignore').strip()
+        decoded += 1
+        matched += len(registry.match('user', line))
+    return {'decoded_lines': decoded, 'matches': matched}
+
+def run_chunk_reopen(registry, path: str) -> dict:
+    position = 0
+    size = os.path.getsize(path)
+    decoded = matched = 0
+    while position < size:
+        with open(path, 'rb') as f:
+            f.seek(position)
+            chunk = f.read(MAX_BYTES)
+        lines_bytes = chunk.split(b'\n')
+        lines_bytes.pop()
+        lines_bytes = lines_bytes[:MAX_LINES]
+        position += sum(len(line_bytes) + 1 for line_bytes in lines_bytes)
+        for line_bytes in lines_bytes:
+            line = line_bytes.decode('utf-8', errors='ignore').strip()
+            decoded += 1
+            matched += len(registry.match('user', line))
+    return {'decoded_lines': decoded, 'matches': matched}
+
+def run_file_reader(registry, path: str) -> dict:
+    from app.filereader import LogFileReader, complete_lines_end, decode_lines
+
+    file_reader = LogFileReader(path)
+    position = 0
+    size = os.path.getsize(path)
+    decoded = matched = 0
+    while position < size:
+        data, at_eof = file_reader.read(position, MAX_BYTES)
+        end = complete_lines_end(data, MAX_LINES)
+        position += end
+        for line in decode_lines(data, end):
+            line = line.strip()
+            decoded += 1
+            matched += len(registry.match('user', line))
+    file_reader.close()
+    return {'decoded_lines': decoded, 'matches': matched}
+
+def measure(function, registry, path: str, lines: int) -> dict:
+    syscalls = read_syscalls()
+    start = time.perf_counter()
+    result = function(registry, path)
+    elapsed = time.perf_counter() - start
+    syscalls = read_syscalls() - syscalls
+    return {
+        **result,
+        'seconds': round(elapsed, 3),
+        'lines_per_second': round(lines / elapsed),
+        'read_syscalls': syscalls,
+        'read_syscalls_per_1k_lines': round(syscalls / lines * 1000, 2)
+    }
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description='Benchmark da leitura das linhas dos arquivos de log.')
+    parser.add_argument('--lines', type=int, default=200_000, help='Quantidade de linhas do arquivo.')
+    parser.add_argument('--legacy-lines', type=int, default=20_000, help='Linhas lidas pelo modo per_line (mais lento).')
+    parser.add_argument('--noise', type=float, default=0.5, help='Fração das linhas que não combinam com nenhum pattern.')
+    parser.add_argument('--no-match', action='store_true', help='Não aplica os patterns, medindo apenas a leitura.')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as workdir:
+        logs_dir = setup_environment(workdir)
+        import_app()
+        from app.config import Config
+        from app.patterns import PatternRegistry
+
+        config = Config()
+        registry = PatternRegistry({} if args.no_match else config.patterns, {} if args.no_match else config.default_pattern)
+        legacy_dir = os.path.join(workdir, 'legacy')
+        os.makedirs(legacy_dir)
+
+        path = write_log(logs_dir, args.lines, args.noise)
+        legacy_path = write_log(legacy_dir, args.legacy_lines, args.noise)
+
+        results = {'lines': args.lines, 'legacy_lines': args.legacy_lines, 'noise': args.noise, 'match': not args.no_match}
+        for name, function, file_path, lines in [
+            ('per_line', run_per_line, legacy_path, args.legacy_lines),
+            ('chunk_reopen', run_chunk_reopen, path, args.lines),
+            ('file_reader', run_file_reader, path, args.lines)
+        ]:
+            for key, value in measure(function, registry, file_path, lines).items():
+                results[f'{name}_{key}'] = value
+
+    report('reader', results)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,105 @@
+# ┓ ┏┓┏┓┳┓┏┓┳┓┳┓┏┓  ┏┓┳┳┓┏┓┳┓┏┓┓
+# ┃ ┣ ┃┃┃┃┣┫┣┫┃┃┃┃  ┣┫┃┃┃┣┫┣┫┣┫┃
+# ┗┛┗┛┗┛┛┗┛┗┛┗┻┛┗┛  ┛┗┛ ┗┛┗┛┗┛┗┗┛
+# Modified: 16/10/2026
+
+# Mede o raw_store e o reparse.py sobre uma semana de logs do tipo user (um arquivo por dia): a taxa de
+# compressão dos blocos, a vazão da gravação dos blocos pelo RawStore, a importação pelo backfill.py com os
+# blocos e a duração do reparse da semana inteira com os patterns atuais, conferindo os logs gerados.
+#
+# Uso: python -m benchmarks.bench_reparse [--lines 2000000] [--workers 1,4]
+
+import os
+import time
+import argparse
+import tempfile
+from datetime import datetime, timedelta
+from .common import setup_environment, import_app, peak_rss_mb, report, user_line
+from .generator import noise_line
+
+DAYS = 7
+CHUNK_SIZE = 1024 * 1024 # Trechos lidos pelo Reader com o max_bytes_per_cycle padrão
+
+def write_week(history_dir: str, lines: int, start: datetime, match_ratio: float = 0.9) -> int:
+    """Escreve um arquivo user por dia com as linhas distribuídas na semana. Retorna o tamanho total em bytes."""
+    os.makedirs(history_dir, exist_ok=True)
+    per_day = lines // DAYS
+    step = 86400 / per_day
+    total = 0
+    for day in range(DAYS):
+        day_start = start + timedelta(days=day)
+        path = os.path.join(history_dir, f'{day_start.strftime("%d-%m-%y_%H-%M-%S")}_user.txt')
+        with open(path, 'w', encoding='utf-8', newline='\n') as f:
+            for index in range(day * per_day, (day + 1) * per_day):
+                moment = day_start + timedelta(seconds=(index - day * per_day) * step)
+                f.write(user_line(moment, index) if index % 100 < match_ratio * 100 else noise_line('user', moment, index))
+        total += os.path.getsize(path)
+    return total
+
+def time_raw_store(db, history_dir: str) -> float:
+    """Grava os arquivos em trechos de 1 MB por um RawStore, como o LogWriter. Retorna os MB por segundo."""
+    from app.rawstore import create_raw_store
+    raw_store = create_raw_store()
+    elapsed = 0.0
+    size = 0
+    for log_file_id, name in enumerate(sorted(os.listdir(history_dir)), start=1000):
+        with open(os.path.join(history_dir, name), 'rb') as f:
+            start = 0
+            while data := f.read(CHUNK_SIZE):
+                started = time.perf_counter()
+                raw_store.append(db, [raw_store.chunk(log_file_id, 'default', 'bench', 'bench_' + name, start, data, [])])
+                db.commit()
+                elapsed += time.perf_counter() - started
+                start += len(data)
+                size += len(data)
+    db.connection().exec_driver_sql("DELETE FROM raw_blocks WHERE log_type = 'bench'")
+    db.commit()
+    return size / 1024 / 1024 / elapsed
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description='Benchmark do raw_store e do reparse.py.')
+    parser.add_argument('--lines', type=int, default=2_000_000, help='Linhas na semana de logs.')
+    parser.add_argument('--workers', default=f'1,{os.cpu_count() or 1}', help='Quantidades de processos do reparse, separadas por vírgula.')
+    args = parser.parse_args()
+
+    results = {'lines': args.lines}
+    with tempfile.TemporaryDirectory() as workdir:
+        setup_environment(workdir, {'raw_store': {'enabled': 'true'}, 'sessions': {'enabled': 'false'}})
+        import_app()
+        from app.database import Database
+        from app.backfill import Backfill
+        from app.reparse import Reparse
+
+        history_dir = os.path.join(workdir, 'history')
+        results['log_mb'] = round(write_week(history_dir, args.lines, datetime(2026, 10, 1)) / 1024 / 1024, 1)
+
+        started = time.perf_counter()
+        Backfill(history_dir, workers=os.cpu_count() or 1, chunk_size=32 * 1024 * 1024).run()
+        results['backfill_seconds'] = round(time.perf_counter() - started, 2)
+
+        database = Database()
+        with database.create_session() as db:
+            connection = db.connection()
+            raw_bytes, stored_bytes, blocks = connection.exec_driver_sql('SELECT sum(end_offset - start_offset), sum(length(data)), count(*) FROM raw_blocks').one()
+            logs = connection.exec_driver_sql('SELECT count(*) FROM logs').scalar()
+            db.commit()
+            results['raw_blocks'] = blocks
+            results['raw_store_mb'] = round(stored_bytes / 1024 / 1024, 1)
+            results['compression_ratio'] = f'{stored_bytes / raw_bytes:.1%}'
+            results['raw_store_write_mb_per_second'] = round(time_raw_store(db, history_dir), 1)
+
+        for workers in sorted({max(int(value), 1) for value in args.workers.split(',')}):
+            reparse_report = Reparse(workers=workers).run()
+            results[f'reparse_{workers}w_seconds'] = round(reparse_report.elapsed, 2)
+            results[f'reparse_{workers}w_lines_per_second'] = round(reparse_report.lines / reparse_report.elapsed, 1)
+            results[f'reparse_{workers}w_same_logs'] = reparse_report.deleted == reparse_report.inserted == logs
+
+        with database.create_session() as db:
+            results['logs_after_reparse'] = db.connection().exec_driver_sql('SELECT count(*) FROM logs').scalar() == logs
+        database.engine.dispose()
+
+    results['peak_rss_mb'] = peak_rss_mb()
+    report('reparse', results)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,127 @@
+# ┓ ┏┓┏┓┳┓┏┓┳┓┳┓┏┓  ┏┓┳┳┓┏┓┳┓┏┓┓
+# ┃ ┣ ┃┃┃┃┣┫┣┫┃┃┃┃  ┣┫┃┃┃┣┫┣┫┣┫┃
+# ┗┛┗┛┗┛┛┗┛┗┛┗┻┛┗┛  ┛┗┛ ┗┛┗┛┗┛┗┗┛
+# Modified: 16/10/2026
+
+# Compara os gráficos de logs por hora (30 dias) e por minuto (1 dia) agrupando a tabela logs com a leitura da
+# tabela log_rollups, sobre logs distribuídos em 30 dias. Mede também o custo dos rollups na gravação do
+# LogWriter (parte da duração de cada lote), a duração do rollups.py --rebuild e confere os rollups com os logs.
+#
+# Uso: python -m benchmarks.bench_rollups [--rows 3000000] [--runs 5]
+
+import time
+import argparse
+import statistics
+import tempfile
+from datetime import datetime, timedelta
+from .common import setup_environment, import_app, peak_rss_mb, report
+
+PATTERNS = (('user', 'fully connected'), ('user', 'disconnected player'), ('chat', 'default'), ('admin', 'default'), ('DebugLog-server', 'default'))
+DAYS = 30
+BATCH_SIZE = 10000
+
+def generate_rows(first_index: int, count: int, total: int, start: datetime) -> list[dict]:
+    """Linhas no formato do LogWriter, distribuídas igualmente nos 30 dias a partir de `start`."""
+    step = DAYS * 86400 / total
+    rows = []
+    for index in range(first_index, first_index + count):
+        log_file_type, pattern_name = PATTERNS[index % len(PATTERNS)]
+        log_date = start + timedelta(seconds=index * step)
+        if log_file_type == 'user':
+            json_data = f'{{"datetime": "{log_date}", "steamid": "7656119{index % 2000:010d}", "coordx": "1", "coordy": "2", "coordz": "0"}}'
+        else:
+            json_data = f'{{"datetime": "{log_date}", "message": "mensagem de teste {index}"}}'
+        rows.append({'pattern_name': pattern_name, 'log_file_id': 1, 'log_file_type': log_file_type, 'server': 'default', 'log_date': log_date, 'json_data': json_data})
+    return rows
+
+def write(writer, db, rows_total: int, start: datetime) -> tuple[float, float]:
+    """Grava as linhas em lotes pelo LogWriter. Retorna a duração da gravação e a parte gasta nos rollups."""
+    rollups = writer.rollups
+    apply = rollups.apply
+    rollups_elapsed = 0.0
+
+    def timed_apply(*args) -> None:
+        nonlocal rollups_elapsed
+        started = time.perf_counter()
+        apply(*args)
+        rollups_elapsed += time.perf_counter() - started
+
+    rollups.apply = timed_apply
+    elapsed = 0.0
+    for offset in range(0, rows_total, BATCH_SIZE):
+        rows = generate_rows(offset, min(BATCH_SIZE, rows_total - offset), rows_total, start)
+        started = time.perf_counter()
+        writer.add(1, offset, rows)
+        writer.flush(db)
+        elapsed += time.perf_counter() - started
+    return elapsed, rollups_elapsed
+
+def compare_charts(connection, charts: dict) -> dict:
+    """Compara os pontos de cada gráfico agrupando a tabela logs e lendo a tabela log_rollups."""
+    return {name: sorted(map(tuple, connection.exec_driver_sql(raw_sql, (since,)).all())) == sorted(map(tuple, connection.exec_driver_sql(rollup_sql, (granularity, since)).all()))
+            for name, (granularity, raw_sql, rollup_sql, since) in charts.items()}
+
+def median_ms(function, runs: int) -> float:
+    durations = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        function()
+        durations.append(time.perf_counter() - started)
+    return round(statistics.median(durations) * 1000, 2)
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description='Benchmark dos rollups (log_rollups x GROUP BY na tabela logs).')
+    parser.add_argument('--rows', type=int, default=3_000_000, help='Logs distribuídos em 30 dias.')
+    parser.add_argument('--runs', type=int, default=5, help='Execuções de cada consulta (é utilizada a mediana).')
+    args = parser.parse_args()
+
+    results = {'rows': args.rows}
+    with tempfile.TemporaryDirectory() as workdir:
+        setup_environment(workdir, {'rollups': {'enabled': 'true', 'minute_retention': 0, 'hour_retention': 0}})
+        import_app()
+        from app.database import Database
+        from app.writer import LogWriter
+        from app.rollups import create_rollups
+
+        database = Database()
+        start = datetime(2026, 1, 1)
+        end = start + timedelta(days=DAYS)
+        rollup_sql = 'SELECT bucket, log_file_type, pattern_name, logs FROM log_rollups WHERE granularity = ? AND bucket >= ? ORDER BY bucket'
+        charts = {
+            name: (granularity, f"SELECT strftime('{bucket_format}', log_date) AS bucket, log_file_type, pattern_name, COUNT(*) FROM logs WHERE log_date >= ? GROUP BY 1, 2, 3 ORDER BY 1", rollup_sql, since.strftime('%Y-%m-%d %H:%M:%S.%f'))
+            for name, granularity, bucket_format, since in (
+                ('hour_30d', 'hour', '%Y-%m-%d %H:00:00.000000', end - timedelta(days=DAYS)),
+                ('minute_1d', 'minute', '%Y-%m-%d %H:%M:00.000000', end - timedelta(days=1))
+            )
+        }
+
+        with database.create_session() as db:
+            elapsed, rollups_elapsed = write(LogWriter(rollups=create_rollups()), db, args.rows, start)
+            results['write_rows_per_second'] = round(args.rows / elapsed, 1)
+            results['rollups_ms_per_batch'] = round(rollups_elapsed / -(-args.rows // BATCH_SIZE) * 1000, 2)
+            results['rollups_write_share'] = f'{rollups_elapsed / elapsed:.1%}'
+
+            connection = db.connection()
+            for name, equal in compare_charts(connection, charts).items():
+                results[f'{name}_equal'] = equal
+
+            started = time.perf_counter()
+            create_rollups().rebuild(db)
+            results['rebuild_seconds'] = round(time.perf_counter() - started, 2)
+            connection = db.connection()
+            for name, equal in compare_charts(connection, charts).items():
+                results[f'{name}_equal_after_rebuild'] = equal
+
+            for name, (granularity, raw_sql, rollup_sql, since) in charts.items():
+                results[f'{name}_points'] = len(connection.exec_driver_sql(rollup_sql, (granularity, since)).all())
+                results[f'{name}_logs_ms'] = median_ms(lambda: connection.exec_driver_sql(raw_sql, (since,)).all(), args.runs)
+                results[f'{name}_rollups_ms'] = median_ms(lambda: connection.exec_driver_sql(rollup_sql, (granularity, since)).all(), args.runs)
+            db.commit()
+
+        database.engine.dispose()
+
+    results['peak_rss_mb'] = peak_rss_mb()
+    report('rollups', results)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,120 @@
+# ┓ ┏┓┏┓┳┓┏┓┳┓┳┓┏┓  ┏┓┳┳┓┏┓┳┓┏┓┓
+# ┃ ┣ ┃┃┃┃┣┫┣┫┃┃┃┃  ┣┫┃┃┃┣┫┣┫┣┫┃
+# ┗┛┗┛┗┛┛┗┛┗┛┗┻┛┗┛  ┛┗┛ ┗┛┗┛┗┛┗┗┛
+# Modified: 16/10/2026
+
+# Compara a latência da busca pelo índice FTS5 (search.py), por relevância e pelos mais recentes, com a busca
+# por LIKE no json_data, na primeira página de resultados e com termos raros, comuns, prefixos e frases.
+# Mede também a vazão da gravação dos logs com os triggers do índice ativos e o tamanho do índice na database.
+#
+# Uso: python -m benchmarks.bench_search [--rows 10000000] [--runs 5]
+
+import os
+import time
+import random
+import sqlite3
+import argparse
+import statistics
+import tempfile
+from datetime import datetime, timedelta
+from .common import setup_environment, import_app, peak_rss_mb, report
+
+LOG_TYPES = ('chat', 'admin', 'user', 'DebugLog-server') # O último tipo não é indexado
+DATE_FORMAT = '%Y-%m-%d %H:%M:%S.%f'
+WORDS = (
+    'zumbi', 'horda', 'base', 'carro', 'gasolina', 'comida', 'arma', 'machado', 'casa', 'mapa',
+    'cidade', 'floresta', 'rio', 'ponte', 'gerador', 'radio', 'mochila', 'faca', 'porta', 'janela'
+)
+RARE_WORD = 'helicoptero' # Uma a cada 10000 mensagens
+TERMS = (RARE_WORD, 'zumbi', 'zumbi horda', 'gera*', '"base segura"')
+PAGE_SIZE = 20
+
+def populate(connection: sqlite3.Connection, rows: int, start: datetime, batch_size: int = 100_000) -> float:
+    """Grava os logs em lotes pela tabela logs (os triggers indexam os textos). Retorna os logs por segundo."""
+    random.seed(21)
+
+    def generate(first_index: int, count: int):
+        for index in range(first_index, first_index + count):
+            moment = (start + timedelta(seconds=index // 10)).strftime(DATE_FORMAT)
+            words = random.sample(WORDS, 6)
+            if index % 10_000 == 0:
+                words.append(RARE_WORD)
+            if index % 1_000 == 0:
+                words += ['base', 'segura']
+            json_data = f'{{"datetime": "{moment}", "player": "jogador{index % 500}", "message": "{" ".join(words)}"}}'
+            yield ('default', 1, LOG_TYPES[index % len(LOG_TYPES)], moment, json_data, moment)
+
+    started = time.perf_counter()
+    for first_index in range(0, rows, batch_size):
+        connection.executemany(
+            'INSERT INTO logs (pattern_name, log_file_id, log_file_type, log_date, json_data, created_at) VALUES (?, ?, ?, ?, ?, ?)',
+            generate(first_index, min(batch_size, rows - first_index))
+        )
+        connection.commit()
+    return rows / (time.perf_counter() - started)
+
+def like_pattern(term: str) -> list[str]:
+    """Equivalente aproximado do termo para o LIKE: cada palavra (ou frase) precisa estar no json_data."""
+    if term.startswith('"'):
+        return [f'%{term.strip(chr(34))}%']
+    return [f'%{word.rstrip("*")}%' for word in term.split()]
+
+def search_like(connection: sqlite3.Connection, term: str) -> int:
+    patterns = like_pattern(term)
+    rows = connection.execute(
+        "SELECT id, log_file_type, pattern_name, log_date, json_data FROM logs WHERE log_file_type IN ('chat', 'admin', 'user') AND "
+        + ' AND '.join('json_data LIKE ?' for _ in patterns) + ' ORDER BY id DESC LIMIT ?',
+        (*patterns, PAGE_SIZE)
+    ).fetchall()
+    return len(rows)
+
+def index_size_mb(connection: sqlite3.Connection):
+    """Tamanho das tabelas internas do índice, se o SQLite tiver a tabela virtual dbstat."""
+    try:
+        size = connection.execute("SELECT SUM(pgsize) FROM dbstat WHERE name LIKE 'logs_fts%'").fetchone()[0]
+    except sqlite3.OperationalError:
+        return None
+    return round((size or 0) / 1024 / 1024, 1)
+
+def median_ms(function, runs: int) -> float:
+    durations = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        function()
+        durations.append(time.perf_counter() - started)
+    return round(statistics.median(durations) * 1000, 2)
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description='Benchmark da busca textual (FTS5 x LIKE).')
+    parser.add_argument('--rows', type=int, default=10_000_000, help='Quantidade de logs na tabela logs.')
+    parser.add_argument('--runs', type=int, default=5, help='Execuções de cada busca (é utilizada a mediana).')
+    args = parser.parse_args()
+
+    results = {'rows': args.rows}
+    with tempfile.TemporaryDirectory() as workdir:
+        setup_environment(workdir, {'search': {'enabled': 'true', 'log_types': 'chat, admin, user'}})
+        import_app()
+        from app.database import Database
+        from app.search import create_search_index
+
+        connection = sqlite3.connect(os.path.join(workdir, 'database.db'))
+        results['insert_rows_per_second'] = round(populate(connection, args.rows, datetime(2026, 1, 1)), 1)
+        results['indexed_rows'] = connection.execute('SELECT COUNT(*) FROM logs_fts').fetchone()[0]
+        results['index_size_mb'] = index_size_mb(connection)
+
+        search_index = create_search_index()
+        with Database().engine.connect() as fts_connection:
+            for term in TERMS:
+                name = term.strip('"*').replace(' ', '_')
+                hits = len(search_index.search(fts_connection, term, page_size=PAGE_SIZE).hits)
+                results[f'fts_{name}_ms'] = median_ms(lambda: search_index.search(fts_connection, term, page_size=PAGE_SIZE), args.runs)
+                results[f'fts_recent_{name}_ms'] = median_ms(lambda: search_index.search(fts_connection, term, page_size=PAGE_SIZE, order='recent'), args.runs)
+                results[f'like_{name}_ms'] = median_ms(lambda: search_like(connection, term), args.runs)
+                results[f'{name}_hits'] = hits
+        connection.close()
+
+    results['peak_rss_mb'] = peak_rss_mb()
+    report('search', results)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,121 @@
+# ┓ ┏┓┏┓┳┓┏┓┳┓┳┓┏┓  ┏┓┳┳┓┏┓┳┓┏┓┓
+# ┃ ┣ ┃┃┃┃┣┫┣┫┃┃┃┃  ┣┫┃┃┃┣┫┣┫┣┫┃
+# ┗┛┗┛┗┛┛┗┛┗┛┗┻┛┗┛  ┛┗┛ ┗┛┗┛┗┛┗┗┛
+# Modified: 16/10/2026
+
+# Vários servidores no mesmo processo: o main.py acompanha N diretórios Zomboid (seção [servers]), todos com
+# arquivos de log, mas apenas o primeiro recebe novas linhas durante a medição. O tempo de CPU do processo deve
+# acompanhar o volume de logs do servidor ativo e não a quantidade de servidores parados. No final os logs de
+# cada servidor são conferidos com as linhas escritas nos seus arquivos.
+#
+# Uso: python -m benchmarks.bench_servers [--servers 1,8,32] [--lines-per-second 2000] [--duration 20] [--engine sync]
+
+import os
+import sys
+import time
+import signal
+import sqlite3
+import argparse
+import resource
+import tempfile
+import subprocess
+from .common import ROOT_DIR, setup_environment, report
+from .generator import LogGenerator, LiveWriter
+
+FINISH_TIMEOUT = 300
+IDLE_LINES = 2_000 # Linhas dos arquivos dos servidores parados, lidas na inicialização
+
+def children_cpu_seconds() -> float:
+    usage = resource.getrusage(resource.RUSAGE_CHILDREN)
+    return usage.ru_utime + usage.ru_stime
+
+def is_caught_up(database_path: str, generators: dict[str, LogGenerator]) -> bool:
+    """Verifica se o LogFile de cada tipo de cada servidor já gravou todas as linhas do arquivo atual."""
+    connection = sqlite3.connect(database_path, timeout=30)
+    try:
+        cursors = dict(connection.execute('SELECT file_path, cursor_position FROM log_files').fetchall())
+    except sqlite3.OperationalError:
+        return False # Database ainda sem as tabelas
+    finally:
+        connection.close()
+    return all(cursors.get(paths[-1]) == generator.sizes[paths[-1]] for generator in generators.values() for paths in generator.files.values() if paths)
+
+def run(servers: int, args: argparse.Namespace) -> dict:
+    with tempfile.TemporaryDirectory() as workdir:
+        server_dirs = {f'server{index}': os.path.join(workdir, 'servers', f'server{index}') for index in range(servers)}
+        for path in server_dirs.values():
+            os.makedirs(os.path.join(path, 'Logs'), exist_ok=True)
+        setup_environment(workdir, {
+            'app': {'expiration_time': 0, 'reading_frequency': args.reading_frequency, 'engine': args.engine, 'watcher': args.watcher},
+            'servers': server_dirs
+        })
+        database_path = os.path.join(workdir, 'database.db')
+
+        generators = {server: LogGenerator(os.path.join(path, 'Logs'), seed=index) for index, (server, path) in enumerate(server_dirs.items())}
+        for generator in generators.values():
+            generator.generate(IDLE_LINES)
+        active = generators['server0']
+
+        cpu_before = children_cpu_seconds()
+        started = time.monotonic()
+        process = subprocess.Popen([sys.executable, os.path.join(ROOT_DIR, 'main.py')], cwd=ROOT_DIR, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        try:
+            live = LiveWriter(active, args.lines_per_second, args.duration)
+            live.start()
+            live.join()
+            deadline = time.monotonic() + FINISH_TIMEOUT
+            while not is_caught_up(database_path, generators):
+                if time.monotonic() > deadline or process.poll() is not None:
+                    raise SystemExit('A ingestão não terminou de ler os arquivos.')
+                time.sleep(0.2)
+            elapsed = time.monotonic() - started
+        finally:
+            if process.poll() is None:
+                process.send_signal(signal.SIGINT)
+                try:
+                    process.wait(30)
+                except subprocess.TimeoutExpired:
+                    process.kill()
+                    process.wait()
+        cpu_seconds = children_cpu_seconds() - cpu_before
+
+        connection = sqlite3.connect(database_path)
+        stored = dict(connection.execute('SELECT server, count(*) FROM logs GROUP BY server').fetchall())
+        connection.close()
+
+    return {
+        'seconds': round(elapsed, 1),
+        'cpu_seconds': round(cpu_seconds, 2),
+        'lines': sum(generator.index for generator in generators.values()),
+        'logs': sum(stored.values()),
+        'servers_with_logs': sum(1 for server in server_dirs if stored.get(server, 0) > 0)
+    }
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description='Custo de CPU da leitura de vários servidores com apenas um servidor ativo.')
+    parser.add_argument('--servers', default='1,8,32', help='Quantidades de servidores medidas, separadas por vírgula.')
+    parser.add_argument('--lines-per-second', type=float, default=2000, help='Linhas por segundo escritas no servidor ativo.')
+    parser.add_argument('--duration', type=float, default=20, help='Duração da escrita em segundos.')
+    parser.add_argument('--reading-frequency', type=float, default=0.1, help='reading_frequency utilizado.')
+    parser.add_argument('--engine', choices=('sync', 'async'), default='sync', help='Modo de leitura.')
+    parser.add_argument('--watcher', choices=('auto', 'inotify', 'polling'), default='auto', help='Monitoramento dos diretórios.')
+    args = parser.parse_args()
+
+    results = {'engine': args.engine, 'watcher': args.watcher, 'lines_per_second': args.lines_per_second, 'duration': args.duration}
+    baseline = None
+    all_servers_read = True
+    for servers in (int(value) for value in args.servers.split(',')):
+        result = run(servers, args)
+        all_servers_read = all_servers_read and result['servers_with_logs'] == servers
+        baseline = baseline or result['cpu_seconds']
+        for key, value in result.items():
+            results[f'{servers}_servers_{key}'] = value
+        results[f'{servers}_servers_cpu_ratio'] = round(result['cpu_seconds'] / max(baseline, 1e-9), 2)
+    results['all_servers_read'] = all_servers_read
+
+    report('servers', results)
+    if not all_servers_read:
+        raise SystemExit('Algum servidor não teve os logs gravados.')
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,62 @@
+# ┓ ┏┓┏┓┳┓┏┓┳┓┳┓┏┓  ┏┓┳┳┓┏┓┳┓┏┓┓
+# ┃ ┣ ┃┃┃┃┣┫┣┫┃┃┃┃  ┣┫┃┃┃┣┫┣┫┣┫┃
+# ┗┛┗┛┗┛┛┗┛┗┛┗┻┛┗┛  ┛┗┛ ┗┛┗┛┗┛┗┗┛
+# Modified: 16/10/2026
+
+# Mede o custo por chamada do TimestampDecoder comparado ao datetime.strptime, com datas
+# em ordem (como nas linhas de um arquivo de log) e com o dia mudando a cada chamada.
+#
+# Uso: python -m benchmarks.bench_timestamps [--calls 200000]
+
+import argparse
+import timeit
+import tempfile
+from datetime import datetime, timedelta
+from .common import setup_environment, import_app, report
+
+def generate(calls: int, step: timedelta, date_format: str, fraction: bool) -> list[str]:
+    start = datetime(2026, 10, 16)
+    stamps = [(start + step * index).strftime(date_format) for index in range(calls)]
+    return [stamp[:-3] for stamp in stamps] if fraction else stamps # O Project Zomboid grava milissegundos
+
+def per_call_ns(function, stamps: list[str], repeat: int = 5) -> float:
+    """Retorna o melhor tempo médio por chamada em nanossegundos."""
+    def decode_all():
+        for stamp in stamps:
+            function(stamp)
+    return round(min(timeit.repeat(decode_all, number=1, repeat=repeat)) / len(stamps) * 1e9, 1)
+
+def run(calls: int) -> dict:
+    from app.timestamps import LOG_DATE_FORMAT, FILE_DATE_FORMAT, log_date_decoder, file_date_decoder
+
+    scenarios = {
+        'log_lines_in_order': (generate(calls, timedelta(milliseconds=10), LOG_DATE_FORMAT, True), LOG_DATE_FORMAT, log_date_decoder),
+        'log_lines_day_changes': (generate(calls, timedelta(days=1, milliseconds=10), LOG_DATE_FORMAT, True), LOG_DATE_FORMAT, log_date_decoder),
+        'file_names': (generate(calls, timedelta(hours=6), FILE_DATE_FORMAT, False), FILE_DATE_FORMAT, file_date_decoder)
+    }
+
+    results = {'calls': calls}
+    for name, (stamps, date_format, create_decoder) in scenarios.items():
+        decoder = create_decoder()
+        assert all(decoder.decode(stamp) == datetime.strptime(stamp, date_format) for stamp in stamps[:1000])
+
+        strptime_ns = per_call_ns(lambda stamp: datetime.strptime(stamp, date_format), stamps)
+        decoder_ns = per_call_ns(decoder.decode, stamps)
+        results[f'{name}_strptime_ns'] = strptime_ns
+        results[f'{name}_decoder_ns'] = decoder_ns
+        results[f'{name}_speedup'] = round(strptime_ns / decoder_ns, 2)
+    return results
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description='Benchmark da conversão das datas dos logs.')
+    parser.add_argument('--calls', type=int, default=200_000, help='Quantidade de datas convertidas por repetição.')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as workdir:
+        setup_environment(workdir)
+        import_app()
+        results = run(args.calls)
+    report('timestamps', results)
+
+if __name__ == '__main__':
+    main()
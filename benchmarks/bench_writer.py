@@ -0,0 +1,104 @@
+# ┓ ┏┓┏┓┳┓┏┓┳┓┳┓┏┓  ┏┓┳┳┓┏┓┳┓┏┓┓
+# ┃ ┣ ┃┃┃┃┣┫┣┫┃┃┃┃  ┣┫┃┃┃┣┫┣┫┣┫┃
+# ┗┛┗┛┗┛┛┗┛┗┛┗┻┛┗┛  ┛┗┛ ┗┛┗┛┗┛┗┗┛
+# Modified: 16/10/2026
+
+# Compara a gravação linha a linha (um commit por linha, como antes do LogWriter)
+# com a gravação em lotes do Reader atual sobre um user.txt sintético.
+#
+# Uso: python -m benchmarks.bench_writer [--lines 1000000] [--legacy-lines 20000]
+
+import re
+import time
+import argparse
+import tempfile
+from datetime import datetime
+from .common import setup_environment, import_app, write_user_log, report
+
+def run_legacy(app, legacy_lines: int) -> dict:
+    from app.database import Database, LogFile, Log
+    database = Database()
+
+    with database.create_session() as db:
+        logfile = db.query(LogFile).filter_by(log_type='user').one()
+        patterns = logfile.get_patterns()
+        rows = 0
+
+        start = time.perf_counter()
+        for _ in range(legacy_lines):
+            with open(logfile.file_path, 'rb') as f:
+                f.seek(logfile.cursor_position)
+                line_bytes = f.readline()
+            line = line_bytes.decode('utf-8', errors='ignore').strip()
+
+            for pattern_name, pattern in patterns.items():
+                match = re.match(pattern, line)
+                if match:
+                    db.add(Log(
+                        pattern_name=pattern_name,
+                        log_file_id=logfile.id,
+                        log_file_type=logfile.log_type,
+                        log_date=datetime.strptime(match.group(1), '%d-%m-%y %H:%M:%S.%f'),
+                        json_data='{}'
+                    ))
+                    rows += 1
+
+            logfile.cursor_position += len(line_bytes)
+            db.commit()
+        elapsed = time.perf_counter() - start
+
+        db.query(Log).delete()
+        logfile.cursor_position = 0
+        db.commit()
+
+    return {'rows': rows, 'seconds': round(elapsed, 3), 'rows_per_second': round(rows / elapsed, 1)}
+
+def run_batch(app) -> dict:
+    from app.database import Database, LogFile, Log
+    database = Database()
+    reader = app.reader
+
+    with database.create_session() as db:
+        start = time.perf_counter()
+        while True:
+            reader.read_logs(db)
+            logfile = db.query(LogFile).filter_by(log_type='user').one()
+            if reader.writer.get_cursor(logfile.id, logfile.cursor_position) >= logfile.file_size:
+                break
+        reader.writer.flush(db)
+        elapsed = time.perf_counter() - start
+        rows = db.query(Log).count()
+
+    return {'rows': rows, 'seconds': round(elapsed, 3), 'rows_per_second': round(rows / elapsed, 1)}
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description='Benchmark de gravação dos logs na database.')
+    parser.add_argument('--lines', type=int, default=1_000_000, help='Linhas do user.txt sintético.')
+    parser.add_argument('--legacy-lines', type=int, default=20_000, help='Linhas processadas no modo linha a linha.')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as workdir:
+        logs_dir = setup_environment(workdir)
+        write_user_log(logs_dir, args.lines)
+
+        app = import_app()
+        app.reader.update_cached_logsfiles()
+        with app.database.Database().create_session() as db:
+            app.reader.update_database_logfiles(db)
+
+        legacy = run_legacy(app, min(args.legacy_lines, args.lines))
+        batch = run_batch(app)
+
+        app.database.Database().engine.dispose()
+
+    report('writer', {
+        'lines': args.lines,
+        'legacy_rows_per_second': legacy['rows_per_second'],
+        'batch_rows_per_second': batch['rows_per_second'],
+        'batch_rows': batch['rows'],
+        'batch_seconds': batch['seconds'],
+        'speedup': round(batch['rows_per_second'] / legacy['rows_per_second'], 1)
+    })
+
+if __name__ == '__main__':
+    main()
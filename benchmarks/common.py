@@ -0,0 +1,86 @@
+# ┓ ┏┓┏┓┳┓┏┓┳┓┳┓┏┓  ┏┓┳┳┓┏┓┳┓┏┓┓
+# ┃ ┣ ┃┃┃┃┣┫┣┫┃┃┃┃  ┣┫┃┃┃┣┫┣┫┣┫┃
+# ┗┛┗┛┗┛┛┗┛┗┛┗┻┛┗┛  ┛┗┛ ┗┛┗┛┗┛┗┗┛
+# Modified: 16/10/2026
+
+import os
+import sys
+import json
+import time
+import logging
+import subprocess
+from configparser import ConfigParser
+from datetime import datetime, timedelta
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+def setup_environment(workdir: str, overrides: dict = None) -> str:
+    """Cria um diretório Zomboid/Logs temporário e um config.ini apontando para ele.
+
+    Deve ser chamado antes de `import app`, pois o app carrega a configuração na importação.
+    `overrides` é um dicionário {seção: {opção: valor}} aplicado sobre o config padrão.
+    """
+    path_zomboid = os.path.join(workdir, 'Zomboid')
+    os.makedirs(os.path.join(path_zomboid, 'Logs'), exist_ok=True)
+
+    parser = ConfigParser()
+    parser.read(os.path.join(ROOT_DIR, 'app', 'config'), encoding='utf-8')
+    parser.set('path', 'zomboid', path_zomboid)
+    parser.set('path', 'database', os.path.join(workdir, 'database.db'))
+
+    for section, options in (overrides or {}).items():
+        if not parser.has_section(section):
+            parser.add_section(section)
+        for option, value in options.items():
+            parser.set(section, option, str(value))
+
+    config_path = os.path.join(workdir, 'config.ini')
+    with open(config_path, 'w', encoding='utf-8') as f:
+        parser.write(f)
+
+    os.environ['PZLA_CONFIG'] = config_path
+    return os.path.join(path_zomboid, 'Logs')
+
+def import_app(level: int = logging.ERROR):
+    """Importa o app e silencia o logger padrão para não medir a escrita no terminal."""
+    import app
+    logging.getLogger().setLevel(level)
+    return app
+
+def format_stamp(moment: datetime) -> str:
+    return moment.strftime('%d-%m-%y %H:%M:%S.') + f'{moment.microsecond // 1000:03d}'
+
+def user_line(moment: datetime, index: int) -> str:
+    steamid = 76561198000000000 + index % 1000
+    event = 'fully connected' if index % 2 == 0 else 'disconnected player'
+    return f'[{format_stamp(moment)}] {steamid} "Player {index % 1000}" {event} ({10000 + index % 500},{5000 + index % 300},0).\n'
+
+def write_user_log(logs_dir: str, lines: int, start: datetime = None) -> str:
+    start = start or datetime(2026, 10, 16, 12, 0, 0)
+    path = os.path.join(logs_dir, f'{start.strftime("%d-%m-%y_%H-%M-%S")}_user.txt')
+    with open(path, 'w', encoding='utf-8', newline='\n') as f:
+        for index in range(lines):
+            f.write(user_line(start + timedelta(milliseconds=index * 10), index))
+    return path
+
+def peak_rss_mb() -> float:
+    """Pico de memória residente do processo em MB (-1 onde o módulo resource não existe, ex. Windows)."""
+    try:
+        import resource
+    except ImportError:
+        return -1
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss # KB no Linux, bytes no macOS
+    return round(peak / (1024 * 1024 if sys.platform == 'darwin' else 1024), 1)
+
+def git_revision() -> str:
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT_DIR, capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return ''
+
+def report(name: str, results: dict) -> None:
+    """Imprime o resultado legível e uma linha JSON para comparação entre commits."""
+    print(f'--- {name}')
+    for key, value in results.items():
+        print(f'{key:<30} {value}')
+    print(json.dumps({'benchmark': name, 'timestamp': time.time(), 'revision': git_revision(), **results}))
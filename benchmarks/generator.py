@@ -0,0 +1,164 @@
+# ┓ ┏┓┏┓┳┓┏┓┳┓┳┓┏┓  ┏┓┳┳┓┏┓┳┓┏┓┓
+# ┃ ┣ ┃┃┃┃┣┫┣┫┃┃┃┃  ┣┫┃┃┃┣┫┣┫┣┫┃
+# ┗┛┗┛┗┛┛┗┛┗┛┗┻┛┗┛  ┛┗┛ ┗┛┗┛┗┛┗┗┛
+# Modified: 16/10/2026
+
+# Gera diretórios Logs/ sintéticos do Project Zomboid (user, chat, admin e DebugLog-server),
+# com arquivos rotacionados, uma taxa de linhas por segundo e uma fração de linhas que combinam
+# com os patterns do config padrão (o restante são linhas que nenhum pattern reconhece).
+#
+# Uso: python -m benchmarks.generator <diretório> [--lines 100000] [--rotated 2] [--lines-per-second 200] [--match-ratio 0.9]
+
+import os
+import time
+import random
+import argparse
+import threading
+from array import array
+from collections import deque
+from datetime import datetime, timedelta
+from typing import Optional
+from .common import format_stamp, user_line
+
+# Tipo de log: peso na quantidade de linhas geradas
+LOG_TYPES = {'user': 0.3, 'chat': 0.2, 'admin': 0.05, 'DebugLog-server': 0.45}
+
+def matching_line(log_type: str, moment: datetime, index: int) -> str:
+    stamp = format_stamp(moment)
+    if log_type == 'user':
+        return user_line(moment, index)
+    if log_type == 'chat':
+        return f"[{stamp}] Got message:ChatMessage{{chat=General, id=-1, author='Player {index % 1000}', text='mensagem {index}'}}.\n"
+    if log_type == 'admin':
+        return f'[{stamp}] admin teleported Player {index % 1000} to {10000 + index % 500},{5000 + index % 300},0.\n'
+    return f'[{stamp}] LOG  : General     , {int(moment.timestamp() * 1000)}> {index}> Tick do servidor concluído em {index % 50} ms.\n'
+
+def noise_line(log_type: str, moment: datetime, index: int) -> str:
+    """Linha que não combina com os patterns do tipo (mensagens não configuradas ou continuações sem data)."""
+    if log_type == 'user':
+        return f'[{format_stamp(moment)}] {76561198000000000 + index % 1000} "Player {index % 1000}" attempting to join.\n'
+    if log_type == 'DebugLog-server':
+        return f'\tat zombie.network.GameServer.main(GameServer.java:{index % 2000})\n'
+    return f'    continuação da mensagem {index} sem data\n'
+
+class LogGenerator:
+    """Escreve linhas sintéticas nos arquivos atuais de cada tipo, criando novos arquivos na rotação.
+
+    Os arquivos seguem o nome `dd-mm-yy_HH-MM-SS_<tipo>.txt` do jogo. Com `track`, cada escrita é registrada
+    com o instante e a posição final de cada linha no arquivo, para medir a latência até a gravação.
+    """
+
+    def __init__(self, logs_dir: str, match_ratio: float = 0.9, log_types: dict[str, float] = LOG_TYPES, start: Optional[datetime] = None, seed: int = 0) -> None:
+        self.logs_dir = logs_dir
+        self.match_ratio = match_ratio
+        self.log_types = list(log_types)
+        self.weights = list(log_types.values())
+        self.moment = start or datetime(2026, 10, 16, 12, 0, 0)
+        self.random = random.Random(seed)
+        self.index = 0
+        self.files: dict[str, list[str]] = {log_type: [] for log_type in self.log_types} # Do mais antigo ao atual
+        self.sizes: dict[str, int] = {}
+        self.written: dict[str, deque[list]] = {} # Arquivo: [instante, posições finais das linhas, próxima linha pendente]
+        self.lock = threading.Lock()
+
+    def rotate(self) -> None:
+        """Cria um novo arquivo para cada tipo, com a data atual do gerador no nome."""
+        self.moment += timedelta(seconds=1) # Nomes distintos mesmo com rotações seguidas
+        with self.lock:
+            for log_type in self.log_types:
+                path = os.path.join(self.logs_dir, f'{self.moment.strftime("%d-%m-%y_%H-%M-%S")}_{log_type}.txt')
+                open(path, 'ab').close()
+                self.files[log_type].append(path)
+                self.sizes[path] = 0
+
+    def write(self, lines: int, lines_per_second: float, track: bool = False) -> None:
+        """Escreve `lines` linhas distribuídas entre os tipos, com as datas espaçadas pela taxa informada."""
+        if not self.files[self.log_types[0]]:
+            self.rotate()
+
+        step = timedelta(seconds=1 / lines_per_second) if lines_per_second > 0 else timedelta(0)
+        buffers: dict[str, list[str]] = {}
+        for log_type in self.random.choices(self.log_types, self.weights, k=lines):
+            self.moment += step
+            if self.random.random() < self.match_ratio:
+                line = matching_line(log_type, self.moment, self.index)
+            else:
+                line = noise_line(log_type, self.moment, self.index)
+            buffers.setdefault(log_type, []).append(line)
+            self.index += 1
+
+        now = time.monotonic()
+        with self.lock:
+            for log_type, log_lines in buffers.items():
+                path = self.files[log_type][-1]
+                data = ''.join(log_lines).encode('utf-8')
+                with open(path, 'ab') as f:
+                    f.write(data)
+                if track:
+                    ends = array('q')
+                    position = self.sizes[path]
+                    for line in log_lines:
+                        position += len(line.encode('utf-8'))
+                        ends.append(position)
+                    self.written.setdefault(path, deque()).append([now, ends, 0])
+                self.sizes[path] += len(data)
+
+    def generate(self, lines: int, rotated: int = 0, lines_per_second: float = 200, track: bool = False) -> None:
+        """Gera um diretório estático: `rotated` arquivos antigos por tipo e os arquivos atuais, com `lines` linhas nos atuais.
+
+        Os arquivos rotacionados recebem a mesma quantidade de linhas dos atuais, mas não são registrados (o Reader
+        acompanha apenas o arquivo mais recente de cada tipo).
+        """
+        for file_index in range(rotated + 1):
+            self.rotate()
+            current = file_index == rotated
+            for offset in range(0, lines, 10_000):
+                self.write(min(10_000, lines - offset), lines_per_second, track=track and current)
+
+class LiveWriter(threading.Thread):
+    """Acrescenta linhas nos arquivos em tempo real, na taxa informada, com rotações periódicas opcionais."""
+
+    def __init__(self, generator: LogGenerator, lines_per_second: float, duration: float, rotate_every: float = 0, interval: float = 0.01) -> None:
+        super().__init__(name='live-writer', daemon=True)
+        self.generator = generator
+        self.lines_per_second = lines_per_second
+        self.duration = duration
+        self.rotate_every = rotate_every
+        self.interval = interval
+        self.rotations = 0
+
+    def run(self) -> None:
+        start = time.monotonic()
+        last_rotation = start
+        written = 0
+        while True:
+            now = time.monotonic()
+            if now - start >= self.duration:
+                break
+            if self.rotate_every > 0 and now - last_rotation >= self.rotate_every:
+                last_rotation = now
+                self.generator.rotate()
+                self.rotations += 1
+            due = int((now - start) * self.lines_per_second) - written
+            if due > 0:
+                self.generator.write(due, self.lines_per_second, track=True)
+                written += due
+            time.sleep(self.interval)
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description='Gera um diretório Logs/ sintético do Project Zomboid.')
+    parser.add_argument('logs_dir', help='Diretório onde os arquivos serão criados.')
+    parser.add_argument('--lines', type=int, default=100_000, help='Linhas dos arquivos atuais (cada arquivo rotacionado recebe a mesma quantidade).')
+    parser.add_argument('--rotated', type=int, default=2, help='Arquivos rotacionados (antigos) por tipo de log.')
+    parser.add_argument('--lines-per-second', type=float, default=200, help='Taxa de linhas simulada nas datas das linhas.')
+    parser.add_argument('--match-ratio', type=float, default=0.9, help='Fração das linhas que combinam com os patterns.')
+    parser.add_argument('--seed', type=int, default=0, help='Semente do gerador, para diretórios reproduzíveis.')
+    args = parser.parse_args()
+
+    os.makedirs(args.logs_dir, exist_ok=True)
+    generator = LogGenerator(args.logs_dir, args.match_ratio, seed=args.seed)
+    generator.generate(args.lines, args.rotated, args.lines_per_second)
+    print(f'{args.lines} linhas geradas em "{args.logs_dir}".')
+
+if __name__ == '__main__':
+    main()
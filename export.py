@@ -0,0 +1,4 @@
+import app
+from app.export import main
+
+main()
\ No newline at end of file
@@ -1,3 +1,7 @@
 import app
 
-app.reader.run_mainloop()
\ No newline at end of file
+if app.Config().app_engine == 'async':
+    from app.engine import AsyncEngine
+    AsyncEngine(app.reader).run()
+else:
+    app.reader.run_mainloop()
\ No newline at end of file
@@ -0,0 +1,4 @@
+import app
+from app.reparse import main
+
+main()
\ No newline at end of file
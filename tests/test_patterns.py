@@ -0,0 +1,61 @@
+# ┓ ┏┓┏┓┳┓┏┓┳┓┳┓┏┓  ┏┓┳┳┓┏┓┳┓┏┓┓
+# ┃ ┣ ┃┃┃┃┣┫┣┫┃┃┃┃  ┣┫┃┃┃┣┫┣┫┣┫┃
+# ┗┛┗┛┗┛┛┗┛┗┛┗┻┛┗┛  ┛┗┛ ┗┛┗┛┗┛┗┗┛
+# Modified: 16/10/2026
+
+import os
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.common import setup_environment, import_app
+
+# Regex e linhas que combinam com ele: o literal extraído deve aparecer em todas as linhas
+CASES = [
+    (r'^\[(?P<datetime>[^\]]+)\] (?P<name>\w{3,16}) joined$', ['[16-10-26 12:00:00.000] abc joined', '[16-10-26 12:00:00.000] abcdefghijklmnop joined']),
+    (r'^\[(?P<datetime>[^\]]+)\] id=\d{100}$', ['[16-10-26 12:00:00.000] id=' + '7' * 100]),
+    (r'^\[(?P<datetime>[^\]]+)\] a{2,}b{,3}c{1} done$', ['[16-10-26 12:00:00.000] aabc done', '[16-10-26 12:00:00.000] aaaabbbc done']),
+    (r'^\[(?P<datetime>[^\]]+)\] \x41BCé\U0001F600 ok$', ['[16-10-26 12:00:00.000] ABCé😀 ok']),
+    (r'^\[(?P<datetime>[^\]]+)\] \N{BULLET} item$', ['[16-10-26 12:00:00.000] • item']),
+    (r'^\[(?P<datetime>[^\]]+)\] \101\0 octal$', ['[16-10-26 12:00:00.000] A\x00 octal']),
+    (r'^\[(?P<datetime>[^\]]+)\] (a+)-\2 (?P<q>["\'])x(?P=q) ref$', ['[16-10-26 12:00:00.000] aa-aa "x" ref', "[16-10-26 12:00:00.000] a-a 'x' ref"]),
+    (r'^\[(?P<datetime>[^\]]+)\] \d+\.\d* (?:kg|lb)s? [\]\\x]+ total$', ['[16-10-26 12:00:00.000] 10. kg ]\\x total', '[16-10-26 12:00:00.000] 1.5 lbs x total']),
+    (r'^\[(?P<datetime>[^\]]+)\] (?P<steamid>\d{17}) "([\w\s]+)" fully connected \((?P<coordx>\d+),(?P<coordy>\d+),(?P<coordz>\d+)\)\.$', ['[16-10-26 12:00:00.000] 76561198000000000 "Player 1" fully connected (10000,5000,0).']),
+    (r'^\[(?P<datetime>[^\]]+)\] {literal} braces$', ['[16-10-26 12:00:00.000] {literal} braces'])
+]
+
+def setUpModule():
+    global app, patterns
+    workdir = tempfile.mkdtemp(prefix='pzla_test_')
+    setup_environment(workdir)
+    app = import_app()
+    from app import patterns
+
+class ExtractLiteralTest(unittest.TestCase):
+    def test_literal_in_every_matching_line(self):
+        for pattern, lines in CASES:
+            literal = patterns.extract_literal(pattern)
+            for line in lines:
+                with self.subTest(pattern=pattern, line=line):
+                    self.assertIsNotNone(patterns.re.match(pattern, line))
+                    if literal is not None:
+                        self.assertIn(literal, line)
+
+    def test_registry_keeps_matching_lines(self):
+        registry = patterns.PatternRegistry({'test': {str(index): pattern for index, (pattern, _) in enumerate(CASES)}}, {})
+        for index, (pattern, lines) in enumerate(CASES):
+            for line in lines:
+                with self.subTest(pattern=pattern, line=line):
+                    self.assertIn(str(index), [name for name, _ in registry.match('test', line)])
+
+    def test_quantifiers_and_escapes_are_not_literals(self):
+        self.assertEqual(patterns.extract_literal(r'\w{3,16} fully connected'), ' fully connected')
+        self.assertEqual(patterns.extract_literal(r'\d{100}x'), 'x')
+        self.assertEqual(patterns.extract_literal(r'\x41BC'), 'BC')
+        self.assertIsNone(patterns.extract_literal(r'a{b}'))
+        self.assertIsNone(patterns.extract_literal(r'abc|def'))
+
+if __name__ == '__main__':
+    unittest.main()